@@ -0,0 +1,390 @@
+from typing import List, Dict, Any, Optional, Tuple
+
+import sys
+import json
+import random
+import socket
+import argparse
+
+from collections import Counter
+
+from networks.bridge import Bridge
+from networks.frame import Frame
+from networks.packet import Packet, MessageType
+from networks.reactor import Reactor
+from networks.event_log import EventKind, LogLevel
+from networks.fabric import Fabric, load_topology
+from networks.topology import generate_topology
+
+from networks.constants import BENCHMARK_PACKET_START_WAIT, BENCHMARK_PACKET_STOP_WAIT, BENCHMARK_LAN_DELAY, \
+    BENCHMARK_SAMPLE_SECOND_INTERVAL, DEFAULT_PACKET_SIZE, HOLD_QUEUE_MAX_DEPTH
+
+
+# The topologies of the default suite, as keyword arguments of generate_topology
+BENCHMARK_SUITE: List[Dict[str, Any]] = [
+    {"shape": "ring", "bridge_count": 64, "seed": 1},
+    {"shape": "tree", "bridge_count": 128, "seed": 2},
+    {"shape": "mesh", "bridge_count": 64, "seed": 3},
+    {"shape": "mixed", "bridge_count": 256, "churn": 0.05, "seed": 4},
+]
+
+
+class SimulatedHost:
+    """
+    An end host that sends data frames on its LAN and counts the frames addressed to it
+    """
+    def __init__(self, identity: str, lan: 'SimulatedLAN'):
+        self.identity = identity
+        self.lan = lan
+        self.msg_count = 0
+
+        # map (source, msg_id) to the number of times it was delivered
+        self.deliveries: Dict[Tuple[str, int], int] = Counter()
+
+        lan.hosts.append(self)
+
+    def send(self, dest: str, msg_id: int) -> None:
+        packet = Packet(source=self.identity, dest=dest, msg_id=msg_id, type=MessageType.DataMessage,
+                        message={"data": f"{msg_id:032x}"})
+        self.lan.broadcast(packet.encode())
+
+    def receive(self, frame: Frame) -> None:
+        if frame.dest == self.identity:
+            self.deliveries[(frame.source, frame.msg_id)] += 1
+
+
+class SimulatedLAN:
+    """
+    In-process counterpart of the LAN of the ./run simulator: every datagram a bridge port sends to it
+    is repeated to every other attached port and to every host on the LAN
+    """
+    def __init__(self, lan_id: int, reactor: Reactor, delay: float = BENCHMARK_LAN_DELAY):
+        self.lan_id = lan_id
+        self.reactor = reactor
+        self.delay = delay
+
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(('localhost', 0))
+        self.socket.setblocking(False)
+        self.port: int = self.socket.getsockname()[1]
+
+        # bridge port addresses are learned from the datagrams they send, like the simulator does
+        self.clients: List[Tuple[str, int]] = []
+        self.hosts: List[SimulatedHost] = []
+
+        self.bpdu_frames = 0
+        self.data_frames = 0
+
+        self.reactor.register(self.socket, self._on_ready)
+
+    def _on_ready(self, _ready_sockets: List[socket.socket]) -> None:
+        while True:
+            try:
+                data, address = self.socket.recvfrom(DEFAULT_PACKET_SIZE)
+            except BlockingIOError:
+                return
+
+            if address not in self.clients:
+                self.clients.append(address)
+
+            if self.delay:
+                self.reactor.timers.schedule(self.delay,
+                                             lambda data=data, address=address: self.broadcast(data, address))
+            else:
+                self.broadcast(data, address)
+
+    def broadcast(self, data: bytes, skip: Optional[Tuple[str, int]] = None) -> None:
+        frame = Frame.peek(data)
+
+        if frame.is_bpdu:
+            self.bpdu_frames += 1
+        else:
+            self.data_frames += 1
+
+        for address in self.clients:
+            if address != skip:
+                self.socket.sendto(data, address)
+
+        for host in self.hosts:
+            host.receive(frame)
+
+    def forget(self, address: Tuple[str, int]) -> None:
+        """
+        Stop repeating frames to the address of a stopped bridge port
+        """
+        if address in self.clients:
+            self.clients.remove(address)
+
+    def close(self) -> None:
+        self.reactor.unregister(self.socket)
+        self.socket.close()
+
+
+class Benchmark:
+    """
+    Run a topology in the format of configs/*.conf in a single process (bridges, LANs and hosts all on
+    one Reactor) and measure convergence, forwarding throughput, duplicates and wire overhead
+    """
+    def __init__(self, topology: Dict[str, Any], name: str = "topology", lan_delay: float = BENCHMARK_LAN_DELAY,
+                 sample_interval: float = BENCHMARK_SAMPLE_SECOND_INTERVAL, binary_bpdus: bool = False,
+                 rapid_spanning_tree: bool = False, hold_max_depth: int = HOLD_QUEUE_MAX_DEPTH):
+        self.topology = topology
+        self.name = name
+        self.lifetime: float = topology["lifetime"]
+        self.sample_interval = sample_interval
+        self.binary_bpdus = binary_bpdus
+        self.rapid_spanning_tree = rapid_spanning_tree
+        self.hold_max_depth = hold_max_depth
+
+        self.rng = random.Random(topology.get("seed"))
+        self.fabric = Fabric(log_level=LogLevel.ERROR, binary_bpdus=binary_bpdus,
+                             rapid_spanning_tree=rapid_spanning_tree, hold_max_depth=hold_max_depth)
+        self.reactor = self.fabric.reactor
+
+        lan_ids = sorted({lan for bridge_config in topology["bridges"] for lan in bridge_config["lans"]})
+        self.lans: Dict[int, SimulatedLAN] = {lan: SimulatedLAN(lan, self.reactor, lan_delay) for lan in lan_ids}
+
+        self.start_time = self.reactor.clock()
+        load_topology(self.fabric, topology, {lan: simulated_lan.port for lan, simulated_lan in self.lans.items()})
+
+        # the fabric forgets stopped bridges, but their counters are still reported
+        self.bridges: List[Bridge] = list(self.fabric.bridges.values())
+
+        # map the time of every topology change to the bridges started or stopped at that time
+        event_descriptions: Dict[float, List[str]] = {0.0: ["initial"]}
+        for bridge_config in topology["bridges"]:
+            if bridge_config.get("start", 0) > 0:
+                event_descriptions.setdefault(bridge_config["start"], []).append(f"start {bridge_config['id']}")
+
+            if "stop" in bridge_config:
+                event_descriptions.setdefault(bridge_config["stop"], []).append(f"stop {bridge_config['id']}")
+                self._schedule_forget(bridge_config)
+
+        self.events: List[Tuple[float, str]] = sorted((event_time, ", ".join(descriptions))
+                                                      for event_time, descriptions in event_descriptions.items())
+
+        self.hosts: List[SimulatedHost] = self._create_hosts(topology.get("hosts", 0))
+        self.sent_packets = 0
+        self._schedule_packets(topology.get("packets", 0))
+
+        # times (since the start) of the samples in which some bridge changed its root or a port role
+        self.change_times: List[float] = []
+        self._role_change_counts: Dict[str, int] = {}
+        self.reactor.timers.schedule(self.sample_interval, self._on_sample)
+
+    def _schedule_forget(self, bridge_config: Dict[str, Any]) -> None:
+        bridge = self.fabric.bridges[bridge_config["id"]]
+        attachments = [(self.lans[lan], port.socket.getsockname()) for lan, port in zip(bridge_config["lans"],
+                                                                                       bridge.ports)]
+
+        def forget() -> None:
+            for lan, address in attachments:
+                lan.forget(address)
+
+        self.reactor.timers.schedule(bridge_config["stop"], forget)
+
+    def _create_hosts(self, host_count: int) -> List[SimulatedHost]:
+        lans = list(self.lans.values())
+        identities = self.rng.sample(range(0x10000), host_count)
+
+        return [SimulatedHost(f"{identity:04x}", self.rng.choice(lans)) for identity in identities]
+
+    def _schedule_packets(self, packet_count: int) -> None:
+        if len(self.hosts) < 2:
+            return
+
+        for _ in range(packet_count):
+            source, dest = self.rng.sample(self.hosts, 2)
+            send_time = self.rng.uniform(BENCHMARK_PACKET_START_WAIT, self.lifetime - BENCHMARK_PACKET_STOP_WAIT)
+
+            msg_id = source.msg_count
+            source.msg_count += 1
+
+            self.reactor.timers.schedule(send_time, lambda source=source, dest=dest.identity, msg_id=msg_id:
+                                         self._send_packet(source, dest, msg_id))
+
+    def _send_packet(self, source: SimulatedHost, dest: str, msg_id: int) -> None:
+        self.sent_packets += 1
+        source.send(dest, msg_id)
+
+    def _on_sample(self) -> None:
+        changed = False
+
+        for identity, bridge in self.fabric.bridges.items():
+            role_changes = bridge.log.event_counts[EventKind.PortRole] + bridge.log.event_counts[EventKind.RootChange]
+
+            if self._role_change_counts.get(identity) != role_changes:
+                self._role_change_counts[identity] = role_changes
+                changed = True
+
+        if changed:
+            self.change_times.append(self.reactor.clock() - self.start_time)
+
+        self.reactor.timers.schedule(self.sample_interval, self._on_sample)
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run the topology for its lifetime
+
+        :return: The JSON compatible results
+        """
+        try:
+            self.fabric.run(lifetime=self.lifetime)
+        finally:
+            for lan in self.lans.values():
+                lan.close()
+
+        return self.results()
+
+    def convergence(self) -> List[Dict[str, Any]]:
+        """
+        :return: For every topology change, the seconds until the last root or port role change it caused
+        """
+        event_convergence: List[Dict[str, Any]] = []
+
+        for index, (event_time, description) in enumerate(self.events):
+            window_end = self.events[index + 1][0] if index + 1 < len(self.events) else self.lifetime
+            changes = [change for change in self.change_times if event_time <= change < window_end]
+
+            last_change = changes[-1] if changes else event_time
+            event_convergence.append({
+                "time": event_time,
+                "event": description,
+                "seconds": round(last_change - event_time, 4),
+                # the tree was still changing when the next event happened
+                "settled": window_end - last_change > self.sample_interval * 2,
+            })
+
+        return event_convergence
+
+    def results(self) -> Dict[str, Any]:
+        deliveries = Counter()
+        for host in self.hosts:
+            deliveries.update(host.deliveries)
+
+        duplicated = [count for count in deliveries.values() if count > 1]
+
+        bpdu_frames = sum(lan.bpdu_frames for lan in self.lans.values())
+        data_frames = sum(lan.data_frames for lan in self.lans.values())
+
+        forwarded_frames = sum(port.counters.frames_out - port.counters.bpdus_out
+                               for bridge in self.bridges for port in bridge.ports)
+        handling_seconds = sum(bridge.counters.loop_latency.total_seconds for bridge in self.bridges)
+        traffic_seconds = self.lifetime - BENCHMARK_PACKET_START_WAIT - BENCHMARK_PACKET_STOP_WAIT
+
+        convergence = self.convergence()
+        convergence_seconds = [event["seconds"] for event in convergence]
+
+        return {
+            "name": self.name,
+            "bridges": len(self.bridges),
+            "lans": len(self.lans),
+            "hosts": len(self.hosts),
+            "lifetime": self.lifetime,
+            "binary_bpdus": self.binary_bpdus,
+            "rapid_spanning_tree": self.rapid_spanning_tree,
+            "hold_max_depth": self.hold_max_depth,
+            "delivery": {
+                "sent": self.sent_packets,
+                "delivered": len(deliveries),
+                "ratio": len(deliveries) / self.sent_packets if self.sent_packets else 0.0,
+                "duplicated_packets": len(duplicated),
+                "extra_deliveries": sum(count - 1 for count in duplicated),
+                # frames that some bridge held while its spanning tree reconverged
+                "held_frames": sum(bridge.counters.held_frames for bridge in self.bridges),
+            },
+            "wire": {
+                "bpdu_frames": bpdu_frames,
+                "data_frames": data_frames,
+                "goodput": len(deliveries) / (bpdu_frames + data_frames) if bpdu_frames + data_frames else 0.0,
+            },
+            "throughput": {
+                "forwarded_frames": forwarded_frames,
+                "handling_seconds": round(handling_seconds, 6),
+                # frames sent per second the bridges spent handling their ports
+                "frames_per_second": forwarded_frames / handling_seconds if handling_seconds else 0.0,
+                "delivered_per_second": len(deliveries) / traffic_seconds if traffic_seconds > 0 else 0.0,
+            },
+            "convergence": {
+                "events": convergence,
+                "mean_seconds": sum(convergence_seconds) / len(convergence_seconds),
+                "max_seconds": max(convergence_seconds),
+                "unsettled": sum(not event["settled"] for event in convergence),
+            },
+        }
+
+
+def raise_file_limit() -> None:
+    """
+    Every bridge port and LAN holds a socket, so large topologies need more than the default file limit
+    """
+    try:
+        import resource
+    except ImportError:
+        return
+
+    soft_limit, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft_limit != hard_limit:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard_limit, hard_limit))
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Generate parser for commandline arguments:
+
+    topologies: configuration files in the format of configs/*.conf (the default suite if none are given)
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='CS 3700 bridge benchmark')
+    parser.add_argument('topologies', type=str, nargs='*', help="Topology files (e.g., configs/advanced-3.conf)")
+    parser.add_argument('--output', type=str, default=None, help="JSON results file (stdout if not provided)")
+    parser.add_argument('--lifetime', type=float, default=30,
+                        help="Lifetime of the generated topologies of the default suite")
+    parser.add_argument('--lan-delay', type=float, default=BENCHMARK_LAN_DELAY,
+                        help="Seconds a LAN delays every frame (like the ./run simulator)")
+    parser.add_argument('--binary-bpdus', action='store_true',
+                        help="Send BPDUs in the compact binary encoding")
+    parser.add_argument('--rapid-spanning-tree', action='store_true',
+                        help="Converge with rapid spanning tree proposals and agreements")
+    parser.add_argument('--hold-max-depth', type=int, default=HOLD_QUEUE_MAX_DEPTH,
+                        help="Data frames every bridge holds while the spanning tree reconverges (0 forwards at once)")
+
+    return parser
+
+
+def main() -> None:
+    parser = create_parser()
+    args: argparse.Namespace = parser.parse_args(sys.argv[1:])
+
+    raise_file_limit()
+
+    scenarios: List[Tuple[str, Dict[str, Any]]] = []
+
+    for topology_path in args.topologies:
+        with open(topology_path) as topology_file:
+            scenarios.append((topology_path, json.load(topology_file)))
+
+    if not scenarios:
+        for suite_entry in BENCHMARK_SUITE:
+            name = f"{suite_entry['shape']}-{suite_entry['bridge_count']}"
+            scenarios.append((name, generate_topology(lifetime=args.lifetime, **suite_entry)))
+
+    results = []
+    for name, topology in scenarios:
+        print(f"Running {name} ({len(topology['bridges'])} bridges)", file=sys.stderr, flush=True)
+
+        benchmark = Benchmark(topology, name=name, lan_delay=args.lan_delay, binary_bpdus=args.binary_bpdus,
+                              rapid_spanning_tree=args.rapid_spanning_tree, hold_max_depth=args.hold_max_depth)
+        results.append(benchmark.run())
+
+    encoded_results = json.dumps({"results": results}, indent=2)
+
+    if args.output is None:
+        print(encoded_results)
+        return
+
+    with open(args.output, 'w') as output_file:
+        output_file.write(encoded_results + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-from typing import Optional, List, Dict, Tuple, Generator
+from typing import Optional, List, Dict, Tuple, Union, Callable, Any
 
 import select
 import time
@@ -12,23 +12,94 @@ from enum import Enum
 from unittest.mock import sentinel
 
 from networks.port import Port, PortStatus
-from networks.packet import MessageType, BPDU
+from networks.packet import Packet, MessageType, BPDU
+from networks.frame import Frame, FrameTemplate
+from networks.codec import BinaryBPDUTemplate
+from networks.counters import IngressBatchStats, BridgeCounters
+from networks.reactor import Reactor, Timer
+from networks.spanning_tree import LazyPriorityQueue
+from networks.hold_queue import HoldQueue
+from networks.storm_control import StormControl
+from networks.capture import CaptureWriter
+from networks.forwarding_table import ForwardingTable
+from networks.event_log import EventLog, EventKind
 from networks.request_handler import SpanningTreeRequest, ForwardingRequest
+from networks.rapid_spanning_tree import RapidSpanningTree
 
-from networks.constants import MESSAGE_SECOND_TIMEOUT
+from networks.constants import (
+    MESSAGE_SECOND_TIMEOUT, ALL_LANS_ID, INGRESS_BATCH_BUDGET, LOG_FLUSH_SECOND_INTERVAL,
+    RAPID_HELLO_SECOND_INTERVAL, RAPID_BPDU_SECOND_TIMEOUT, HOLD_QUEUE_SETTLE_SECOND_INTERVAL,
+    HOLD_QUEUE_SECOND_MAX_AGE, HOLD_QUEUE_MAX_DEPTH, STORM_CONTROL_BROADCAST_RATE, STORM_CONTROL_UNKNOWN_UNICAST_RATE,
+    ROOT_HOLD_DOWN_SECOND_INTERVAL
+)
 
 
 class Bridge:
     """
     Representation of a networking networks
     """
-    def __init__(self, identity: str, ports: List[Port]):
+    def __init__(self, identity: str, ports: List[Port], raw_forwarding: bool = True,
+                 ingress_budget: int = INGRESS_BATCH_BUDGET, clock: Callable[[], float] = time.time,
+                 log: Optional[EventLog] = None, binary_bpdus: bool = False, rapid_spanning_tree: bool = False,
+                 hold_max_age: float = HOLD_QUEUE_SECOND_MAX_AGE, hold_max_depth: int = HOLD_QUEUE_MAX_DEPTH,
+                 storm_broadcast_rate: float = STORM_CONTROL_BROADCAST_RATE,
+                 storm_unknown_unicast_rate: float = STORM_CONTROL_UNKNOWN_UNICAST_RATE,
+                 capture: Optional[CaptureWriter] = None):
         self.identity = identity
         self.ports: List[Port] = ports
 
-        self.forwarding_table: Dict[str, Port] = {}
+        # the ports write their role changes to the log of their bridge
+        self.log: EventLog = log if log is not None else EventLog()
+        for port in self.ports:
+            port.log = self.log
+
+        self.clock = clock
+        self.reactor: Optional[Reactor] = None
+        self._hello_timer: Optional[Timer] = None
+
+        # forward data frames as the received bytes instead of round-tripping them through Packet
+        self.raw_forwarding = raw_forwarding
+
+        # maximum number of datagrams drained from a single ready port per wakeup
+        self.ingress_budget = ingress_budget
+        self.ingress_stats = IngressBatchStats()
+        self.counters = BridgeCounters()
+
+        if self.ingress_budget > 1:
+            for port in self.ports:
+                port.set_blocking(False)
+
+        self.forwarding_table: ForwardingTable = ForwardingTable()
+
+        # data frames wait here until the spanning tree stopped changing (a depth of 0 forwards at once)
+        self.hold_queue = HoldQueue(max_age=hold_max_age, max_depth=hold_max_depth)
+        self._unstable_until: float = float('-inf')
+        self._hold_timer: Optional[Timer] = None
+
+        # limits the frames flooded per ingress port (a rate of 0 floods without limit)
+        self.storm_control = StormControl(broadcast_rate=storm_broadcast_rate,
+                                          unknown_unicast_rate=storm_unknown_unicast_rate)
+
+        # records every datagram received or sent on the ports (written out with the log)
+        self.capture = capture
+        for port in self.ports:
+            port.capture = capture
 
-        self.last_sent_bpdu = time.time()
+        # every (BPDU, port index) seen on any port; the best one is the root candidate
+        self.root_candidates: LazyPriorityQueue[Tuple[BPDU, int]] = LazyPriorityQueue(
+            is_live=lambda bpdu_port_pair: bpdu_port_pair[0] in self.ports[bpdu_port_pair[1]].seen_bpdus)
+
+        # the BPDU the root was learned from before it was lost, whose root is held down until the hold down ends
+        self._held_down_bpdu: Optional[BPDU] = None
+        self._hold_down_until: float = float('-inf')
+
+        self.last_sent_bpdu = self.clock()
+
+        # the BPDU encoding shared by all ports, rebuilt only when the root BPDU changes
+        self._bpdu_template: Optional[Tuple[BPDU, Union[FrameTemplate, BinaryBPDUTemplate]]] = None
+
+        # send BPDUs in the compact binary encoding (every bridge decodes both encodings)
+        self.binary_bpdus = binary_bpdus
 
         self._root_port: int = sentinel.NotSet
         self._root_bpdu: BPDU = sentinel.NotSet
@@ -38,6 +109,17 @@ class Bridge:
         self.DEFAULT_ROOT_PORT: int = None
         self.DEFAULT_ROOT_BPDU: BPDU = BPDU(id=self.identity, root=self.identity, cost=0, port=self.DEFAULT_ROOT_PORT)
 
+        # the rapid spanning tree replaces the root_candidates and the per-port status updates
+        self.rapid: Optional[RapidSpanningTree] = None
+        self.hello_interval: float = MESSAGE_SECOND_TIMEOUT
+
+        if rapid_spanning_tree:
+            self.rapid = RapidSpanningTree(self)
+            self.hello_interval = RAPID_HELLO_SECOND_INTERVAL
+
+            for port in self.ports:
+                port.seen_bpdus.timeout = RAPID_BPDU_SECOND_TIMEOUT
+
     @property
     def root_port(self) -> int:
         return self._root_port
@@ -46,7 +128,7 @@ class Bridge:
     def root_port(self, new_port: int):
         if new_port != self._root_port:
             self._root_port = new_port
-            print(f"Root port: {self.root_port}", flush=True)
+            self.log.info(EventKind.RootChange, "Root port: %s", self.root_port)
 
     @property
     def root_bpdu(self) -> BPDU:
@@ -56,7 +138,8 @@ class Bridge:
     def root_bpdu(self, new_bpdu: BPDU):
         if new_bpdu != self._root_bpdu:
             self._root_bpdu = new_bpdu
-            print(f"New root: {self.root_bpdu.root_id} cost {self.root_bpdu.cost}", flush=True)
+            self.counters.root_changes += 1
+            self.log.info(EventKind.RootChange, "New root: %s cost %s", self.root_bpdu.root_id, self.root_bpdu.cost)
 
     def accept_requests(self, sec_timeout: float) -> Tuple[List[SpanningTreeRequest], List[ForwardingRequest]]:
         """
@@ -65,22 +148,56 @@ class Bridge:
         """
         ready_ports, _, failed_ports = select.select(self.ports, [], self.ports, sec_timeout)
 
+        return self.read_requests(ready_ports)
+
+    def read_requests(self, ready_ports: List[Port]) -> Tuple[List[SpanningTreeRequest], List[ForwardingRequest]]:
+        """
+        reads the queued datagrams of the ready ports and sorts them into their respective categories
+        """
         spanning_requests: List[SpanningTreeRequest] = []
         forwarding_requests: List[ForwardingRequest] = []
 
         for port in ready_ports:
-            packet = port.read_packet()
+            # a budget of one keeps the ports blocking and reads exactly one datagram per ready port
+            datagrams = port.receive_batch(self.ingress_budget) if self.ingress_budget > 1 else [port.receive()]
 
-            if packet.type == MessageType.BridgeProtocolDataUnit:
-                # want all of the BPDUs to be handled first
-                spanning_requests.append(SpanningTreeRequest(port, packet.message))
-            elif packet.type == MessageType.DataMessage:
-                forwarding_requests.append(ForwardingRequest(port, packet))
-            else:
-                raise NotImplementedError(f"Unknown packet type {packet.type}")
+            for datagram in datagrams:
+                request = self._classify_datagram(port, datagram)
+
+                if isinstance(request, SpanningTreeRequest):
+                    # want all of the BPDUs to be handled first
+                    spanning_requests.append(request)
+                else:
+                    forwarding_requests.append(request)
+
+        self.ingress_stats.record_batch(len(spanning_requests) + len(forwarding_requests))
 
         return spanning_requests, forwarding_requests
 
+    def _classify_datagram(self, port: Port, datagram: bytes) -> Union[SpanningTreeRequest, ForwardingRequest]:
+        """
+        :return: The request that handles a datagram received on the provided port
+        """
+        if self.raw_forwarding:
+            frame = Frame.peek(datagram)
+
+            if frame.is_bpdu:
+                port.counters.bpdus_in += 1
+                return SpanningTreeRequest(port, frame.to_bpdu())
+
+            return ForwardingRequest(port, frame)
+
+        packet = port.decode_packet(datagram)
+
+        if packet.type == MessageType.BridgeProtocolDataUnit:
+            port.counters.bpdus_in += 1
+            return SpanningTreeRequest(port, packet.message)
+
+        if packet.type == MessageType.DataMessage:
+            return ForwardingRequest(port, packet)
+
+        raise NotImplementedError(f"Unknown packet type {packet.type}")
+
     def launch(self):
         """
         1. Accept all selects
@@ -88,31 +205,285 @@ class Bridge:
         3. Update the spanning tree based on the BPDU packets
         4. Queue the normal messages until the tree has been re-established
         """
-        print("Bridge starting up", flush=True)  # REQUIRED by assignment
+        reactor = Reactor(clock=self.clock)
+        self.start(reactor)
+
+        reactor.run()
+
+    def start(self, reactor: Reactor) -> None:
+        """
+        Register the ports and timers of this bridge on a (possibly shared) reactor
+        """
+        self.log.info(EventKind.Startup, "Bridge starting up")  # REQUIRED by assignment
         self.root_port = self.DEFAULT_ROOT_PORT
         self.root_bpdu = self.DEFAULT_ROOT_BPDU
 
+        self.reactor = reactor
+
+        for port in self.ports:
+            reactor.register(port, self.on_ports_ready)
+
+        # the roles are unknown until every neighbour sent its hello
+        self.hold_until_stable(self.hello_interval)
+
+        if self.rapid is not None:
+            self.rapid.start()
+
         self.send_bpdus()
+        reactor.timers.schedule(self.forwarding_table.timeout, self._on_forwarding_sweep)
+        reactor.timers.schedule(LOG_FLUSH_SECOND_INTERVAL, self._on_log_flush)
 
         self.active = True
-        while self.active:
-            simultaneous_spanning, simultaneous_forwarding = self.accept_requests(sec_timeout=MESSAGE_SECOND_TIMEOUT)
 
-            any_port_updated: bool = False
+    def stop(self) -> None:
+        """
+        Remove the ports and timers of this bridge from its reactor
+        """
+        self.active = False
+
+        if self.reactor is None:
+            return
+
+        for port in self.ports:
+            self.reactor.unregister(port)
+
+        if self._hello_timer is not None:
+            self._hello_timer.cancel()
+
+        if self._hold_timer is not None:
+            self._hold_timer.cancel()
+
+        # the held frames are lost with the bridge
+        self.hold_queue.drain()
+
+        # any aging timers left on the wheel find an inactive bridge and return
+        self.reactor = None
+        self.log.flush()
+
+        if self.capture is not None:
+            self.capture.flush()
+
+    def on_ports_ready(self, ready_ports: List[Port]) -> None:
+        """
+        Handle every datagram queued on the ready ports: BPDUs first, then the data frames
+        """
+        wakeup_start = time.perf_counter()
+
+        simultaneous_spanning, simultaneous_forwarding = self.read_requests(ready_ports)
+
+        if self.rapid is not None:
+            self.rapid.receive(simultaneous_spanning)
+        else:
+            updated_ports: List[Port] = []
+            new_bpdus = False
+
             for spanning_request in simultaneous_spanning:
-                any_port_updated = any_port_updated or spanning_request.handle(self)
+                if spanning_request.handle(self):
+                    updated_ports.append(spanning_request.port)
 
-            if any_port_updated:
-                self.forwarding_table = self.calculate_forwarding_table()
-                root_changed = self.calculated_root_changed()
-                # print(f"Port update: {any_port_updated} and root updated: {root_changed}", flush=True)
+                new_bpdus = new_bpdus or spanning_request.is_new_bpdu
+
+            self.apply_port_updates(updated_ports, candidates_changed=new_bpdus)
+
+        # a wakeup with only BPDUs releases nothing while the tree is changing
+        if self.hold_queue.enabled and not self.tree_is_stable():
+            for forwarding_request in simultaneous_forwarding:
+                self._hold(forwarding_request)
+        else:
+            # frames held earlier are forwarded first, in the order they arrived
+            self.release_held_frames()
 
             for forwarding_request in simultaneous_forwarding:
                 forwarding_request.handle(self)
 
-            if (any_port_updated and root_changed) or (time.time() - self.last_sent_bpdu > MESSAGE_SECOND_TIMEOUT):
-                # print("Sending BPDUs", flush=True)
-                self.send_bpdus()
+        self.counters.loop_latency.record(time.perf_counter() - wakeup_start)
+
+    def apply_port_updates(self, updated_ports: List[Port], candidates_changed: bool = False) -> None:
+        """
+        Recalculate the root after ports changed status (or the root candidates changed), forget the hosts
+        learned behind every port whose role changed and immediately announce a new root
+
+        :param updated_ports: The ports whose status changed
+        :param candidates_changed: True if a port saw a new BPDU, which may carry a better root, or the
+                                   BPDU the root was learned from may have expired
+        """
+        if not updated_ports and not candidates_changed:
+            return
+
+        previous_root_port = self.root_port
+        root_changed = self.calculated_root_changed()
+
+        if root_changed:
+            self.hold_until_stable()
+
+        changed_ports = set(updated_ports)
+        if self.root_port != previous_root_port:
+            changed_ports.update(self.ports[index] for index in (previous_root_port, self.root_port)
+                                 if index is not None)
+
+        self.forwarding_table.invalidate_ports(changed_ports)
+
+        if root_changed:
+            self.send_bpdus()
+
+    def hold_until_stable(self, seconds: float = HOLD_QUEUE_SETTLE_SECOND_INTERVAL) -> None:
+        """
+        The spanning tree changed: hold the data frames until it has been stable for the provided seconds
+        """
+        self._unstable_until = max(self._unstable_until, self.clock() + seconds)
+
+    def tree_is_stable(self) -> bool:
+        """
+        :return: True if no root or port role changed within the settle interval (and no rapid spanning
+                 tree proposal is waiting for agreements)
+        """
+        if self.clock() < self._unstable_until:
+            return False
+
+        return self.rapid is None or not self.rapid.synchronizing()
+
+    def _hold(self, forwarding_request: ForwardingRequest) -> None:
+        self.counters.held_frames += 1
+
+        overflow_request = self.hold_queue.hold(forwarding_request, self.clock())
+        if overflow_request is not None:
+            self.counters.hold_overflows += 1
+            overflow_request.handle(self)
+
+        if self._hold_timer is None:
+            self._schedule_hold_check()
+
+    def _schedule_hold_check(self) -> None:
+        """
+        Check the held frames again once the tree may be stable or the oldest frame reaches the maximum age
+        """
+        if self.reactor is None:
+            return
+
+        deadline = min(self._unstable_until, self.hold_queue.oldest_time + self.hold_queue.max_age)
+
+        # a pending proposal has no known end
+        if deadline <= self.clock():
+            deadline = self.clock() + HOLD_QUEUE_SETTLE_SECOND_INTERVAL
+
+        self._hold_timer = self.reactor.timers.schedule_at(deadline, self._on_hold_check)
+
+    def _on_hold_check(self) -> None:
+        self._hold_timer = None
+
+        if not self.active:
+            return
+
+        if self.tree_is_stable():
+            self.release_held_frames()
+            return
+
+        for aged_request in self.hold_queue.pop_aged(self.clock()):
+            self.counters.hold_aged_out += 1
+            aged_request.handle(self)
+
+        if len(self.hold_queue) > 0:
+            self._schedule_hold_check()
+
+    def release_held_frames(self) -> None:
+        """
+        Forward every held data frame with the current port roles
+        """
+        for held_request in self.hold_queue.drain():
+            self.counters.hold_released += 1
+            held_request.handle(self)
+
+    def watch_bpdu_expiry(self, port: Port, bpdu: BPDU) -> None:
+        """
+        Age out a newly seen BPDU exactly when it expires rather than on the next received BPDU
+        """
+        if self.reactor is None:
+            return
+
+        last_seen_time = port.seen_bpdus[bpdu].last_seen_time
+        self.reactor.timers.schedule_at(last_seen_time + port.seen_bpdus.timeout,
+                                        lambda: self._on_bpdu_expiry(port, bpdu))
+
+    def _on_bpdu_expiry(self, port: Port, bpdu: BPDU) -> None:
+        """
+        Called when a BPDU may have expired; a BPDU seen again since it was scheduled is rescheduled
+        """
+        if not self.active or bpdu not in port.seen_bpdus:
+            return
+
+        if self.clock() - port.seen_bpdus[bpdu].last_seen_time < port.seen_bpdus.timeout:
+            self.watch_bpdu_expiry(port, bpdu)
+            return
+
+        if self.rapid is not None:
+            self.rapid.update()
+            return
+
+        status_changed = port.calculate_status_update(now=self.clock())
+        if status_changed:
+            self.hold_until_stable()
+
+        # the root has to be elected again when it was learned from the expired BPDU
+        self.apply_port_updates([port] if status_changed else [], candidates_changed=port.index == self.root_port)
+
+    def hold_down_root(self, lost_bpdu: BPDU) -> None:
+        """
+        The BPDU the root was learned from expired or was replaced by a worse one: until the hold down ends,
+        ignore its root at a higher cost.
+
+        The bridges behind this one keep announcing the root they learned from this bridge until they
+        hear that it was lost, and electing one of those echoes would count the cost to infinity
+        """
+        self._held_down_bpdu = lost_bpdu
+        self._hold_down_until = self.clock() + ROOT_HOLD_DOWN_SECOND_INTERVAL
+
+        if self.reactor is not None:
+            self.reactor.timers.schedule_at(self._hold_down_until, self._on_hold_down_end)
+
+    def _on_hold_down_end(self) -> None:
+        # a later hold down replaced this one
+        if not self.active or self.clock() < self._hold_down_until:
+            return
+
+        self._held_down_bpdu = None
+        self.apply_port_updates([], candidates_changed=True)
+
+    def _is_held_down(self, bpdu: BPDU) -> bool:
+        """
+        :return: True if the BPDU may be an echo of a root that was lost
+        """
+        held_down_bpdu = self._held_down_bpdu
+
+        return held_down_bpdu is not None and bpdu.root == held_down_bpdu.root \
+            and bpdu.cost > held_down_bpdu.cost and self.clock() < self._hold_down_until
+
+    def _on_forwarding_sweep(self) -> None:
+        """
+        Periodically free the forwarding entries that aged out (lookups already ignore them)
+        """
+        if not self.active:
+            return
+
+        self.forwarding_table.expire(self.clock())
+        self.reactor.timers.schedule(self.forwarding_table.timeout, self._on_forwarding_sweep)
+
+    def _on_log_flush(self) -> None:
+        """
+        Write out the buffered log lines (and captured datagrams) at least once per flush interval
+        """
+        self.log.flush()
+
+        if self.capture is not None:
+            self.capture.flush()
+
+        if self.active:
+            self.reactor.timers.schedule(LOG_FLUSH_SECOND_INTERVAL, self._on_log_flush)
+
+    def _on_hello_timer(self) -> None:
+        self._hello_timer = None
+
+        if self.active:
+            self.send_bpdus()
 
     def send_bpdus(self):
         """
@@ -122,18 +493,88 @@ class Bridge:
         BPDU that says this networks believes its the root; obviously, this
         will need to be updated.
         """
-        self.last_sent_bpdu = time.time()
+        self.last_sent_bpdu = self.clock()
+
+        template = self._get_bpdu_template()
 
         for port in self.ports:
-            port.send_bpdu(bridge_id=self.identity, bpdu=self.root_bpdu)
+            if self.rapid is None:
+                port.send_bpdu(bridge_id=self.identity, bpdu=self.root_bpdu, template=template)
+            elif self.rapid.sends_hello(port):
+                port.send_bpdu(bridge_id=self.identity, bpdu=self.root_bpdu, template=template,
+                               flags=self.rapid.flags_for(port))
+
+        # every transmission restarts the hello interval
+        if self.reactor is not None:
+            if self._hello_timer is not None:
+                self._hello_timer.cancel()
+
+            self._hello_timer = self.reactor.timers.schedule(self.hello_interval, self._on_hello_timer)
+
+    def send_bpdu(self, port: Port, flags: int = 0) -> None:
+        """
+        Send the current root BPDU on a single port (e.g. a rapid spanning tree agreement)
+        """
+        port.send_bpdu(bridge_id=self.identity, bpdu=self.root_bpdu, template=self._get_bpdu_template(), flags=flags)
+
+    def _get_bpdu_template(self) -> Union[FrameTemplate, BinaryBPDUTemplate]:
+        """
+        :return: The encoding of the current root BPDU with the per-port 'msg_id' and 'message.port' left open
+        """
+        if self._bpdu_template is None or self._bpdu_template[0] != self.root_bpdu:
+            # the port and msg_id are placeholders that are patched in by every port
+            packet = Packet(source=self.identity, dest=ALL_LANS_ID, msg_id=0,
+                            type=MessageType.BridgeProtocolDataUnit,
+                            message=self.root_bpdu.replace(id=self.identity, port=0))
+
+            if self.binary_bpdus:
+                template = BinaryBPDUTemplate(packet)
+            elif self.rapid is not None:
+                template = FrameTemplate(packet, 'msg_id', 'message.port', 'message.flags')
+            else:
+                template = FrameTemplate(packet, 'msg_id', 'message.port')
+
+            self._bpdu_template = (self.root_bpdu, template)
+
+        return self._bpdu_template[1]
 
-    def _all_port_bpdus_pairs(self) -> Generator[Tuple[int, BPDU], None, None]:
+    def broadcast(self, data: bytes, ingress_port: Port) -> None:
         """
-        :return: Generator of all the port, BPDU pairs
+        Send already encoded bytes on every active port other than the one they were received on
         """
         for port in self.ports:
-            for bpdu in port.seen_bpdus:
-                yield (port.index, bpdu)
+            if port != ingress_port and (port.status == PortStatus.DESIGNATED or port.index == self.root_port):
+                port.send_bytes(data)
+                port.counters.broadcasts_out += 1
+
+    def counters_snapshot(self) -> Dict[str, Any]:
+        """
+        :return: A JSON compatible snapshot of every counter of this bridge and its ports
+        """
+        return {
+            'bridge': self.identity,
+            'root': self.root_bpdu.root_id if self.active else None,
+            'root_port': self.root_port if self.active else None,
+            'root_changes': self.counters.root_changes,
+            'learning_hits': self.counters.learning_hits,
+            'learning_misses': self.counters.learning_misses,
+            'forwarding_table_size': len(self.forwarding_table),
+            'ingress_batches': {
+                'count': self.ingress_stats.batch_count,
+                'mean_depth': self.ingress_stats.mean_depth,
+                'max_depth': self.ingress_stats.max_depth,
+            },
+            'hold_queue': {
+                'depth': len(self.hold_queue),
+                'held': self.counters.held_frames,
+                'released': self.counters.hold_released,
+                'aged_out': self.counters.hold_aged_out,
+                'overflows': self.counters.hold_overflows,
+            },
+            'loop_latency': self.counters.loop_latency.snapshot(),
+            'ports': [{'index': port.index, 'status': port.status.name, **port.counters.snapshot()}
+                      for port in self.ports],
+        }
 
     def calculated_root_changed(self) -> bool:
         """
@@ -149,55 +590,56 @@ class Bridge:
             self.root_bpdu = new_bpdu
             return different
 
-        # print(f"DBG: Sorted pairs {list(self._all_port_bpdus_pairs())}")
-        sorted_bpdus_pairs = sorted(self._all_port_bpdus_pairs(), key=lambda port_bpdu_pair: port_bpdu_pair[1])
+        def update_root(new_port: int, new_bpdu: BPDU) -> bool:
+            # both have to be updated, so they can't be short-circuited
+            port_different = update_port(new_port)
+            bpdu_different = update_bpdu(new_bpdu)
+            return port_different or bpdu_different
+
+        best_bpdu_port_pair = self._best_root_candidate()
+
+        # the BPDU the root was learned from is gone if the best candidate is worse than it
+        if self.root_port not in (self.DEFAULT_ROOT_PORT, sentinel.NotSet) and \
+                (best_bpdu_port_pair is None or self._elected_bpdu(best_bpdu_port_pair[0]) > self.root_bpdu):
+            self.hold_down_root(self.root_bpdu.replace(cost=self.root_bpdu.cost - 1))
+            best_bpdu_port_pair = self._best_root_candidate()
 
         # if there is nothing present, this is the root
-        if len(sorted_bpdus_pairs) == 0:
-            return update_port(new_port=self.DEFAULT_ROOT_PORT) or update_bpdu(new_bpdu=self.DEFAULT_ROOT_BPDU)
+        if best_bpdu_port_pair is None:
+            return update_root(new_port=self.DEFAULT_ROOT_PORT, new_bpdu=self.DEFAULT_ROOT_BPDU)
 
-        possible_root_port_index, possible_root_bpdu = sorted_bpdus_pairs[0]
+        possible_root_bpdu, possible_root_port_index = best_bpdu_port_pair
 
         # if the best bpdu lists this as the root
         if possible_root_bpdu.root == self.identity:
-            return update_port(new_port=self.DEFAULT_ROOT_PORT) or update_bpdu(new_bpdu=self.DEFAULT_ROOT_BPDU)
+            return update_root(new_port=self.DEFAULT_ROOT_PORT, new_bpdu=self.DEFAULT_ROOT_BPDU)
 
-        cost_adjusted_bpdu = possible_root_bpdu.replace(cost=possible_root_bpdu.cost + 1)
+        cost_adjusted_bpdu = self._elected_bpdu(possible_root_bpdu)
 
-        # if the possible is better than the existing root
-        if cost_adjusted_bpdu < self.root_bpdu:
-            possible_root_port = self.ports[possible_root_port_index]
-            if possible_root_port.status != PortStatus.DISABLED:
-                # this should always be the case as this port has NOT sent the best BPDU on the LAN
-                raise RuntimeError(f"Some reason the port {possible_root_port_index} not disabled")
+        # if no live BPDU has a better root than this bridge (e.g. the BPDUs of the root expired), this is the root
+        if not cost_adjusted_bpdu < self.DEFAULT_ROOT_BPDU:
+            return update_root(new_port=self.DEFAULT_ROOT_PORT, new_bpdu=self.DEFAULT_ROOT_BPDU)
 
-            new_bridge_bpdu = cost_adjusted_bpdu.replace(id=self.identity)
-            return update_port(new_port=possible_root_port_index) or update_bpdu(new_bpdu=new_bridge_bpdu)
+        # the best live BPDU is the root, whether it is better than the existing root or the BPDU the existing
+        # root was learned from expired. The port it was received on may still be DESIGNATED (e.g. this bridge
+        # announced itself as the root after the old root died), the root port forwards regardless of its status
+        # and the status is recalculated against the new root BPDU once it is sent
+        return update_root(new_port=possible_root_port_index, new_bpdu=cost_adjusted_bpdu)
 
-        return False
-
-    def calculate_forwarding_table(self) -> Dict[str, Port]:
+    def _elected_bpdu(self, received_bpdu: BPDU) -> BPDU:
         """
-        :return: A new forwarding table from the enabled Ports
+        :return: The root BPDU of this bridge if the received BPDU is elected
         """
-        forwarding_table: Dict[str, Port] = {}
-
-        for p in self.ports:
-            if p.status == PortStatus.DISABLED and p.index != self.root_port:
-                continue
-
-            for bpdu in p.seen_bpdus:
-                if bpdu.source_bridge_id in forwarding_table:
-                    # print(f"Port# {p.index} tried to add {bpdu.source_bridge_id} again even though it already exists "
-                    #       f"under {forwarding_table[bpdu.source_bridge_id].index}", flush=True)
-
-                    # ports are iterated through... Smaller port wins
-                    continue
-
-                forwarding_table[bpdu.source_bridge_id] = p
-
-        return forwarding_table
-
+        return received_bpdu.replace(id=self.identity, cost=received_bpdu.cost + 1)
 
+    def _best_root_candidate(self) -> Optional[Tuple[BPDU, int]]:
+        """
+        :return: The best BPDU seen on any port and the index of its port, skipping the echoes of a held down root
+        """
+        best_bpdu_port_pair = self.root_candidates.peek()
 
+        if best_bpdu_port_pair is not None and self._is_held_down(best_bpdu_port_pair[0]):
+            best_bpdu_port_pair = min(((bpdu, port.index) for port in self.ports for bpdu in port.seen_bpdus
+                                       if not self._is_held_down(bpdu)), default=None)
 
+        return best_bpdu_port_pair
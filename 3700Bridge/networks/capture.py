@@ -0,0 +1,100 @@
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Tuple
+
+import json
+import time
+import struct
+
+from enum import IntEnum
+
+from networks.constants import MESSAGE_ENCODING, CAPTURE_BUFFER_SIZE
+
+
+# Every capture starts with the magic bytes and a length prefixed JSON header
+CAPTURE_MAGIC: bytes = b'BRCAP\x01'
+
+_HEADER_LENGTH = struct.Struct('!H')
+# timestamp, direction, port index and datagram length, followed by the datagram bytes
+_RECORD = struct.Struct('!dBHH')
+
+
+class CaptureDirection(IntEnum):
+    Ingress = 0
+    Egress = 1
+
+
+class CaptureRecord:
+    """
+    Representation of a datagram received or sent on a port of a captured bridge
+    """
+    __slots__ = ('time', 'direction', 'port', 'data')
+
+    def __init__(self, time: float, direction: CaptureDirection, port: int, data: bytes):
+        self.time = time
+        self.direction = direction
+        self.port = port
+        self.data = data
+
+
+class CaptureWriter:
+    """
+    Append every datagram a bridge receives or sends to a capture file.
+
+    Records are buffered and only written out by flush (the bridge flushes with its log),
+    so capturing adds a single struct pack per datagram to the hot path
+    """
+    def __init__(self, path: str, identity: str, port_count: int, clock: Callable[[], float] = time.time):
+        """
+        :param identity: Bridge id of the captured bridge, kept in the header for the replay
+        :param port_count: Number of ports of the captured bridge
+        """
+        self.clock = clock
+
+        self._file: BinaryIO = open(path, 'wb', buffering=CAPTURE_BUFFER_SIZE)
+        self._file.write(CAPTURE_MAGIC)
+
+        encoded_header = json.dumps({"identity": identity, "port_count": port_count,
+                                     "start_time": self.clock()}).encode(MESSAGE_ENCODING)
+        self._file.write(_HEADER_LENGTH.pack(len(encoded_header)) + encoded_header)
+
+    def record(self, direction: CaptureDirection, port_index: int, data: bytes) -> None:
+        self._file.write(_RECORD.pack(self.clock(), direction, port_index, len(data)))
+        self._file.write(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_capture(path: str) -> Tuple[Dict[str, Any], Iterator[CaptureRecord]]:
+    """
+    :return: The header of a capture file and an iterator over its records in the order they were captured
+    """
+    capture_file = open(path, 'rb')
+
+    if capture_file.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+        capture_file.close()
+        raise ValueError(f"{path} is not a capture file")
+
+    header_length, = _HEADER_LENGTH.unpack(capture_file.read(_HEADER_LENGTH.size))
+    header = json.loads(capture_file.read(header_length))
+
+    def records() -> Iterator[CaptureRecord]:
+        with capture_file:
+            while True:
+                packed_record = capture_file.read(_RECORD.size)
+
+                # a bridge killed mid write leaves a truncated last record
+                if len(packed_record) < _RECORD.size:
+                    return
+
+                timestamp, direction, port_index, length = _RECORD.unpack(packed_record)
+                data = capture_file.read(length)
+
+                if len(data) < length:
+                    return
+
+                yield CaptureRecord(timestamp, CaptureDirection(direction), port_index, data)
+
+    return header, records()
@@ -0,0 +1,137 @@
+from typing import Dict
+
+import json
+import struct
+
+from networks.packet import Packet, BPDU, MessageType
+
+from networks.constants import MESSAGE_ENCODING
+
+
+# The first byte of a frame tells the encodings apart: JSON frames always start with '{'
+JSON_DISCRIMINATOR: int = ord('{')
+BINARY_BPDU_DISCRIMINATOR: int = 0x01
+BINARY_DATA_DISCRIMINATOR: int = 0x02
+
+BRIDGE_ID_SIZE: int = 4
+
+# discriminator, source, dest, msg_id
+_HEADER = struct.Struct('!B4s4sI')
+# header followed by the BPDU root, cost, port, id and flags
+_BPDU_FRAME = struct.Struct('!B4s4sI4sIH4sB')
+
+
+def is_binary(data: bytes) -> bool:
+    """
+    :return: True if the datagram uses the binary encoding, otherwise False (JSON)
+    """
+    return len(data) > 0 and data[0] != JSON_DISCRIMINATOR
+
+
+def _pack_id(identity: str) -> bytes:
+    packed = identity.encode(MESSAGE_ENCODING)
+
+    if len(packed) != BRIDGE_ID_SIZE:
+        raise ValueError(f"Binary frames require {BRIDGE_ID_SIZE} byte ids, received '{identity}'")
+
+    return packed
+
+
+def _unpack_id(packed: bytes) -> str:
+    return packed.decode(MESSAGE_ENCODING)
+
+
+def encode_bpdu_packet(source: str, dest: str, msg_id: int, bpdu: BPDU) -> bytes:
+    """
+    :return: The fixed size binary frame of a BPDU packet
+    """
+    return _BPDU_FRAME.pack(BINARY_BPDU_DISCRIMINATOR, _pack_id(source), _pack_id(dest), msg_id,
+                            _pack_id(bpdu.root), bpdu.cost, bpdu.port, _pack_id(bpdu.id), bpdu.flags)
+
+
+def _unpack_bpdu(root: bytes, cost: int, port: int, bridge_id: bytes, flags: int) -> BPDU:
+    bpdu = BPDU(root=_unpack_id(root), cost=cost, port=port, id=_unpack_id(bridge_id))
+
+    return bpdu.with_flags(flags) if flags else bpdu
+
+
+def decode_bpdu(data: bytes) -> BPDU:
+    """
+    :return: The BPDU of a binary BPDU frame, without the Packet around it
+    """
+    return _unpack_bpdu(*_BPDU_FRAME.unpack(data)[4:])
+
+
+def decode_bpdu_packet(data: bytes) -> Packet:
+    """
+    :return: The Packet of a binary BPDU frame
+    """
+    _discriminator, source, dest, msg_id, *bpdu_fields = _BPDU_FRAME.unpack(data)
+
+    return Packet(source=_unpack_id(source), dest=_unpack_id(dest), msg_id=msg_id,
+                  type=MessageType.BridgeProtocolDataUnit, message=_unpack_bpdu(*bpdu_fields))
+
+
+def encode_packet(packet: Packet) -> bytes:
+    """
+    :return: The binary frame of a Packet (the message of a data packet is kept as JSON)
+    """
+    if packet.type == MessageType.BridgeProtocolDataUnit:
+        return encode_bpdu_packet(packet.source, packet.dest, packet.msg_id, packet.message)
+
+    header = _HEADER.pack(BINARY_DATA_DISCRIMINATOR, _pack_id(packet.source), _pack_id(packet.dest), packet.msg_id)
+
+    return header + json.dumps(packet.message).encode(MESSAGE_ENCODING)
+
+
+def decode_header(data: bytes) -> Dict[str, object]:
+    """
+    :return: The source, dest, msg_id and type of a binary frame without decoding its message
+    """
+    discriminator, source, dest, msg_id = _HEADER.unpack_from(data)
+
+    if discriminator == BINARY_BPDU_DISCRIMINATOR:
+        frame_type = MessageType.BridgeProtocolDataUnit
+    elif discriminator == BINARY_DATA_DISCRIMINATOR:
+        frame_type = MessageType.DataMessage
+    else:
+        raise ValueError(f"Unknown frame discriminator {discriminator}")
+
+    return {'source': _unpack_id(source), 'dest': _unpack_id(dest), 'msg_id': msg_id, 'type': frame_type}
+
+
+def decode_packet(data: bytes) -> Packet:
+    """
+    :return: The Packet of a binary frame
+    """
+    if data[0] == BINARY_BPDU_DISCRIMINATOR:
+        return decode_bpdu_packet(data)
+
+    header = decode_header(data)
+    message = json.loads(data[_HEADER.size:])
+
+    return Packet(message=message, **header)
+
+
+class BinaryBPDUTemplate:
+    """
+    Binary counterpart of FrameTemplate for the BPDUs a bridge sends on every port
+    """
+    __slots__ = ('_source', '_dest', '_root', '_cost', '_id')
+
+    def __init__(self, packet: Packet):
+        bpdu: BPDU = packet.message
+
+        self._source = _pack_id(packet.source)
+        self._dest = _pack_id(packet.dest)
+        self._root = _pack_id(bpdu.root)
+        self._cost = bpdu.cost
+        self._id = _pack_id(bpdu.id)
+
+    def render(self, values: Dict[str, int]) -> bytes:
+        """
+        :param values: The 'msg_id', 'message.port' and (optionally) 'message.flags' of the port the BPDU is sent on
+        """
+        return _BPDU_FRAME.pack(BINARY_BPDU_DISCRIMINATOR, self._source, self._dest, values['msg_id'],
+                                self._root, self._cost, values['message.port'], self._id,
+                                values.get('message.flags', 0))
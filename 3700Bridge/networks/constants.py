@@ -10,4 +10,63 @@ ALL_LANS_ID: str = "ffff"
 DEFAULT_PACKET_SIZE: int = 1500
 
 MESSAGE_SECOND_TIMEOUT: float = 0.500
+BPDU_SECOND_TIMEOUT: float = MESSAGE_SECOND_TIMEOUT * 2
+# once the BPDU the root was learned from expires, its root is only accepted at a lower cost for this long,
+# so that the echoes of the dead root announced by the bridges behind this one age out (no counting to infinity)
+ROOT_HOLD_DOWN_SECOND_INTERVAL: float = BPDU_SECOND_TIMEOUT * 3
+
+# rapid spanning tree: BPDUs age out after three missed hellos, and a proposal that isn't agreed to
+# within a few message delays starts forwarding anyway (e.g. a port with only hosts on its LAN)
+RAPID_HELLO_SECOND_INTERVAL: float = 0.250
+RAPID_BPDU_SECOND_TIMEOUT: float = RAPID_HELLO_SECOND_INTERVAL * 3
+RAPID_PROPOSAL_SECOND_TIMEOUT: float = 0.100
+RAPID_TOPOLOGY_CHANGE_SECOND_INTERVAL: float = RAPID_HELLO_SECOND_INTERVAL * 2
+# root information that travelled this many hops is dropped (bounds counting to infinity after the root dies)
+RAPID_MAX_ROOT_COST: int = 64
+
+# data frames are held while the spanning tree changes, until no root or port role changed for the
+# settle interval, and are never held for longer than the maximum age
+HOLD_QUEUE_SETTLE_SECOND_INTERVAL: float = 0.050
+HOLD_QUEUE_SECOND_MAX_AGE: float = MESSAGE_SECOND_TIMEOUT
+HOLD_QUEUE_MAX_DEPTH: int = 256
+
+# frames per second (and seconds of burst) each port may flood per kind of frame, far above the
+# traffic of the simulated hosts but far below a frame circulating in a loop
+STORM_CONTROL_BROADCAST_RATE: float = 100.0
+STORM_CONTROL_UNKNOWN_UNICAST_RATE: float = 100.0
+STORM_CONTROL_BURST_SECONDS: float = 0.5
+
+# width of a bridge id in the integer priority key of a BPDU
+BPDU_ID_KEY_BYTES: int = 8
+
+# learned hosts are forgotten after this long without a frame from them
+FORWARDING_ENTRY_TIMEOUT: float = 5.0
+FORWARDING_TABLE_MAX_SIZE: int = 4096
+
+# buffered log lines are written once the buffer is full or on this interval
+LOG_BUFFER_SIZE: int = 256
+LOG_FLUSH_SECOND_INTERVAL: float = 0.100
+
+# granularity and size of the hashed timer wheel driving the bridge timers
+TIMER_WHEEL_TICK: float = 0.010
+TIMER_WHEEL_SLOTS: int = 128
+
+# bytes of captured datagrams buffered between two flushes of the capture file
+CAPTURE_BUFFER_SIZE: int = 64 * 1024
+
+# heap size at which aged out spanning tree candidates are purged
+PRIORITY_QUEUE_COMPACT_SIZE: int = 64
+
+# maximum datagrams drained from one ready port per select wakeup (1 disables batching)
+INGRESS_BATCH_BUDGET: int = 64
 # MIN_TRUST_COUNT: int = 2
+
+# traffic and timing defaults of the benchmark simulation (matching the ./run simulator)
+BENCHMARK_PACKET_START_WAIT: float = 2.0
+BENCHMARK_PACKET_STOP_WAIT: float = 1.0
+BENCHMARK_LAN_DELAY: float = 0.010
+# how often the spanning tree state is sampled to time convergence
+BENCHMARK_SAMPLE_SECOND_INTERVAL: float = 0.010
+
+# datagrams classified per case of the per-frame microbenchmark
+MICROBENCHMARK_FRAME_COUNT: int = 100_000
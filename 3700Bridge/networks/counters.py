@@ -0,0 +1,175 @@
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
+import os
+import sys
+import json
+import socket
+
+from collections import Counter
+
+from networks.reactor import Reactor
+
+from networks.constants import MESSAGE_ENCODING
+
+
+class IngressBatchStats:
+    """
+    Counters of how many datagrams are handled per select wakeup
+    """
+    def __init__(self):
+        self.batch_count: int = 0
+        self.datagram_count: int = 0
+        self.max_depth: int = 0
+
+        # map a batch depth to the number of batches that were that deep
+        self.depth_histogram: Dict[int, int] = Counter()
+
+    @property
+    def mean_depth(self) -> float:
+        return self.datagram_count / self.batch_count if self.batch_count else 0.0
+
+    def record_batch(self, depth: int) -> None:
+        """
+        Save the number of datagrams read in a single wakeup (timeouts are not batches)
+        """
+        if depth == 0:
+            return
+
+        self.batch_count += 1
+        self.datagram_count += depth
+        self.max_depth = max(self.max_depth, depth)
+        self.depth_histogram[depth] += 1
+
+
+class PortCounters:
+    """
+    Traffic counters of a single Port
+    """
+    __slots__ = ('frames_in', 'bytes_in', 'frames_out', 'bytes_out', 'broadcasts_out', 'drops', 'storm_drops',
+                 'bpdus_in', 'bpdus_out')
+
+    def __init__(self):
+        self.frames_in: int = 0
+        self.bytes_in: int = 0
+        self.frames_out: int = 0
+        self.bytes_out: int = 0
+
+        # frames flooded out of this port and data frames received on it that were not forwarded
+        self.broadcasts_out: int = 0
+        self.drops: int = 0
+
+        # frames received on this port that storm control didn't flood
+        self.storm_drops: int = 0
+
+        self.bpdus_in: int = 0
+        self.bpdus_out: int = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class LatencyHistogram:
+    """
+    Histogram of durations in power of two microsecond buckets
+    """
+    def __init__(self):
+        self.count: int = 0
+        self.total_seconds: float = 0.0
+        self.max_seconds: float = 0.0
+
+        # map the upper bound (in microseconds) of a bucket to the number of samples in it
+        self.buckets: Dict[int, int] = Counter()
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+        microseconds = int(seconds * 1_000_000)
+        self.buckets[1 << microseconds.bit_length()] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean_us': self.total_seconds * 1_000_000 / self.count if self.count else 0.0,
+            'max_us': self.max_seconds * 1_000_000,
+            'buckets_us': {f"<{bound}": count for bound, count in sorted(self.buckets.items())},
+        }
+
+
+class BridgeCounters:
+    """
+    Counters of a Bridge that are not tied to a single Port
+    """
+    def __init__(self):
+        self.learning_hits: int = 0
+        self.learning_misses: int = 0
+        self.root_changes: int = 0
+
+        # data frames held while the spanning tree reconverged, and how they left the hold queue
+        self.held_frames: int = 0
+        self.hold_released: int = 0
+        self.hold_aged_out: int = 0
+        self.hold_overflows: int = 0
+
+        # time spent handling each wakeup of the event loop
+        self.loop_latency = LatencyHistogram()
+
+
+class CountersExporter:
+    """
+    Export counter snapshots as JSON lines, periodically to a stream and on demand to every
+    client that connects to a local UNIX socket
+    """
+    def __init__(self, reactor: Reactor, snapshot: Callable[[], Dict[str, Any]],
+                 stream: Optional[TextIO] = None, interval: Optional[float] = None,
+                 socket_path: Optional[str] = None):
+        """
+        :param snapshot: Called for every export
+        :param stream: Defaults to stderr, so the snapshots don't mix with the bridge output on stdout
+        :param interval: Seconds between the snapshots written to the stream (None disables them)
+        :param socket_path: Path of the UNIX socket answering every connection with a snapshot
+        """
+        self.reactor = reactor
+        self.snapshot = snapshot
+        self.stream = stream if stream is not None else sys.stderr
+        self.interval = interval
+
+        self._server: Optional[socket.socket] = None
+
+        if socket_path is not None:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+            self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._server.bind(socket_path)
+            self._server.listen()
+            self._server.setblocking(False)
+
+            self.reactor.register(self._server, self._on_clients_ready)
+
+        if self.interval is not None:
+            self.reactor.timers.schedule(self.interval, self._on_interval)
+
+    def encode_snapshot(self) -> str:
+        return json.dumps({'time': self.reactor.clock(), **self.snapshot()})
+
+    def _on_interval(self) -> None:
+        print(self.encode_snapshot(), file=self.stream, flush=True)
+        self.reactor.timers.schedule(self.interval, self._on_interval)
+
+    def _on_clients_ready(self, _ready_servers: List[socket.socket]) -> None:
+        try:
+            client, _address = self._server.accept()
+        except BlockingIOError:
+            return
+
+        with client:
+            client.setblocking(True)
+            client.sendall((self.encode_snapshot() + "\n").encode(MESSAGE_ENCODING))
+
+    def close(self) -> None:
+        if self._server is not None:
+            self.reactor.unregister(self._server)
+            self._server.close()
+            self._server = None
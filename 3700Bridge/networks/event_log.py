@@ -0,0 +1,112 @@
+from typing import Any, Dict, Optional, TextIO
+
+import sys
+
+from collections import Counter, deque
+from enum import Enum, IntEnum
+
+from networks.constants import LOG_BUFFER_SIZE
+
+
+class LogLevel(IntEnum):
+    DEBUG = 10  # per-frame events (the assignment's forwarding lines)
+    INFO = 20  # startup and spanning tree changes
+    WARNING = 30
+    ERROR = 40
+
+
+class EventKind(str, Enum):
+    """
+    The categories of events that are counted in summaries
+    """
+    Startup = "startup"
+    Forwarded = "forwarded"
+    Broadcast = "broadcast"
+    Dropped = "dropped"
+    PortRole = "port_role"
+    RootChange = "root_change"
+
+
+class EventLog:
+    """
+    Leveled event log that buffers lines in memory instead of flushing stdout per event.
+
+    Lines are kept in a ring buffer that is written out once it reaches the flush threshold or
+    when flush() is called (the Bridge calls it on a timer). In summary mode no lines are kept,
+    only the per-kind counters are written on every flush
+    """
+    def __init__(self, stream: Optional[TextIO] = None, level: LogLevel = LogLevel.DEBUG,
+                 buffer_size: int = LOG_BUFFER_SIZE, buffered: bool = True, summary_only: bool = False,
+                 prefix: str = ""):
+        """
+        :param prefix: Prepended to every line (e.g. to tell apart bridges sharing a stream)
+        :param buffer_size: Capacity of the ring buffer, which is also the flush threshold
+        :param buffered: False writes and flushes every line immediately (the assignment's behaviour)
+        :param summary_only: Only count the events and write the counters on flush
+        """
+        self.stream = stream if stream is not None else sys.stdout
+        self.level = level
+        self.buffered = buffered
+        self.summary_only = summary_only
+        self.prefix = prefix
+
+        self._buffer: deque = deque(maxlen=buffer_size)
+
+        # counters of every event (regardless of level) since the log was created
+        self.event_counts: Dict[EventKind, int] = Counter()
+        self._summarized_counts: Dict[EventKind, int] = Counter()
+
+    def is_enabled(self, level: LogLevel) -> bool:
+        return level >= self.level and not self.summary_only
+
+    def log(self, level: LogLevel, kind: EventKind, message: str, *args: Any) -> None:
+        """
+        Count the event and save the line if its level is enabled
+
+        :param message: %-style format string, only formatted if the line is kept
+        """
+        self.event_counts[kind] += 1
+
+        if not self.is_enabled(level):
+            return
+
+        line = self.prefix + (message % args if args else message)
+
+        if not self.buffered:
+            print(line, file=self.stream, flush=True)
+            return
+
+        self._buffer.append(line)
+
+        if len(self._buffer) == self._buffer.maxlen:
+            self.flush()
+
+    def debug(self, kind: EventKind, message: str, *args: Any) -> None:
+        self.log(LogLevel.DEBUG, kind, message, *args)
+
+    def info(self, kind: EventKind, message: str, *args: Any) -> None:
+        self.log(LogLevel.INFO, kind, message, *args)
+
+    def summary(self) -> str:
+        """
+        :return: A single line with the count of every kind of event
+        """
+        return "Summary: " + " ".join(f"{kind.value}={self.event_counts[kind]}" for kind in EventKind)
+
+    def flush(self) -> None:
+        """
+        Write out every buffered line (or the counters in summary mode) with a single flush
+        """
+        if self.summary_only:
+            if self.event_counts != self._summarized_counts:
+                self._summarized_counts = Counter(self.event_counts)
+                print(self.prefix + self.summary(), file=self.stream, flush=True)
+            return
+
+        if not self._buffer:
+            return
+
+        lines = "\n".join(self._buffer)
+        self._buffer.clear()
+
+        print(lines, file=self.stream, flush=True)
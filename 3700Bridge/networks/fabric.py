@@ -0,0 +1,193 @@
+from typing import List, Dict, Any, Optional, Tuple
+
+import sys
+import json
+import argparse
+
+from networks.bridge import Bridge
+from networks.reactor import Reactor
+from networks.counters import CountersExporter
+from networks.event_log import EventLog, LogLevel
+from networks.launch import create_ports
+
+from networks.constants import (
+    HOLD_QUEUE_SECOND_MAX_AGE, HOLD_QUEUE_MAX_DEPTH, STORM_CONTROL_BROADCAST_RATE, STORM_CONTROL_UNKNOWN_UNICAST_RATE
+)
+
+
+class Fabric:
+    """
+    Host many Bridges in a single process, all driven by one shared Reactor.
+
+    The Reactor groups the ready ports of a wakeup by the Bridge that registered them,
+    so each Bridge still handles its own ports as a single batch
+    """
+    def __init__(self, reactor: Optional[Reactor] = None, log_level: LogLevel = LogLevel.DEBUG,
+                 summary_only: bool = False, binary_bpdus: bool = False, rapid_spanning_tree: bool = False,
+                 hold_max_age: float = HOLD_QUEUE_SECOND_MAX_AGE, hold_max_depth: int = HOLD_QUEUE_MAX_DEPTH,
+                 storm_broadcast_rate: float = STORM_CONTROL_BROADCAST_RATE,
+                 storm_unknown_unicast_rate: float = STORM_CONTROL_UNKNOWN_UNICAST_RATE):
+        self.reactor = reactor if reactor is not None else Reactor()
+        self.log_level = log_level
+        self.summary_only = summary_only
+        self.binary_bpdus = binary_bpdus
+        self.rapid_spanning_tree = rapid_spanning_tree
+        self.hold_max_age = hold_max_age
+        self.hold_max_depth = hold_max_depth
+        self.storm_broadcast_rate = storm_broadcast_rate
+        self.storm_unknown_unicast_rate = storm_unknown_unicast_rate
+
+        self.bridges: Dict[str, Bridge] = {}
+
+    def add_bridge(self, identity: str, port_numbers: List[int],
+                   start: float = 0.0, stop: Optional[float] = None) -> Bridge:
+        """
+        Create a Bridge on the provided LAN ports that is started and (optionally) stopped
+        the provided number of seconds after the fabric starts running
+        """
+        log = EventLog(level=self.log_level, summary_only=self.summary_only, prefix=f"[{identity}] ")
+        bridge = Bridge(identity=identity, ports=create_ports(port_numbers), log=log, clock=self.reactor.clock,
+                        binary_bpdus=self.binary_bpdus, rapid_spanning_tree=self.rapid_spanning_tree,
+                        hold_max_age=self.hold_max_age, hold_max_depth=self.hold_max_depth,
+                        storm_broadcast_rate=self.storm_broadcast_rate,
+                        storm_unknown_unicast_rate=self.storm_unknown_unicast_rate)
+
+        self.bridges[identity] = bridge
+
+        self.reactor.timers.schedule(start, lambda: self._start_bridge(identity))
+
+        if stop is not None:
+            self.reactor.timers.schedule(stop, lambda: self.remove_bridge(identity))
+
+        return bridge
+
+    def _start_bridge(self, identity: str) -> None:
+        # a bridge can be removed before its start time
+        if identity in self.bridges:
+            self.bridges[identity].start(self.reactor)
+
+    def remove_bridge(self, identity: str) -> None:
+        """
+        Stop a Bridge and close its sockets, as if its process had been killed
+        """
+        bridge = self.bridges.pop(identity, None)
+
+        if bridge is None:
+            return
+
+        bridge.stop()
+
+        for port in bridge.ports:
+            port.socket.close()
+
+    def counters_snapshot(self) -> Dict[str, Any]:
+        """
+        :return: The counter snapshots of every running Bridge
+        """
+        return {'bridges': [bridge.counters_snapshot() for bridge in self.bridges.values()]}
+
+    def run(self, lifetime: Optional[float] = None) -> None:
+        """
+        Run every Bridge until the lifetime has passed (or forever)
+        """
+        if lifetime is not None:
+            self.reactor.timers.schedule(lifetime, self.reactor.stop)
+
+        self.reactor.run()
+
+        for identity in list(self.bridges):
+            self.remove_bridge(identity)
+
+
+def load_topology(fabric: Fabric, topology: Dict[str, Any], lan_ports: Dict[int, int]) -> None:
+    """
+    Add every bridge of a topology in the format of configs/*.conf
+
+    :param lan_ports: map every LAN id of the topology to the UDP port of that LAN
+    """
+    for bridge_config in topology["bridges"]:
+        missing_lans = [lan for lan in bridge_config["lans"] if lan not in lan_ports]
+        if missing_lans:
+            raise ValueError(f"No UDP port provided for LANs {missing_lans} of bridge {bridge_config['id']}")
+
+        fabric.add_bridge(identity=bridge_config["id"],
+                          port_numbers=[lan_ports[lan] for lan in bridge_config["lans"]],
+                          start=bridge_config.get("start", 0), stop=bridge_config.get("stop"))
+
+
+def parse_lan_port(mapping: str) -> Tuple[int, int]:
+    """
+    :return: The (LAN id, UDP port) pair of a 'LAN=PORT' argument
+    """
+    lan, port = mapping.split('=')
+    return int(lan), int(port)
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Generate parser for commandline arguments:
+
+    topology: configuration file in the format of configs/*.conf
+    lan_port: LAN=PORT mapping of a LAN id to the UDP port of that LAN (or a "lan_ports" object in the topology)
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='CS 3700 bridge fabric')
+    parser.add_argument('topology', type=str, help="Topology file (e.g., configs/advanced-3.conf)")
+    parser.add_argument('--lan-port', dest='lan_ports', metavar='LAN=PORT', type=parse_lan_port, action='append',
+                        default=[], help="UDP port of a LAN of the topology")
+    parser.add_argument('--binary-bpdus', action='store_true',
+                        help="Send BPDUs in the compact binary encoding")
+    parser.add_argument('--rapid-spanning-tree', action='store_true',
+                        help="Converge with rapid spanning tree proposals and agreements")
+    parser.add_argument('--hold-max-age', type=float, default=HOLD_QUEUE_SECOND_MAX_AGE,
+                        help="Seconds a data frame is held at most while the spanning tree reconverges")
+    parser.add_argument('--hold-max-depth', type=int, default=HOLD_QUEUE_MAX_DEPTH,
+                        help="Data frames held at once while the spanning tree reconverges (0 forwards at once)")
+    parser.add_argument('--storm-broadcast-rate', type=float, default=STORM_CONTROL_BROADCAST_RATE,
+                        help="Broadcast frames flooded per second per port at most (0 disables the limit)")
+    parser.add_argument('--storm-unknown-unicast-rate', type=float, default=STORM_CONTROL_UNKNOWN_UNICAST_RATE,
+                        help="Unknown unicast frames flooded per second per port at most (0 disables the limit)")
+    parser.add_argument('--log-level', type=str.upper, default=LogLevel.DEBUG.name, choices=LogLevel.__members__,
+                        help="Lowest level of the logged events")
+    parser.add_argument('--log-summary', action='store_true',
+                        help="Only log periodic counters of the events instead of every line")
+    parser.add_argument('--ignore-lifetime', action='store_true',
+                        help="Keep running after the lifetime of the topology")
+    parser.add_argument('--counters-interval', type=float, default=None,
+                        help="Seconds between the JSON counter snapshots written to stderr")
+    parser.add_argument('--counters-socket', type=str, default=None,
+                        help="UNIX socket path that answers every connection with a JSON counter snapshot")
+
+    return parser
+
+
+def main() -> None:
+    parser = create_parser()
+    args: argparse.Namespace = parser.parse_args(sys.argv[1:])
+
+    with open(args.topology) as topology_file:
+        topology = json.load(topology_file)
+
+    lan_ports = {int(lan): port for lan, port in topology.get("lan_ports", {}).items()}
+    lan_ports.update(args.lan_ports)
+
+    fabric = Fabric(log_level=LogLevel[args.log_level], summary_only=args.log_summary,
+                    binary_bpdus=args.binary_bpdus, rapid_spanning_tree=args.rapid_spanning_tree,
+                    hold_max_age=args.hold_max_age, hold_max_depth=args.hold_max_depth,
+                    storm_broadcast_rate=args.storm_broadcast_rate,
+                    storm_unknown_unicast_rate=args.storm_unknown_unicast_rate)
+    load_topology(fabric, topology, lan_ports)
+
+    exporter: Optional[CountersExporter] = None
+    if args.counters_interval is not None or args.counters_socket is not None:
+        exporter = CountersExporter(fabric.reactor, fabric.counters_snapshot, interval=args.counters_interval,
+                                    socket_path=args.counters_socket)
+
+    try:
+        fabric.run(lifetime=None if args.ignore_lifetime else topology.get("lifetime"))
+    finally:
+        if exporter is not None:
+            exporter.close()
+
+
+if __name__ == '__main__':
+    main()
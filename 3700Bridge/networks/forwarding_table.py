@@ -0,0 +1,120 @@
+from typing import Dict, Iterable, Iterator, Optional, Set
+
+from collections import OrderedDict
+
+from networks.port import Port
+
+from networks.constants import FORWARDING_ENTRY_TIMEOUT, FORWARDING_TABLE_MAX_SIZE
+
+
+class ForwardingEntry:
+    """
+    The port an address was learned on and when it was last seen there
+    """
+    __slots__ = ('port', 'last_seen_time')
+
+    def __init__(self, port: Port, last_seen_time: float):
+        self.port = port
+        self.last_seen_time = last_seen_time
+
+
+class ForwardingTable:
+    """
+    Learned mapping of host addresses to the port they can be reached on.
+
+    Entries are ordered from least to most recently seen, which serves both the aging
+    (expire from the stale end) and the LRU eviction once the table is full
+    """
+    def __init__(self, timeout: float = FORWARDING_ENTRY_TIMEOUT, max_size: int = FORWARDING_TABLE_MAX_SIZE):
+        self.timeout = timeout
+        self.max_size = max_size
+
+        self._entries: 'OrderedDict[str, ForwardingEntry]' = OrderedDict()
+
+        # map a port to the addresses learned behind it, so invalidating a port doesn't scan the table
+        self._port_addresses: Dict[Port, Set[str]] = {}
+
+    def __contains__(self, address: str) -> bool:
+        return address in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def learn(self, address: str, port: Port, now: float) -> None:
+        """
+        Save that the address was seen on the port (a host that moved is re-learned on its new port)
+        """
+        entry = self._entries.get(address)
+
+        if entry is None:
+            self._entries[address] = ForwardingEntry(port, now)
+            self._port_addresses.setdefault(port, set()).add(address)
+
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+            return
+
+        if entry.port is not port:
+            self._port_addresses[entry.port].discard(address)
+            self._port_addresses.setdefault(port, set()).add(address)
+            entry.port = port
+
+        entry.last_seen_time = now
+        self._entries.move_to_end(address)
+
+    def lookup(self, address: str, now: float) -> Optional[Port]:
+        """
+        :return: The port the address was learned on, or None if it is unknown or expired
+        """
+        entry = self._entries.get(address)
+
+        if entry is None:
+            return None
+
+        if now - entry.last_seen_time >= self.timeout:
+            self._remove(address)
+            return None
+
+        return entry.port
+
+    def expire(self, now: float) -> int:
+        """
+        Remove every entry that hasn't been seen within the timeout
+
+        :return: The number of removed entries
+        """
+        expired_count = 0
+
+        while self._entries:
+            stalest_address, stalest_entry = next(iter(self._entries.items()))
+
+            if now - stalest_entry.last_seen_time < self.timeout:
+                break
+
+            self._remove(stalest_address)
+            expired_count += 1
+
+        return expired_count
+
+    def invalidate_ports(self, ports: Iterable[Port]) -> int:
+        """
+        Remove only the entries learned behind the provided ports (e.g. ports whose role changed)
+
+        :return: The number of removed entries
+        """
+        invalidated_count = 0
+
+        for port in ports:
+            for address in self._port_addresses.pop(port, set()):
+                del self._entries[address]
+                invalidated_count += 1
+
+        return invalidated_count
+
+    def _remove(self, address: str) -> None:
+        entry = self._entries.pop(address)
+        self._port_addresses[entry.port].discard(address)
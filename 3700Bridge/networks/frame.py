@@ -0,0 +1,120 @@
+from typing import Any, Dict, Tuple, Optional
+
+import re
+import json
+
+from networks.packet import BPDU, Packet, MessageType
+from networks import codec
+
+from networks.constants import MESSAGE_ENCODING
+
+
+class Frame:
+    """
+    Representation of a received datagram that has only been classified by its header fields.
+
+    The original datagram bytes are kept so that a data frame can be forwarded unchanged
+    instead of being deserialized into a Packet and serialized again on every egress port.
+    Only a BPDU frame keeps its decoded JSON fields, so a queued data frame holds no dicts
+    """
+    __slots__ = ('source', 'dest', 'msg_id', 'type', 'data', '_fields')
+
+    def __init__(self, source: str, dest: str, msg_id: int, type: str, data: bytes,
+                 fields: Optional[Dict[str, Any]]):
+        self.source = source
+        self.dest = dest
+        self.msg_id = msg_id
+        self.type = type
+        self.data = data
+
+        self._fields = fields
+
+    @classmethod
+    def peek(cls, data: bytes) -> 'Frame':
+        """
+        :return: A Frame built from the header fields of the provided datagram bytes
+        """
+        if codec.is_binary(data):
+            # the message of a binary frame is only decoded by to_packet
+            return cls(data=data, fields=None, **codec.decode_header(data))
+
+        fields = json.loads(data)
+        frame_type = fields['type']
+
+        return cls(source=fields['source'], dest=fields['dest'], msg_id=fields['msg_id'], type=frame_type,
+                   data=data, fields=fields if frame_type == MessageType.BridgeProtocolDataUnit else None)
+
+    @property
+    def is_bpdu(self) -> bool:
+        return self.type == MessageType.BridgeProtocolDataUnit
+
+    def to_packet(self) -> Packet:
+        """
+        :return: The fully deserialized Packet
+        """
+        if codec.is_binary(self.data):
+            return codec.decode_packet(self.data)
+
+        return Packet.deserialize(**(self._fields if self._fields is not None else json.loads(self.data)))
+
+    def to_bpdu(self) -> BPDU:
+        """
+        :return: The BPDU message of a BPDU frame, without building the Packet around it
+        """
+        if self._fields is None:
+            return codec.decode_bpdu(self.data)
+
+        return BPDU.deserialize(**self._fields['message'])
+
+    def encode(self) -> bytes:
+        """
+        :return: The unchanged datagram bytes
+        """
+        return self.data
+
+
+class FrameTemplate:
+    """
+    Representation of an encoded Packet with integer fields that are patched in per egress port.
+
+    The Packet is serialized once and split around its placeholder fields, so rendering a
+    frame for another port is only a join of the pre-encoded segments
+    """
+    __slots__ = ('_segments', '_names')
+
+    _PLACEHOLDER_MARKER: str = '\0'
+    _PLACEHOLDER_PATTERN = re.compile(r'"\\u0000([\w.]+)\\u0000"')
+
+    def __init__(self, packet: Packet, *field_paths: str):
+        """
+        :param field_paths: dotted paths of the fields to patch (e.g. 'msg_id' or 'message.port')
+        """
+        serialized = packet.serialize()
+
+        for field_path in field_paths:
+            *parent_names, field_name = field_path.split('.')
+
+            parent = serialized
+            for parent_name in parent_names:
+                parent = parent[parent_name]
+
+            parent[field_name] = f"{self._PLACEHOLDER_MARKER}{field_path}{self._PLACEHOLDER_MARKER}"
+
+        # splitting with a capture group alternates [segment, name, segment, name, ..., segment]
+        split_packet = self._PLACEHOLDER_PATTERN.split(json.dumps(serialized))
+
+        self._segments: Tuple[bytes, ...] = tuple(s.encode(MESSAGE_ENCODING) for s in split_packet[::2])
+        self._names: Tuple[str, ...] = tuple(split_packet[1::2])
+
+    def render(self, values: Dict[str, int]) -> bytes:
+        """
+        :param values: The integer value of every field path the template was built with
+        :return: The datagram bytes with the values patched in
+        """
+        rendered = [self._segments[0]]
+
+        for name, segment in zip(self._names, self._segments[1:]):
+            rendered.append(str(values[name]).encode(MESSAGE_ENCODING))
+            rendered.append(segment)
+
+        return b''.join(rendered)
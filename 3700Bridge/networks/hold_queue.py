@@ -0,0 +1,65 @@
+from typing import Deque, List, Optional, Tuple
+
+from collections import deque
+
+from networks.request_handler import ForwardingRequest
+
+from networks.constants import HOLD_QUEUE_SECOND_MAX_AGE, HOLD_QUEUE_MAX_DEPTH
+
+
+class HoldQueue:
+    """
+    Bounded FIFO of the data frames received while the spanning tree is reconverging.
+
+    Frames are handed back in arrival order once the tree is stable, or earlier once they reach the
+    maximum age or are pushed out of a full queue, so holding a frame only ever delays it
+    """
+    def __init__(self, max_age: float = HOLD_QUEUE_SECOND_MAX_AGE, max_depth: int = HOLD_QUEUE_MAX_DEPTH):
+        """
+        :param max_depth: Number of frames held at once (0 disables the queue)
+        """
+        self.max_age = max_age
+        self.max_depth = max_depth
+
+        self._requests: Deque[Tuple[float, ForwardingRequest]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._requests)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_depth > 0
+
+    @property
+    def oldest_time(self) -> Optional[float]:
+        return self._requests[0][0] if self._requests else None
+
+    def hold(self, request: ForwardingRequest, now: float) -> Optional[ForwardingRequest]:
+        """
+        :return: The oldest request if the queue overflowed, otherwise None
+        """
+        self._requests.append((now, request))
+
+        if len(self._requests) > self.max_depth:
+            return self._requests.popleft()[1]
+
+        return None
+
+    def pop_aged(self, now: float) -> List[ForwardingRequest]:
+        """
+        :return: The requests that were held for the maximum age, oldest first
+        """
+        aged_requests: List[ForwardingRequest] = []
+
+        while self._requests and now - self._requests[0][0] >= self.max_age:
+            aged_requests.append(self._requests.popleft()[1])
+
+        return aged_requests
+
+    def drain(self) -> List[ForwardingRequest]:
+        """
+        :return: Every held request, oldest first
+        """
+        requests = [request for _, request in self._requests]
+        self._requests.clear()
+        return requests
@@ -1,4 +1,4 @@
-from typing import List, Any, Tuple, Dict
+from typing import List, Any, Tuple, Dict, Optional
 
 import sys
 import argparse
@@ -7,11 +7,21 @@ from socket import socket, AF_INET, SOCK_DGRAM
 
 from networks.bridge import Bridge
 from networks.port import Port
+from networks.reactor import Reactor
+from networks.counters import CountersExporter
+from networks.capture import CaptureWriter
+from networks.event_log import EventLog, LogLevel
 
-from networks.constants import BRIDGE_ADDRESS
+from networks.constants import (
+    BRIDGE_ADDRESS, INGRESS_BATCH_BUDGET, HOLD_QUEUE_SECOND_MAX_AGE, HOLD_QUEUE_MAX_DEPTH, STORM_CONTROL_BROADCAST_RATE,
+    STORM_CONTROL_UNKNOWN_UNICAST_RATE
+)
 
 
-def launch_bridge(identity: str, port_numbers: List[int]) -> None:
+def create_ports(port_numbers: List[int]) -> List[Port]:
+    """
+    :return: A Port with its own bound UDP socket for every LAN port number
+    """
     ports: List[Port] = []
 
     for index, port_num in enumerate(port_numbers):
@@ -19,8 +29,38 @@ def launch_bridge(identity: str, port_numbers: List[int]) -> None:
         port_socket.bind(BRIDGE_ADDRESS)
         ports.append(Port(index, port_num, port_socket))
 
-    bridge = Bridge(identity=identity, ports=ports)
-    bridge.launch()
+    return ports
+
+
+def launch_bridge(identity: str, port_numbers: List[int], raw_forwarding: bool = True,
+                  ingress_budget: int = INGRESS_BATCH_BUDGET, log: Optional[EventLog] = None,
+                  binary_bpdus: bool = False, counters_interval: Optional[float] = None,
+                  counters_socket: Optional[str] = None, rapid_spanning_tree: bool = False,
+                  hold_max_age: float = HOLD_QUEUE_SECOND_MAX_AGE, hold_max_depth: int = HOLD_QUEUE_MAX_DEPTH,
+                  storm_broadcast_rate: float = STORM_CONTROL_BROADCAST_RATE,
+                  storm_unknown_unicast_rate: float = STORM_CONTROL_UNKNOWN_UNICAST_RATE,
+                  capture_path: Optional[str] = None) -> None:
+    ports = create_ports(port_numbers)
+    capture = CaptureWriter(capture_path, identity, len(ports)) if capture_path is not None else None
+
+    bridge = Bridge(identity=identity, ports=ports, raw_forwarding=raw_forwarding, ingress_budget=ingress_budget,
+                    log=log, binary_bpdus=binary_bpdus, rapid_spanning_tree=rapid_spanning_tree,
+                    hold_max_age=hold_max_age, hold_max_depth=hold_max_depth, storm_broadcast_rate=storm_broadcast_rate,
+                    storm_unknown_unicast_rate=storm_unknown_unicast_rate, capture=capture)
+
+    if counters_interval is None and counters_socket is None:
+        bridge.launch()
+        return
+
+    reactor = Reactor(clock=bridge.clock)
+    bridge.start(reactor)
+
+    exporter = CountersExporter(reactor, bridge.counters_snapshot, interval=counters_interval,
+                                socket_path=counters_socket)
+    try:
+        reactor.run()
+    finally:
+        exporter.close()
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -33,6 +73,34 @@ def create_parser() -> argparse.ArgumentParser:
     parser: argparse.ArgumentParser = argparse.ArgumentParser(description='CS 3700 networks')
     parser.add_argument('bridge_id', type=str, help="Bridge ID (e.g., 02ab)")
     parser.add_argument('lan_ports', metavar='lan_port', type=int, nargs='+', help="UDP ports to connect to LANs")
+    parser.add_argument('--packet-forwarding', dest='raw_forwarding', action='store_false',
+                        help="Deserialize and re-serialize every data frame instead of forwarding the received bytes")
+    parser.add_argument('--ingress-budget', type=int, default=INGRESS_BATCH_BUDGET,
+                        help="Maximum datagrams read from a ready port per wakeup (1 disables batching)")
+    parser.add_argument('--binary-bpdus', action='store_true',
+                        help="Send BPDUs in the compact binary encoding (not understood by the ./run simulator)")
+    parser.add_argument('--rapid-spanning-tree', action='store_true',
+                        help="Converge with rapid spanning tree proposals and agreements (every bridge has to use it)")
+    parser.add_argument('--hold-max-age', type=float, default=HOLD_QUEUE_SECOND_MAX_AGE,
+                        help="Seconds a data frame is held at most while the spanning tree reconverges")
+    parser.add_argument('--hold-max-depth', type=int, default=HOLD_QUEUE_MAX_DEPTH,
+                        help="Data frames held at once while the spanning tree reconverges (0 forwards at once)")
+    parser.add_argument('--storm-broadcast-rate', type=float, default=STORM_CONTROL_BROADCAST_RATE,
+                        help="Broadcast frames flooded per second per port at most (0 disables the limit)")
+    parser.add_argument('--storm-unknown-unicast-rate', type=float, default=STORM_CONTROL_UNKNOWN_UNICAST_RATE,
+                        help="Unknown unicast frames flooded per second per port at most (0 disables the limit)")
+    parser.add_argument('--log-level', type=str.upper, default=LogLevel.DEBUG.name, choices=LogLevel.__members__,
+                        help="Lowest level of the logged events (DEBUG includes every forwarded frame)")
+    parser.add_argument('--log-unbuffered', action='store_true',
+                        help="Write and flush every log line immediately")
+    parser.add_argument('--log-summary', action='store_true',
+                        help="Only log periodic counters of the events instead of every line")
+    parser.add_argument('--counters-interval', type=float, default=None,
+                        help="Seconds between the JSON counter snapshots written to stderr")
+    parser.add_argument('--counters-socket', type=str, default=None,
+                        help="UNIX socket path that answers every connection with a JSON counter snapshot")
+    parser.add_argument('--capture', dest='capture_path', type=str, default=None,
+                        help="File that records every datagram received or sent (replayed by networks.replay)")
 
     return parser
 
@@ -41,7 +109,14 @@ def main() -> None:
     parser = create_parser()
     args: argparse.Namespace = parser.parse_args(sys.argv[1:])
 
-    launch_bridge(identity=args.bridge_id, port_numbers=args.lan_ports)
+    log = EventLog(level=LogLevel[args.log_level], buffered=not args.log_unbuffered, summary_only=args.log_summary)
+
+    launch_bridge(identity=args.bridge_id, port_numbers=args.lan_ports, raw_forwarding=args.raw_forwarding,
+                  ingress_budget=args.ingress_budget, log=log, binary_bpdus=args.binary_bpdus,
+                  counters_interval=args.counters_interval, counters_socket=args.counters_socket,
+                  rapid_spanning_tree=args.rapid_spanning_tree, hold_max_age=args.hold_max_age,
+                  hold_max_depth=args.hold_max_depth, storm_broadcast_rate=args.storm_broadcast_rate,
+                  storm_unknown_unicast_rate=args.storm_unknown_unicast_rate, capture_path=args.capture_path)
 
     # If the output isn't as expected:
     # print(stuff, flush=True)
@@ -0,0 +1,111 @@
+from typing import List, Dict, Any, Callable, Tuple
+
+import io
+import gc
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+from networks.bridge import Bridge
+from networks.port import Port
+from networks.packet import BPDU, Packet, MessageType
+from networks.event_log import EventLog
+from networks import codec
+
+from networks.constants import ALL_LANS_ID, MICROBENCHMARK_FRAME_COUNT
+
+
+def _datagrams() -> Dict[str, Tuple[bytes, bool]]:
+    """
+    :return: Map a case name to a received datagram and whether it is classified with raw forwarding
+    """
+    data_packet = Packet(source="28aa", dest="97bf", msg_id=7, type=MessageType.DataMessage,
+                         message={"data": f"{7:032x}"})
+    bpdu_packet = Packet(source="92b4", dest=ALL_LANS_ID, msg_id=7, type=MessageType.BridgeProtocolDataUnit,
+                         message=BPDU(id="92b4", root="02a1", cost=3, port=2))
+
+    return {
+        "data": (data_packet.encode(), True),
+        "data-deserialized": (data_packet.encode(), False),
+        "bpdu": (bpdu_packet.encode(), True),
+        "bpdu-binary": (codec.encode_packet(bpdu_packet), True),
+    }
+
+
+def measure(classify: Callable[[], Any], frame_count: int) -> Dict[str, float]:
+    """
+    :return: The time, the memory blocks and bytes still allocated by every classified frame
+             (as if the frames were queued) and the young generation collections they triggered
+    """
+    requests: List[Any] = []
+
+    gc.collect()
+    collections_before = gc.get_stats()[0]['collections']
+    start = time.perf_counter()
+
+    for _ in range(frame_count):
+        requests.append(classify())
+
+    elapsed = time.perf_counter() - start
+    collections = gc.get_stats()[0]['collections'] - collections_before
+
+    requests.clear()
+    gc.collect()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+
+    for _ in range(frame_count):
+        requests.append(classify())
+
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    differences = after.compare_to(before, 'filename')
+
+    return {
+        "ns_per_frame": elapsed * 1_000_000_000 / frame_count,
+        "blocks_per_frame": sum(d.count_diff for d in differences) / frame_count,
+        "bytes_per_frame": sum(d.size_diff for d in differences) / frame_count,
+        "gen0_collections_per_1000_frames": collections * 1000 / frame_count,
+    }
+
+
+def run(frame_count: int = MICROBENCHMARK_FRAME_COUNT) -> Dict[str, Dict[str, float]]:
+    """
+    Classify the same received datagram over and over, the way a bridge turns every datagram into a request
+
+    :return: The measurements of every case
+    """
+    results: Dict[str, Dict[str, float]] = {}
+
+    for name, (datagram, raw_forwarding) in _datagrams().items():
+        # the datagrams never touch the socket of the port (and a budget of one leaves it alone)
+        port = Port(0, 0, None)
+        bridge = Bridge(identity="92b4", ports=[port], raw_forwarding=raw_forwarding, ingress_budget=1,
+                        log=EventLog(stream=io.StringIO()))
+
+        results[name] = measure(lambda: bridge._classify_datagram(port, datagram), frame_count)
+
+    return results
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='CS 3700 per-frame microbenchmark')
+    parser.add_argument('--frames', type=int, default=MICROBENCHMARK_FRAME_COUNT,
+                        help="Datagrams classified per case")
+
+    return parser
+
+
+def main() -> None:
+    parser = create_parser()
+    args: argparse.Namespace = parser.parse_args(sys.argv[1:])
+
+    print(json.dumps({"frames": args.frames, "results": run(args.frames)}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,20 @@
-from typing import Any, Tuple
+from typing import Any, Optional, Tuple, Union
+
+import json
+import dataclasses
 
 from dataclasses import dataclass
-from enum import Enum
+from enum import Enum, IntFlag
 
 from networks.utils import Replaceable, Deserializable, IncrementallyDeserialize, Serializable
 
+from networks.constants import MESSAGE_ENCODING, BPDU_ID_KEY_BYTES
+
+
+# the priority key of BPDU fields that don't fit in the integer key: (root, cost, (0, 0) for a missing port
+# or (1, port), id)
+_TupleKey = Tuple[str, int, Tuple[int, int], str]
+
 
 class MessageType(str, Enum):
     """
@@ -14,16 +24,42 @@ class MessageType(str, Enum):
     DataMessage = "data"
 
 
-@dataclass(frozen=True, order=True)
+class BPDUFlags(IntFlag):
+    """
+    Rapid spanning tree flags of a BPDU (the bit positions of the 802.1w flags octet)
+    """
+    TopologyChange = 0x01
+    Proposal = 0x02
+    # sent by a root, alternate or backup port (802.1w encodes the full role in bits 2 and 3), so the
+    # BPDU only carries flags and is not a path to the root
+    NonDesignated = 0x04
+    Agreement = 0x40
+
+
+@dataclass(frozen=True, eq=False)
 class BPDU(Replaceable, Serializable, Deserializable):
     """
     Representation of a Bridge Protocol Data Unit as defined in https://3700.network/docs/projects/bridge/
+
+    BPDUs are ordered by (root, cost, port, id) like the fields of an ordered dataclass, but every
+    comparison uses a single integer key that packs those fields and is computed once per BPDU.
+    Ids wider than the integer key, and ports or costs that don't fit in their bits, fall back to a (slower)
+    tuple of the fields.
+
+    The rapid spanning tree flags are not a field: they are only sent (and serialized) when set and
+    never take part in comparisons
     """
+    __slots__ = ('root', 'cost', 'port', 'id', '_key', 'flags')
+
     root: str
     cost: int
     port: int
     id: str
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, '_key', _bpdu_key(self.root, self.cost, self.port, self.id))
+        object.__setattr__(self, 'flags', 0)
+
     @property
     def source_bridge_id(self):
         return self.id
@@ -36,22 +72,190 @@ class BPDU(Replaceable, Serializable, Deserializable):
     def root_id(self):
         return self.root
 
-#     def __cmp__(self, other: 'BPDU'):
-#         return extract_bpdu_tuple(self).__cmp__(extract_bpdu_tuple(other))
-#
-#     def __lt__(self, other: 'BPDU'):
-#         return extract_bpdu_tuple(self) < extract_bpdu_tuple(other)
-#
-#
-# def extract_bpdu_tuple(bpdu: BPDU) -> Tuple[str, int, str, int]:
-#     return bpdu.root_id, bpdu.cost, bpdu.source_bridge_id, bpdu.source_bridge_port
+    @property
+    def priority_key(self) -> Union[int, _TupleKey]:
+        return self._key
+
+    def _tuple_keys(self, other: 'BPDU') -> Tuple[_TupleKey, _TupleKey]:
+        """
+        :return: The tuple keys of this and another BPDU, for comparing an integer key with a tuple key
+        """
+        return _tuple_key(self.root, self.cost, self.port, self.id), _tuple_key(other.root, other.cost,
+                                                                                other.port, other.id)
+
+    def with_flags(self, flags: int) -> 'BPDU':
+        """
+        :return: An equal BPDU carrying the provided BPDUFlags
+        """
+        return _new_bpdu(self.root, self.cost, self.port, self.id, self._key, int(flags))
+
+    def serialize(self) -> Any:
+        serialized = super().serialize()
+
+        if self.flags:
+            serialized['flags'] = self.flags
+
+        return serialized
+
+    @classmethod
+    def deserialize(cls, **json_kwargs) -> 'BPDU':
+        flags = int(json_kwargs.pop('flags', 0))
+
+        if json_kwargs.keys() != _BPDU_FIELD_NAMES:
+            # the generic deserialization reports the missing or unexpected fields
+            return super().deserialize(**json_kwargs).with_flags(flags)
+
+        root, cost, port, identity = (str(json_kwargs['root']), int(json_kwargs['cost']),
+                                      int(json_kwargs['port']), str(json_kwargs['id']))
+
+        return _new_bpdu(root, cost, port, identity, _bpdu_key(root, cost, port, identity), flags)
+
+    def replace(self, **kwargs) -> 'BPDU':
+        """
+        Replacing only the cost or only the id re-packs that part of the key instead of rebuilding the BPDU
+
+        :return: The BPDU with the replaced fields (and no flags)
+        """
+        if len(kwargs) == 1:
+            if 'cost' in kwargs:
+                cost = kwargs['cost']
+                if 0 <= cost < _COST_LIMIT and self._key.__class__ is int:
+                    return _new_bpdu(self.root, cost, self.port, self.id,
+                                     self._key + ((cost - self.cost) << _COST_SHIFT))
+
+            elif 'id' in kwargs:
+                identity = kwargs['id']
+                id_key = _id_key(identity)
+
+                if id_key is not None and self._key.__class__ is int:
+                    return _new_bpdu(self.root, self.cost, self.port, identity,
+                                     (self._key >> _ID_BITS << _ID_BITS) | id_key)
+
+        return super().replace(**kwargs)
+
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is not BPDU:
+            return NotImplemented
+        return self._key == other._key
+
+    def __hash__(self) -> int:
+        return hash(self._key)
+
+    def __lt__(self, other: 'BPDU') -> bool:
+        if other.__class__ is not BPDU:
+            return NotImplemented
+        try:
+            return self._key < other._key
+        except TypeError:
+            key, other_key = self._tuple_keys(other)
+            return key < other_key
+
+    def __le__(self, other: 'BPDU') -> bool:
+        if other.__class__ is not BPDU:
+            return NotImplemented
+        try:
+            return self._key <= other._key
+        except TypeError:
+            key, other_key = self._tuple_keys(other)
+            return key <= other_key
+
+    def __gt__(self, other: 'BPDU') -> bool:
+        if other.__class__ is not BPDU:
+            return NotImplemented
+        try:
+            return self._key > other._key
+        except TypeError:
+            key, other_key = self._tuple_keys(other)
+            return key > other_key
+
+    def __ge__(self, other: 'BPDU') -> bool:
+        if other.__class__ is not BPDU:
+            return NotImplemented
+        try:
+            return self._key >= other._key
+        except TypeError:
+            key, other_key = self._tuple_keys(other)
+            return key >= other_key
+
+
+# bits of every field in the key, from the least significant: id, port, cost and root
+_ID_BITS: int = BPDU_ID_KEY_BYTES * 8
+_PORT_BITS: int = 16
+_COST_BITS: int = 32
+
+_PORT_SHIFT: int = _ID_BITS
+_COST_SHIFT: int = _PORT_SHIFT + _PORT_BITS
+_ROOT_SHIFT: int = _COST_SHIFT + _COST_BITS
+
+_COST_LIMIT: int = 1 << _COST_BITS
+# the port is packed as port + 1, so that a missing port sorts first
+_PORT_LIMIT: int = (1 << _PORT_BITS) - 1
+
+# the slot setters bypass the frozen __setattr__ when a BPDU is built without __init__
+_SLOT_SETTERS = tuple(getattr(BPDU, name).__set__ for name in BPDU.__slots__)
+
+_BPDU_FIELD_NAMES = frozenset(field.name for field in dataclasses.fields(BPDU))
+
+
+def _new_bpdu(root: str, cost: int, port: Optional[int], identity: str, key: int, flags: int = 0) -> BPDU:
+    bpdu = object.__new__(BPDU)
+    set_root, set_cost, set_port, set_id, set_key, set_flags = _SLOT_SETTERS
+
+    set_root(bpdu, root)
+    set_cost(bpdu, cost)
+    set_port(bpdu, port)
+    set_id(bpdu, identity)
+    set_key(bpdu, key)
+    set_flags(bpdu, flags)
+
+    return bpdu
+
+
+def _id_key(identity: str) -> Optional[int]:
+    """
+    :return: An integer ordered like the bridge id strings (the UTF-8 bytes are NUL padded to a fixed width),
+             otherwise None for an id wider than the key
+    """
+    packed = identity.encode(MESSAGE_ENCODING)
+
+    if len(packed) > BPDU_ID_KEY_BYTES:
+        return None
+
+    return int.from_bytes(packed.ljust(BPDU_ID_KEY_BYTES, b'\0'), 'big')
+
+
+def _tuple_key(root: str, cost: int, port: Optional[int], identity: str) -> _TupleKey:
+    """
+    :return: The priority key of the BPDU fields as a tuple, ordered like the integer key
+    """
+    return root, cost, (0, 0) if port is None else (1, port), identity
+
+
+def _bpdu_key(root: str, cost: int, port: Optional[int], identity: str) -> Union[int, _TupleKey]:
+    """
+    :return: The integer priority key of the BPDU fields (a tuple when an id is wider than the integer key or
+             the port or cost doesn't fit in its bits); a missing port (a root's own BPDU) sorts first
+    """
+    root_key, id_key = _id_key(root), _id_key(identity)
+
+    if root_key is None or id_key is None or not 0 <= cost < _COST_LIMIT \
+            or (port is not None and not 0 <= port < _PORT_LIMIT):
+        return _tuple_key(root, cost, port, identity)
+
+    port_key = 0 if port is None else port + 1
+
+    return (root_key << _ROOT_SHIFT) | (cost << _COST_SHIFT) | (port_key << _PORT_SHIFT) | id_key
 
 
 @dataclass(frozen=True)
 class Packet(Replaceable, Serializable, Deserializable):
     """
     Representation of a Packet as defined in https://3700.network/docs/projects/bridge/
+
+    Slotted like a BPDU, with one more slot caching the encoded bytes
     """
+    __slots__ = ('source', 'dest', 'msg_id', 'type', 'message', '_encoded')
+
     source: str
     dest: str
     msg_id: int
@@ -64,3 +268,44 @@ class Packet(Replaceable, Serializable, Deserializable):
         """
         if self.type == MessageType.BridgeProtocolDataUnit and not isinstance(self.message, BPDU):
             raise ValueError(f"Associated bpdu message of is {self.message} not {BPDU}")
+
+    @classmethod
+    def deserialize(cls, **json_kwargs) -> 'Packet':
+        """
+        The message is a BPDU exactly when the type says so, which skips trying every message type
+        """
+        if json_kwargs.keys() != _PACKET_FIELD_NAMES:
+            # the generic deserialization reports the missing or unexpected fields
+            return super().deserialize(**json_kwargs)
+
+        packet_type = MessageType(json_kwargs['type'])
+        message = json_kwargs['message']
+
+        # any other message of a BPDU packet is rejected by __post_init__
+        if packet_type == MessageType.BridgeProtocolDataUnit and isinstance(message, dict) \
+                and message.keys() - {'flags'} == _BPDU_FIELD_NAMES:
+            message = BPDU.deserialize(**message)
+
+        return cls(source=str(json_kwargs['source']), dest=str(json_kwargs['dest']),
+                   msg_id=int(json_kwargs['msg_id']), type=packet_type, message=message)
+
+    @property
+    def encoded(self) -> bytes:
+        """
+        Cached so that a Packet sent on several ports is only serialized once
+        """
+        try:
+            return self._encoded
+        except AttributeError:
+            encoded = json.dumps(self.serialize()).encode(MESSAGE_ENCODING)
+            object.__setattr__(self, '_encoded', encoded)
+            return encoded
+
+    def encode(self) -> bytes:
+        """
+        :return: The datagram bytes of this Packet
+        """
+        return self.encoded
+
+
+_PACKET_FIELD_NAMES = frozenset(field.name for field in dataclasses.fields(Packet))
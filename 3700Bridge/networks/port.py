@@ -1,14 +1,19 @@
-from typing import Optional, Dict, Tuple
+from typing import Optional, Union, List
 
 import json
-import time
 
 from socket import socket
 from enum import Enum
 
 from networks.packet import Packet, BPDU, MessageType
+from networks.frame import Frame, FrameTemplate
+from networks import codec
+from networks.spanning_tree import BPDUTable
+from networks.event_log import EventLog, EventKind
+from networks.counters import PortCounters
+from networks.capture import CaptureWriter, CaptureDirection
 
-from networks.constants import DEFAULT_PACKET_SIZE, MESSAGE_ENCODING, MESSAGE_SECOND_TIMEOUT, ALL_LANS_ID
+from networks.constants import DEFAULT_PACKET_SIZE, MESSAGE_ENCODING, ALL_LANS_ID
 
 
 # The root port is only relevant for updating the BPDU
@@ -18,6 +23,14 @@ class PortStatus(Enum):
     DISABLED = 1
 
 
+# Only tracked by the rapid spanning tree, which forwards on ROOT and agreed DESIGNATED ports
+class PortRole(Enum):
+    ROOT = 0
+    DESIGNATED = 1
+    ALTERNATE = 2
+    BACKUP = 3
+
+
 class Port:
     """
     Representation of a Port on a networks
@@ -30,10 +43,19 @@ class Port:
         self.message_count = 0
         self.last_bpdu_sent: Optional[BPDU] = None
 
-        # map all BPDUs to a (count, last_seen_time)
-        self.seen_bpdus: Dict[BPDU, Tuple[int, float]] = {}
+        # map all BPDUs to a (count, last_seen_time) record
+        self.seen_bpdus: BPDUTable = BPDUTable()
 
         self._status: PortStatus = PortStatus.DESIGNATED
+        self._role: PortRole = PortRole.DESIGNATED
+
+        # replaced by the log of the owning Bridge
+        self.log: EventLog = EventLog()
+
+        self.counters = PortCounters()
+
+        # set by the owning Bridge while its traffic is captured
+        self.capture: Optional[CaptureWriter] = None
 
     @property
     def status(self) -> PortStatus:
@@ -45,9 +67,19 @@ class Port:
             self._status = new_status
 
             if new_status == PortStatus.DISABLED:
-                print(f"Disabled port: {self.index}", flush=True)
+                self.log.info(EventKind.PortRole, "Disabled port: %d", self.index)
             elif new_status == PortStatus.DESIGNATED:
-                print(f"Designated port: {self.index}", flush=True)
+                self.log.info(EventKind.PortRole, "Designated port: %d", self.index)
+
+    @property
+    def role(self) -> PortRole:
+        return self._role
+
+    @role.setter
+    def role(self, new_role: PortRole):
+        if new_role != self._role:
+            self._role = new_role
+            self.log.debug(EventKind.PortRole, "%s port: %d", new_role.name.title(), self.index)
 
     def fileno(self):
         """
@@ -55,25 +87,37 @@ class Port:
         """
         return self.socket.fileno()
 
-    def send_bpdu(self, bridge_id: str, bpdu: BPDU) -> None:
+    def send_bpdu(self, bridge_id: str, bpdu: BPDU,
+                  template: Optional[Union[FrameTemplate, codec.BinaryBPDUTemplate]] = None, flags: int = 0) -> None:
         """
         Send a BPDU
+
+        :param template: An encoding of the BPDU shared by all ports, with 'msg_id' and 'message.port'
+                         (and 'message.flags' for the rapid spanning tree) left open
+        :param flags: The BPDUFlags sent on this port
         """
         sendable_bpdu = bpdu.replace(id=bridge_id, port=self.index)
 
-        self.send_packet(Packet(source=bridge_id, dest=ALL_LANS_ID,
-                                msg_id=self.message_count,
-                                type=MessageType.BridgeProtocolDataUnit, message=sendable_bpdu))
+        if template is None:
+            self.send_packet(Packet(source=bridge_id, dest=ALL_LANS_ID,
+                                    msg_id=self.message_count,
+                                    type=MessageType.BridgeProtocolDataUnit, message=sendable_bpdu.with_flags(flags)))
+        else:
+            self.send_bytes(template.render({'msg_id': self.message_count, 'message.port': self.index,
+                                             'message.flags': flags}))
+
         self.last_bpdu_sent = sendable_bpdu
+        self.counters.bpdus_out += 1
 
-    def send_packet(self, packet: Packet) -> None:
-        formatted_packet = packet.serialize()
-        json_packet = json.dumps(formatted_packet)
-        self._send(json_packet.encode(MESSAGE_ENCODING))
+    def send_packet(self, packet: Union[Packet, Frame]) -> None:
+        """
+        Send a Packet, or forward the unchanged bytes of a received Frame
+        """
+        self.send_bytes(packet.encode())
 
-    def _send(self, message_data: bytes):
+    def send_bytes(self, message_data: bytes):
         """
-         This method sends the provided "data" to the LAN, using the UDP connection.
+        This method sends the provided "data" to the LAN, using the UDP connection.
         :param message_data: bytes to be sent
         """
         # print("Sending message on port %d" % self.index, flush=True)  # REQUIRED by assignment
@@ -81,26 +125,83 @@ class Port:
         self.socket.sendto(message_data, ('localhost', self.port_num))
         self.message_count += 1
 
-    def read_packet(self, byte_count=None) -> Packet:
+        if self.capture is not None:
+            self.capture.record(CaptureDirection.Egress, self.index, message_data)
+
+        self.counters.frames_out += 1
+        self.counters.bytes_out += len(message_data)
+
+    def set_blocking(self, blocking: bool) -> None:
+        """
+        Non-blocking ports can be drained until the kernel queue is empty
+        """
+        self.socket.setblocking(blocking)
+
+    def receive(self, byte_count=None) -> bytes:
+        """
+        :return: The bytes of the next datagram on this port
+        """
         byte_count = byte_count if byte_count else DEFAULT_PACKET_SIZE
 
         packet_bytes, _address = self.socket.recvfrom(byte_count)
+
+        if self.capture is not None:
+            self.capture.record(CaptureDirection.Ingress, self.index, packet_bytes)
+
+        self.counters.frames_in += 1
+        self.counters.bytes_in += len(packet_bytes)
+
+        return packet_bytes
+
+    def receive_batch(self, budget: int, byte_count=None) -> List[bytes]:
+        """
+        Drain queued datagrams from a non-blocking port
+
+        :param budget: The maximum number of datagrams to read
+        :return: The bytes of every datagram read, in arrival order
+        """
+        datagrams: List[bytes] = []
+
+        try:
+            while len(datagrams) < budget:
+                datagrams.append(self.receive(byte_count))
+        except BlockingIOError:
+            # the kernel queue is empty
+            pass
+
+        return datagrams
+
+    @staticmethod
+    def decode_packet(packet_bytes: bytes) -> Packet:
+        """
+        :return: The fully deserialized Packet of the provided datagram bytes
+        """
+        if codec.is_binary(packet_bytes):
+            return codec.decode_packet(packet_bytes)
+
         raw_packet = packet_bytes.decode(MESSAGE_ENCODING)
         json_packet = json.loads(raw_packet)
 
         return Packet.deserialize(**json_packet)
 
-    def get_flushed_bpdus(self) -> Dict[BPDU, Tuple[int, float]]:
+    def read_packet(self, byte_count=None) -> Packet:
+        return self.decode_packet(self.receive(byte_count))
+
+    def read_frame(self, byte_count=None) -> Frame:
         """
-        Remove any BPDUs that are expired
+        :return: The next datagram classified only by its header fields
         """
-        return {
-            key: (count, last_seen_time)
-            for key, (count, last_seen_time) in self.seen_bpdus.items()
-            if time.time() - last_seen_time < MESSAGE_SECOND_TIMEOUT * 2
-        }
+        return Frame.peek(self.receive(byte_count))
 
-    def calculate_status_update(self) -> bool:
+    def record_bpdu(self, bpdu: BPDU, now: float) -> bool:
+        """
+        Save a received BPDU and the time it was seen, replacing what the port that sent it sent before
+
+        :return: True if the BPDU was not already seen, otherwise False
+        """
+        return self.seen_bpdus.record_latest(bpdu, now)
+
+    def calculate_status_update(self, now: float) -> bool:
         """
         Calculate whether this port is a designated or disabled port
         """
@@ -109,17 +210,15 @@ class Port:
             self.status = new_status
             return different
 
-        self.seen_bpdus = self.get_flushed_bpdus()
+        self.seen_bpdus.expire(now)
 
         # print(f"DBG: Seen BPDUs on port {self.index} = {self.seen_bpdus}", flush=True)
 
-        sorted_bpdus = sorted(self.seen_bpdus)
+        best_received = self.seen_bpdus.best()
 
-        if len(sorted_bpdus) == 0 or self.last_bpdu_sent is None:
+        if best_received is None or self.last_bpdu_sent is None:
             return update_status_change(PortStatus.DESIGNATED)
 
-        best_received = sorted_bpdus[0]
-
         if best_received < self.last_bpdu_sent:
             # print(f"DBG: PORT LT {best_received} < {self.last_bpdu_sent}", flush=True)
             # NOTE: If two ports are on the same LAN
@@ -0,0 +1,344 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from networks.port import Port, PortStatus, PortRole
+from networks.packet import BPDU, BPDUFlags
+from networks.reactor import Timer
+from networks.request_handler import SpanningTreeRequest
+
+from networks.constants import RAPID_PROPOSAL_SECOND_TIMEOUT, RAPID_TOPOLOGY_CHANGE_SECOND_INTERVAL, \
+    RAPID_MAX_ROOT_COST
+
+
+class RapidPortState:
+    """
+    Proposal/agreement handshake state of a single Port
+    """
+    __slots__ = ('proposing', 'edge', 'agreements', 'proposal_timer', 'agreed_proposal')
+
+    def __init__(self):
+        # a designated port that is discarding until every bridge on its LAN agreed
+        self.proposing: bool = False
+        # no other bridge was ever heard on the LAN, so there is nothing to agree with
+        self.edge: bool = False
+
+        self.agreements: Set[str] = set()
+        self.proposal_timer: Optional[Timer] = None
+
+        # the proposal last agreed to on the root port, so a retransmission doesn't sync again
+        self.agreed_proposal: Optional[BPDU] = None
+
+
+class RapidSpanningTree:
+    """
+    Rapid (802.1w style) spanning tree of a Bridge.
+
+    Unlike the default mode, the roles of every port are recalculated from the current BPDUs
+    whenever they change (so a root that dies is replaced), and:
+    - only designated ports send hellos, so every port only hears the bridges closer to the root
+    - ALTERNATE and BACKUP ports keep the next best paths and are promoted as soon as the root port fails
+    - a port that becomes designated discards until the bridges on its LAN agree to its proposal
+      (they first make their own designated ports discard), instead of waiting for timers
+    - a topology change floods a flag through the tree that flushes the learned addresses
+    """
+    def __init__(self, bridge: 'Bridge'):
+        self.bridge = bridge
+
+        self.states: Dict[int, RapidPortState] = {port.index: RapidPortState() for port in bridge.ports}
+
+        self.topology_change_until: float = float('-inf')
+        self.topology_change_ports: Set[int] = set()
+
+        # map a port index to the extra BPDUFlags of a BPDU that has to be sent before the next hello
+        self._pending: Dict[int, int] = {}
+
+    def start(self) -> None:
+        """
+        Every port starts out as a designated port proposing to its LAN
+        """
+        for port in self.bridge.ports:
+            port.role = PortRole.DESIGNATED
+            self._propose(port)
+
+    def sends_hello(self, port: Port) -> bool:
+        """
+        :return: True if the periodic BPDUs are sent on the port
+        """
+        if port.role == PortRole.DESIGNATED:
+            return True
+
+        # a topology change is also announced towards the root
+        return port.role == PortRole.ROOT and self._announces_topology_change(port)
+
+    def flags_for(self, port: Port) -> int:
+        """
+        :return: The BPDUFlags of every BPDU currently sent on the port
+        """
+        flags = 0 if port.role == PortRole.DESIGNATED else BPDUFlags.NonDesignated
+
+        if self.states[port.index].proposing:
+            flags |= BPDUFlags.Proposal
+
+        if self._announces_topology_change(port):
+            flags |= BPDUFlags.TopologyChange
+
+        return flags
+
+    def synchronizing(self) -> bool:
+        """
+        :return: True while some designated port is waiting for the agreements to its proposal
+        """
+        return any(state.proposing for state in self.states.values())
+
+    def _announces_topology_change(self, port: Port) -> bool:
+        return self.bridge.clock() < self.topology_change_until and port.index in self.topology_change_ports
+
+    def receive(self, requests: List[SpanningTreeRequest]) -> None:
+        """
+        Save the BPDUs of a wakeup, recalculate the roles once and answer their flags
+        """
+        now = self.bridge.clock()
+        new_requests: List[SpanningTreeRequest] = []
+
+        for request in requests:
+            if request.bpdu.id != self.bridge.identity:
+                self.states[request.port.index].edge = False
+
+            # the priority of a root port is stale as soon as its own root port fails, so saving it
+            # could make two bridges choose each other as the path to the root
+            if request.bpdu.flags & BPDUFlags.NonDesignated:
+                continue
+
+            if request.port.seen_bpdus.record_latest(request.bpdu, now):
+                self.bridge.watch_bpdu_expiry(request.port, request.bpdu)
+                new_requests.append(request)
+
+        roles_changed = self.recalculate() if new_requests else False
+
+        # a designated port answers new (inferior) information at once instead of on the next hello
+        for request in new_requests:
+            if request.port.role == PortRole.DESIGNATED and request.bpdu.id != self.bridge.identity:
+                self._pending.setdefault(request.port.index, 0)
+
+        for request in requests:
+            self._handle_flags(request.port, request.bpdu)
+
+        self._transmit(roles_changed)
+
+    def update(self) -> None:
+        """
+        Recalculate the roles after BPDUs aged out
+        """
+        self._transmit(self.recalculate())
+
+    def recalculate(self) -> bool:
+        """
+        Select the root port from the best BPDU heard on any port, then the role of every other port
+
+        :return: True if the root or any port role changed
+        """
+        bridge = self.bridge
+        now = bridge.clock()
+
+        for port in bridge.ports:
+            port.seen_bpdus.expire(now)
+
+        best_pair: Optional[Tuple[BPDU, int]] = None
+        for port in bridge.ports:
+            for bpdu in self._usable_bpdus(port):
+                if bpdu.id != bridge.identity and (best_pair is None or (bpdu, port.index) < best_pair):
+                    best_pair = (bpdu, port.index)
+
+        new_root_port = bridge.DEFAULT_ROOT_PORT
+        new_root_bpdu = bridge.DEFAULT_ROOT_BPDU
+
+        if best_pair is not None:
+            cost_adjusted_bpdu = best_pair[0].replace(cost=best_pair[0].cost + 1)
+
+            if cost_adjusted_bpdu < bridge.DEFAULT_ROOT_BPDU:
+                new_root_port = best_pair[1]
+                new_root_bpdu = cost_adjusted_bpdu.replace(id=bridge.identity)
+
+        previous_root_port = bridge.root_port
+        root_moved = new_root_port != previous_root_port or new_root_bpdu.root != bridge.root_bpdu.root
+        root_changed = root_moved or new_root_bpdu != bridge.root_bpdu
+
+        bridge.root_port = new_root_port
+        bridge.root_bpdu = new_root_bpdu
+
+        changed_ports: List[Port] = []
+
+        for port in bridge.ports:
+            previous_role = port.role
+            port.role = self._calculate_role(port)
+
+            if port.role != previous_role:
+                changed_ports.append(port)
+
+            state = self.states[port.index]
+
+            if port.role != PortRole.DESIGNATED:
+                self._stop_proposing(port)
+                port.status = PortStatus.DISABLED
+            elif previous_role != PortRole.DESIGNATED or (root_moved and not state.edge):
+                # new root information could close a loop below this port until its LAN agrees
+                self._propose(port)
+
+        bridge.forwarding_table.invalidate_ports(changed_ports)
+
+        if root_changed or changed_ports:
+            bridge.hold_until_stable()
+
+        # the new root port forwards at once, which changes the active topology
+        if new_root_port != previous_root_port and new_root_port is not None:
+            self.start_topology_change()
+
+        return root_changed or bool(changed_ports)
+
+    def _usable_bpdus(self, port: Port) -> Iterable[BPDU]:
+        return (bpdu for bpdu in port.seen_bpdus if bpdu.cost < RAPID_MAX_ROOT_COST)
+
+    def _calculate_role(self, port: Port) -> PortRole:
+        if port.index == self.bridge.root_port:
+            return PortRole.ROOT
+
+        designated_bpdu = self.bridge.root_bpdu.replace(id=self.bridge.identity, port=port.index)
+        best_bpdu = min(self._usable_bpdus(port), default=None)
+
+        if best_bpdu is None or designated_bpdu <= best_bpdu:
+            return PortRole.DESIGNATED
+
+        # the better BPDU on the LAN came from another port of this bridge
+        return PortRole.BACKUP if best_bpdu.id == self.bridge.identity else PortRole.ALTERNATE
+
+    def _neighbors(self, port: Port) -> Set[str]:
+        return {bpdu.id for bpdu in port.seen_bpdus if bpdu.id != self.bridge.identity}
+
+    def _handle_flags(self, port: Port, bpdu: BPDU) -> None:
+        if bpdu.id == self.bridge.identity or not bpdu.flags:
+            return
+
+        state = self.states[port.index]
+
+        if bpdu.flags & BPDUFlags.Proposal:
+            if port.role == PortRole.ROOT:
+                if state.agreed_proposal != bpdu:
+                    self._sync(except_port=port)
+                    state.agreed_proposal = bpdu
+
+                self._pending[port.index] = self._pending.get(port.index, 0) | BPDUFlags.Agreement
+
+            elif port.role in (PortRole.ALTERNATE, PortRole.BACKUP):
+                # the port is already discarding
+                self._pending[port.index] = self._pending.get(port.index, 0) | BPDUFlags.Agreement
+
+        if bpdu.flags & BPDUFlags.Agreement and state.proposing and bpdu.root == self.bridge.root_bpdu.root:
+            state.agreements.add(bpdu.id)
+
+            if self._neighbors(port) <= state.agreements:
+                self._forward(port)
+                self.start_topology_change()
+
+        if bpdu.flags & BPDUFlags.TopologyChange and port.role in (PortRole.ROOT, PortRole.DESIGNATED):
+            self.start_topology_change(origin_port=port)
+
+    def _sync(self, except_port: Port) -> None:
+        """
+        Make every designated port discard and propose, so agreeing upstream can't close a loop
+        """
+        for port in self.bridge.ports:
+            state = self.states[port.index]
+
+            if port is not except_port and port.role == PortRole.DESIGNATED and not state.edge \
+                    and not state.proposing:
+                self._propose(port)
+                self._pending.setdefault(port.index, 0)
+
+    def _propose(self, port: Port) -> None:
+        state = self.states[port.index]
+
+        self._stop_proposing(port)
+        state.proposing = True
+        state.agreements.clear()
+        port.status = PortStatus.DISABLED
+
+        if self.bridge.reactor is not None:
+            state.proposal_timer = self.bridge.reactor.timers.schedule(
+                RAPID_PROPOSAL_SECOND_TIMEOUT, lambda: self._on_proposal_timeout(port))
+
+    def _stop_proposing(self, port: Port) -> None:
+        state = self.states[port.index]
+        state.proposing = False
+
+        if state.proposal_timer is not None:
+            state.proposal_timer.cancel()
+            state.proposal_timer = None
+
+    def _forward(self, port: Port) -> None:
+        self._stop_proposing(port)
+        port.status = PortStatus.DESIGNATED
+
+    def _on_proposal_timeout(self, port: Port) -> None:
+        """
+        Nobody agreed in time: a LAN without other bridges is an edge, otherwise forward like the default mode
+        """
+        state = self.states[port.index]
+
+        if not self.bridge.active or not state.proposing:
+            return
+
+        state.proposal_timer = None
+        state.edge = not self._neighbors(port)
+        self._forward(port)
+
+        if not state.edge:
+            self.start_topology_change()
+
+        self._transmit(False)
+
+    def start_topology_change(self, origin_port: Optional[Port] = None) -> None:
+        """
+        Flush the addresses learned on every port but the origin and announce the change on the
+        active ports for a while (a change received from another bridge is not sent back to it)
+        """
+        bridge = self.bridge
+        now = bridge.clock()
+
+        bridge.forwarding_table.invalidate_ports(port for port in bridge.ports if port is not origin_port)
+
+        # the change is already being announced, only the flush is repeated
+        if origin_port is not None and now < self.topology_change_until:
+            return
+
+        announcing_ports = {port.index for port in bridge.ports
+                            if port.role in (PortRole.ROOT, PortRole.DESIGNATED) and port is not origin_port}
+
+        # a change during an announcement only extends it, the ports already announcing carry it with their hellos
+        if now < self.topology_change_until:
+            new_ports = announcing_ports - self.topology_change_ports
+            self.topology_change_ports |= announcing_ports
+        else:
+            new_ports = announcing_ports
+            self.topology_change_ports = announcing_ports
+
+        self.topology_change_until = now + RAPID_TOPOLOGY_CHANGE_SECOND_INTERVAL
+
+        for index in new_ports:
+            self._pending.setdefault(index, 0)
+
+    def _transmit(self, send_all: bool) -> None:
+        """
+        Send the pending BPDUs (and a BPDU on every hello port if the root or the roles changed)
+        """
+        pending, self._pending = self._pending, {}
+
+        if send_all:
+            self.bridge.send_bpdus()
+
+        for index, extra_flags in pending.items():
+            port = self.bridge.ports[index]
+
+            # already sent by send_bpdus
+            if send_all and not extra_flags and self.sends_hello(port):
+                continue
+
+            self.bridge.send_bpdu(port, self.flags_for(port) | extra_flags)
@@ -0,0 +1,197 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import select
+import time
+
+from networks.constants import TIMER_WHEEL_TICK, TIMER_WHEEL_SLOTS
+
+
+class Timer:
+    """
+    Representation of a callback scheduled on a TimerWheel
+    """
+    __slots__ = ('deadline', 'tick', 'callback', 'cancelled')
+
+    def __init__(self, deadline: float, tick: int, callback: Callable[[], None]):
+        self.deadline = deadline
+        self.tick = tick
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """
+        Cancelled timers are discarded lazily once their slot is visited
+        """
+        self.cancelled = True
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel: timers are bucketed by the tick of their deadline modulo the number of slots.
+
+    Scheduling and cancelling are O(1); advancing only visits the slots of the ticks that have passed
+    """
+    def __init__(self, clock: Callable[[], float] = time.time,
+                 tick: float = TIMER_WHEEL_TICK, slot_count: int = TIMER_WHEEL_SLOTS):
+        self.clock = clock
+        self.tick = tick
+
+        self._slots: List[List[Timer]] = [[] for _ in range(slot_count)]
+        self._current_tick: int = self._tick_of(self.clock())
+
+    def __len__(self) -> int:
+        return sum(1 for slot in self._slots for timer in slot if not timer.cancelled)
+
+    def _tick_of(self, timestamp: float) -> int:
+        return int(timestamp // self.tick)
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> Timer:
+        """
+        :return: A Timer that calls the callback after the provided number of seconds
+        """
+        return self.schedule_at(self.clock() + delay, callback)
+
+    def schedule_at(self, deadline: float, callback: Callable[[], None]) -> Timer:
+        """
+        :return: A Timer that calls the callback once the clock reaches the deadline
+        """
+        # deadlines in the past are due on the next advance
+        tick = max(self._tick_of(deadline), self._current_tick)
+
+        timer = Timer(deadline, tick, callback)
+        self._slots[tick % len(self._slots)].append(timer)
+
+        return timer
+
+    def advance(self, now: Optional[float] = None) -> int:
+        """
+        Fire every timer whose deadline has passed
+
+        :return: The number of timers fired
+        """
+        now = self.clock() if now is None else now
+        now_tick = self._tick_of(now)
+
+        # never visit a slot more than once per advance
+        first_tick = max(self._current_tick, now_tick - len(self._slots) + 1)
+        fired_count = 0
+
+        for tick in range(first_tick, now_tick + 1):
+            self._current_tick = tick
+
+            slot_index = tick % len(self._slots)
+            visited_slot, self._slots[slot_index] = self._slots[slot_index], []
+
+            for timer in visited_slot:
+                if timer.cancelled:
+                    continue
+
+                if timer.deadline > now:
+                    self._slots[slot_index].append(timer)
+                    continue
+
+                timer.callback()
+                fired_count += 1
+
+        self._current_tick = max(self._current_tick, now_tick)
+
+        return fired_count
+
+    def time_until_next(self, now: Optional[float] = None) -> Optional[float]:
+        """
+        :return: Seconds until the earliest live deadline (never negative), or None if nothing is scheduled
+        """
+        now = self.clock() if now is None else now
+
+        # the first slot (in tick order) holding a timer of its own revolution holds the earliest deadline
+        for tick in range(self._current_tick, self._current_tick + len(self._slots)):
+            revolution_deadlines = [timer.deadline for timer in self._slots[tick % len(self._slots)]
+                                    if not timer.cancelled and timer.tick <= tick]
+
+            if revolution_deadlines:
+                return max(0.0, min(revolution_deadlines) - now)
+
+        far_deadlines = [timer.deadline for slot in self._slots for timer in slot if not timer.cancelled]
+
+        return max(0.0, min(far_deadlines) - now) if far_deadlines else None
+
+
+class Reactor:
+    """
+    Event loop that waits on registered file objects and a TimerWheel.
+
+    Uses select.epoll so that registration happens once per file object; falls back to
+    select.select on platforms without epoll
+    """
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self.timers = TimerWheel(clock=clock)
+
+        # map a file descriptor to its (file object, handler)
+        self._registrations: Dict[int, Tuple[Any, Callable[[List[Any]], None]]] = {}
+        self._epoll = select.epoll() if hasattr(select, 'epoll') else None
+
+        self.running = False
+
+    def register(self, file_obj: Any, handler: Callable[[List[Any]], None]) -> None:
+        """
+        :param file_obj: Object with a fileno() method
+        :param handler: Called with every ready file object it was registered for, once per wakeup
+        """
+        fd = file_obj.fileno()
+        self._registrations[fd] = (file_obj, handler)
+
+        if self._epoll is not None:
+            self._epoll.register(fd, select.EPOLLIN)
+
+    def unregister(self, file_obj: Any) -> None:
+        fd = file_obj.fileno()
+
+        if self._registrations.pop(fd, None) is not None and self._epoll is not None:
+            self._epoll.unregister(fd)
+
+    def _poll(self, timeout: Optional[float]) -> List[int]:
+        """
+        :return: The ready file descriptors
+        """
+        if self._epoll is not None:
+            return [fd for fd, _event in self._epoll.poll(-1 if timeout is None else timeout)]
+
+        ready, _, _ = select.select(list(self._registrations), [], [], timeout)
+        return ready
+
+    def run_once(self, max_timeout: Optional[float] = None) -> None:
+        """
+        Wait until a registered file object is ready or the next timer is due, then dispatch both
+        """
+        timeout = self.timers.time_until_next()
+
+        if max_timeout is not None:
+            timeout = max_timeout if timeout is None else min(timeout, max_timeout)
+
+        ready_by_handler: Dict[Callable[[List[Any]], None], List[Any]] = {}
+
+        for fd in self._poll(timeout):
+            if fd not in self._registrations:
+                # unregistered by an earlier handler during this wakeup
+                continue
+
+            file_obj, handler = self._registrations[fd]
+            ready_by_handler.setdefault(handler, []).append(file_obj)
+
+        for handler, ready_objects in ready_by_handler.items():
+            handler(ready_objects)
+
+        self.timers.advance()
+
+    def run(self) -> None:
+        """
+        Dispatch events until stopped
+        """
+        self.running = True
+
+        while self.running:
+            self.run_once()
+
+    def stop(self) -> None:
+        self.running = False
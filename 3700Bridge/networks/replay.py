@@ -0,0 +1,179 @@
+from typing import List, Dict, Any, Callable, Optional
+
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import argparse
+
+from collections import deque
+
+from networks.bridge import Bridge
+from networks.port import Port
+from networks.reactor import Reactor
+from networks.capture import CaptureDirection, read_capture
+from networks.event_log import EventLog, LogLevel
+
+from networks.constants import HOLD_QUEUE_MAX_DEPTH
+
+
+class ReplayPort(Port):
+    """
+    A Port without a socket: received datagrams are queued by the replay and sent datagrams are only counted
+    """
+    def __init__(self, index: int):
+        super().__init__(index, 0, None)
+
+        self.pending: deque = deque()
+
+    def set_blocking(self, blocking: bool) -> None:
+        pass
+
+    def receive(self, byte_count=None) -> bytes:
+        """
+        :return: The next queued datagram (raises BlockingIOError once the queue is empty, like a drained socket)
+        """
+        if not self.pending:
+            raise BlockingIOError
+
+        packet_bytes = self.pending.popleft()
+
+        self.counters.frames_in += 1
+        self.counters.bytes_in += len(packet_bytes)
+
+        return packet_bytes
+
+    def send_bytes(self, message_data: bytes):
+        self.message_count += 1
+
+        self.counters.frames_out += 1
+        self.counters.bytes_out += len(message_data)
+
+
+class ReplayReactor(Reactor):
+    """
+    A Reactor that never polls: the replay hands the ports to their handlers and advances the timers itself
+    """
+    def __init__(self, clock: Callable[[], float]):
+        super().__init__(clock=clock)
+
+        # map a registered port to its handler
+        self.handlers: Dict[Any, Callable[[List[Any]], None]] = {}
+
+    def register(self, file_obj: Any, handler: Callable[[List[Any]], None]) -> None:
+        self.handlers[file_obj] = handler
+
+    def unregister(self, file_obj: Any) -> None:
+        self.handlers.pop(file_obj, None)
+
+
+class Replay:
+    """
+    Feed the ingress datagrams of a capture back into a Bridge built on ReplayPorts, as fast as possible.
+
+    The clock of the bridge follows the capture timestamps, so its timers fire at the same points of the
+    traffic on every run and two versions of the bridge see identical input
+    """
+    def __init__(self, path: str, log: Optional[EventLog] = None, **bridge_options):
+        """
+        :param bridge_options: Keyword arguments of the Bridge (e.g. rapid_spanning_tree) matching the captured bridge
+        """
+        self.header, self._records = read_capture(path)
+
+        # the clock has to be set before the reactor reads it
+        self.now: float = self.header['start_time']
+        self.reactor = ReplayReactor(clock=self.clock)
+
+        self.ports: List[ReplayPort] = [ReplayPort(index) for index in range(self.header['port_count'])]
+        self.bridge = Bridge(identity=self.header['identity'], ports=self.ports, clock=self.clock,
+                             log=log if log is not None else EventLog(stream=open(os.devnull, 'w')),
+                             **bridge_options)
+
+    def clock(self) -> float:
+        return self.now
+
+    def run(self) -> Dict[str, Any]:
+        """
+        :return: The number of replayed datagrams, the datagrams sent by the replayed and the captured bridge,
+                 and the time the replay took
+        """
+        ingress_count = 0
+        captured_egress_count = 0
+
+        self.bridge.start(self.reactor)
+        start = time.perf_counter()
+
+        for record in self._records:
+            if record.direction == CaptureDirection.Egress:
+                captured_egress_count += 1
+                continue
+
+            self.now = max(self.now, record.time)
+            self.reactor.timers.advance(self.now)
+
+            port = self.ports[record.port]
+            port.pending.append(record.data)
+            self.reactor.handlers[port]([port])
+
+            ingress_count += 1
+
+        elapsed = time.perf_counter() - start
+        self.bridge.stop()
+
+        return {
+            "identity": self.bridge.identity,
+            "ingress_frames": ingress_count,
+            "egress_frames": sum(port.counters.frames_out for port in self.ports),
+            "captured_egress_frames": captured_egress_count,
+            "seconds": elapsed,
+            "frames_per_second": ingress_count / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Generate parser for commandline arguments:
+
+    capture: file written by the --capture option of networks.launch
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='CS 3700 bridge capture replay')
+    parser.add_argument('capture', type=str, help="Capture file")
+    parser.add_argument('--packet-forwarding', dest='raw_forwarding', action='store_false',
+                        help="Deserialize and re-serialize every data frame instead of forwarding the received bytes")
+    parser.add_argument('--binary-bpdus', action='store_true',
+                        help="Send BPDUs in the compact binary encoding")
+    parser.add_argument('--rapid-spanning-tree', action='store_true',
+                        help="Converge with rapid spanning tree proposals and agreements")
+    parser.add_argument('--hold-max-depth', type=int, default=HOLD_QUEUE_MAX_DEPTH,
+                        help="Data frames held at once while the spanning tree reconverges (0 forwards at once)")
+    parser.add_argument('--log-level', type=str.upper, default=LogLevel.DEBUG.name, choices=LogLevel.__members__,
+                        help="Lowest level of the (discarded) logged events")
+    parser.add_argument('--profile', action='store_true',
+                        help="Profile the replay and write the most expensive functions to stderr")
+
+    return parser
+
+
+def main() -> None:
+    parser = create_parser()
+    args: argparse.Namespace = parser.parse_args(sys.argv[1:])
+
+    replay = Replay(args.capture, log=EventLog(stream=open(os.devnull, 'w'), level=LogLevel[args.log_level]),
+                    raw_forwarding=args.raw_forwarding, binary_bpdus=args.binary_bpdus,
+                    rapid_spanning_tree=args.rapid_spanning_tree, hold_max_depth=args.hold_max_depth)
+
+    if not args.profile:
+        print(json.dumps(replay.run(), indent=2))
+        return
+
+    profiler = cProfile.Profile()
+    result = profiler.runcall(replay.run)
+
+    pstats.Stats(profiler, stream=sys.stderr).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(25)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,42 +1,61 @@
 
-import time
+from typing import Union
 
 from abc import ABC, abstractmethod
 
 from networks.port import Port, PortStatus
 # from networks.bridge import Bridge  # can't import due to circular imports
 from networks.packet import BPDU, Packet
+from networks.frame import Frame
+from networks.event_log import EventKind
+
+from networks.constants import ALL_LANS_ID
 
 
 class Request(ABC):
+    # a request is created for every received datagram
+    __slots__ = ()
+
     @abstractmethod
     def handle(self, application: 'Bridge') -> bool:
         ...
 
 
 class SpanningTreeRequest(Request):
+    __slots__ = ('port', 'bpdu', 'is_new_bpdu')
+
     def __init__(self, received_port: Port, received_bpdu: BPDU):
         self.port = received_port
         self.bpdu = received_bpdu
 
-    def handle(self, _application: 'Bridge') -> bool:
+        # set by handle: a new BPDU can carry a better root even if the status of the port didn't change
+        self.is_new_bpdu = False
+
+    def handle(self, application: 'Bridge') -> bool:
         """
         Updates the saved BPDUs and status of the port
+
+        :return: True if the status of the port changed
         """
-        if self.bpdu in self.port.seen_bpdus:
-            saved_data = self.port.seen_bpdus[self.bpdu]
-            count, last_time = saved_data
+        now = application.clock()
 
-            self.port.seen_bpdus[self.bpdu] = (count + 1, time.time())
-        else:
-            self.port.seen_bpdus[self.bpdu] = (1, time.time())
+        self.is_new_bpdu = self.port.record_bpdu(self.bpdu, now)
+        if self.is_new_bpdu:
+            application.root_candidates.push((self.bpdu, self.port.index))
+            application.watch_bpdu_expiry(self.port, self.bpdu)
 
         # clear out the BPDUs that haven't been seen in two cycles
-        return self.port.calculate_status_update()
+        status_changed = self.port.calculate_status_update(now)
+        if status_changed:
+            application.hold_until_stable()
+
+        return status_changed
 
 
 class ForwardingRequest(Request):
-    def __init__(self, client_port: Port, packet: Packet):
+    __slots__ = ('client_port', 'packet')
+
+    def __init__(self, client_port: Port, packet: Union[Packet, Frame]):
         self.client_port = client_port
         self.packet = packet
 
@@ -49,32 +68,44 @@ class ForwardingRequest(Request):
         # update the forwarding table
         # print(f"{self.packet.source} -> {self.packet.dest} on ({self.client_port.index}) w/ {application.forwarding_table}", flush=True)
 
-        if self.packet.source not in application.forwarding_table:
-            application.forwarding_table[self.packet.source] = self.client_port
-
         if self.client_port.status == PortStatus.DISABLED and self.client_port.index != application.root_port:
-            print(f"Not forwarding {self.packet.source}/{self.packet.msg_id}", flush=True)
+            self.client_port.counters.drops += 1
+            application.log.debug(EventKind.Dropped, "Not forwarding %s/%s", self.packet.source, self.packet.msg_id)
             return
 
+        # only learn on active ports, so an entry never points behind a blocked port
+        now = application.clock()
+        application.forwarding_table.learn(self.packet.source, self.client_port, now)
+
+        dest_port = application.forwarding_table.lookup(self.packet.dest, now)
+
         # if the destination is unknown and the source is legal
         #   "Broadcasting"
-        if self.packet.dest not in application.forwarding_table:
-            print(f"Broadcasting {self.packet.source}/{self.packet.msg_id} to all active ports", flush=True)
+        if dest_port is None:
+            application.counters.learning_misses += 1
+
+            if not application.storm_control.admits(self.client_port, self.packet.dest == ALL_LANS_ID, now):
+                self.client_port.counters.storm_drops += 1
+                application.log.debug(EventKind.Dropped, "Not forwarding %s/%s", self.packet.source,
+                                      self.packet.msg_id)
+                return
+
+            application.log.debug(EventKind.Broadcast, "Broadcasting %s/%s to all active ports",
+                                  self.packet.source, self.packet.msg_id)
 
-            for port in application.ports:
-                if port != self.client_port and (port.status == PortStatus.DESIGNATED
-                                                 or port.index == application.root_port):
-                    # print(f"{port.index}", end='', flush=True)
-                    port.send_packet(self.packet)
+            # encoded once for every egress port
+            application.broadcast(self.packet.encode(), ingress_port=self.client_port)
 
             return
 
-        dest_port = application.forwarding_table[self.packet.dest]
+        application.counters.learning_hits += 1
 
         # if the destination is in the same lan as the source
         if dest_port == self.client_port:
-            print(f"Not forwarding {self.packet.source}/{self.packet.msg_id}", flush=True)
+            self.client_port.counters.drops += 1
+            application.log.debug(EventKind.Dropped, "Not forwarding %s/%s", self.packet.source, self.packet.msg_id)
             return
 
-        print(f"Forwarding {self.packet.source}/{self.packet.msg_id} to port {dest_port.port_num}", flush=True)
+        application.log.debug(EventKind.Forwarded, "Forwarding %s/%s to port %s",
+                              self.packet.source, self.packet.msg_id, dest_port.port_num)
         dest_port.send_packet(self.packet)
@@ -0,0 +1,173 @@
+from typing import Callable, Generic, Iterator, List, Optional, Set, TypeVar
+
+import heapq
+
+from collections import OrderedDict
+
+from networks.packet import BPDU
+
+from networks.constants import PRIORITY_QUEUE_COMPACT_SIZE, BPDU_SECOND_TIMEOUT
+
+
+T = TypeVar('T')
+
+
+class LazyPriorityQueue(Generic[T]):
+    """
+    Binary min-heap with lazy deletion.
+
+    Items are never removed explicitly: an item that is no longer live (e.g. an aged out BPDU)
+    stays queued until it reaches the top, so inserting costs O(log n) and the best live item
+    is found in amortized O(log n) instead of re-sorting every candidate
+    """
+    def __init__(self, is_live: Callable[[T], bool]):
+        """
+        :param is_live: Whether a queued item is still a candidate
+        """
+        self._is_live = is_live
+
+        self._heap: List[T] = []
+        self._queued: Set[T] = set()
+
+        self._compact_size: int = PRIORITY_QUEUE_COMPACT_SIZE
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, item: T) -> None:
+        """
+        Queue a candidate (an item that is already queued is not duplicated)
+        """
+        if item in self._queued:
+            return
+
+        self._queued.add(item)
+        heapq.heappush(self._heap, item)
+
+        if len(self._heap) > self._compact_size:
+            self._compact()
+
+    def peek(self) -> Optional[T]:
+        """
+        :return: The smallest live item, or None if there are no candidates
+        """
+        while self._heap and not self._is_live(self._heap[0]):
+            self._queued.discard(heapq.heappop(self._heap))
+
+        return self._heap[0] if self._heap else None
+
+    def _compact(self) -> None:
+        """
+        Drop every dead item that is buried below the top of the heap
+        """
+        self._heap = [item for item in self._heap if self._is_live(item)]
+        heapq.heapify(self._heap)
+        self._queued = set(self._heap)
+
+        # only compact again once the heap has doubled, so compaction stays amortized O(1) per push
+        self._compact_size = max(PRIORITY_QUEUE_COMPACT_SIZE, len(self._heap) * 2)
+
+
+class BPDURecord:
+    """
+    How often and when a BPDU was last seen on a port
+    """
+    __slots__ = ('count', 'last_seen_time')
+
+    def __init__(self, count: int, last_seen_time: float):
+        self.count = count
+        self.last_seen_time = last_seen_time
+
+    def __repr__(self) -> str:
+        return f"BPDURecord(count={self.count}, last_seen_time={self.last_seen_time})"
+
+
+class BPDUTable:
+    """
+    The BPDUs seen on a port, ordered from least to most recently seen.
+
+    A refreshed BPDU is moved to the fresh end, so expiring only pops from the stale end
+    and stops at the first BPDU that is still fresh
+    """
+    def __init__(self, timeout: float = BPDU_SECOND_TIMEOUT):
+        self.timeout = timeout
+
+        self._records: 'OrderedDict[BPDU, BPDURecord]' = OrderedDict()
+        self._best_bpdus: LazyPriorityQueue[BPDU] = LazyPriorityQueue(is_live=self._records.__contains__)
+
+    def __contains__(self, bpdu: BPDU) -> bool:
+        return bpdu in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[BPDU]:
+        return iter(self._records)
+
+    def __getitem__(self, bpdu: BPDU) -> BPDURecord:
+        return self._records[bpdu]
+
+    def record(self, bpdu: BPDU, now: float) -> bool:
+        """
+        Save a received BPDU and the time it was seen
+
+        :return: True if the BPDU was not already seen, otherwise False
+        """
+        seen_record = self._records.get(bpdu)
+
+        if seen_record is not None:
+            seen_record.count += 1
+            seen_record.last_seen_time = now
+            self._records.move_to_end(bpdu)
+            return False
+
+        self._records[bpdu] = BPDURecord(count=1, last_seen_time=now)
+        self._best_bpdus.push(bpdu)
+        return True
+
+    def record_latest(self, bpdu: BPDU, now: float) -> bool:
+        """
+        Save a received BPDU as the only information of the port that sent it, discarding
+        what that port sent before instead of waiting for it to age out
+
+        :return: True if the BPDU was not already seen, otherwise False
+        """
+        # a refreshed BPDU already superseded everything its port sent before
+        if bpdu in self._records:
+            return self.record(bpdu, now)
+
+        superseded_bpdus = [seen_bpdu for seen_bpdu in self._records
+                            if seen_bpdu.id == bpdu.id and seen_bpdu.port == bpdu.port and seen_bpdu != bpdu]
+
+        for superseded_bpdu in superseded_bpdus:
+            del self._records[superseded_bpdu]
+
+        return self.record(bpdu, now)
+
+    def discard(self, bpdu: BPDU) -> None:
+        self._records.pop(bpdu, None)
+
+    def expire(self, now: float) -> List[BPDU]:
+        """
+        Remove every BPDU that hasn't been seen within the timeout
+
+        :return: The removed BPDUs
+        """
+        expired_bpdus: List[BPDU] = []
+
+        while self._records:
+            stalest_bpdu, stalest_record = next(iter(self._records.items()))
+
+            if now - stalest_record.last_seen_time < self.timeout:
+                break
+
+            self._records.popitem(last=False)
+            expired_bpdus.append(stalest_bpdu)
+
+        return expired_bpdus
+
+    def best(self) -> Optional[BPDU]:
+        """
+        :return: The best (smallest) BPDU seen, or None if there are none
+        """
+        return self._best_bpdus.peek()
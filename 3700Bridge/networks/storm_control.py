@@ -0,0 +1,73 @@
+from typing import Dict
+
+from networks.port import Port
+
+from networks.constants import STORM_CONTROL_BROADCAST_RATE, STORM_CONTROL_UNKNOWN_UNICAST_RATE, \
+    STORM_CONTROL_BURST_SECONDS
+
+
+class TokenBucket:
+    """
+    Allow on average `rate` events per second, with bursts of up to `burst` events
+    """
+    __slots__ = ('rate', 'burst', 'tokens', 'last_time')
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+
+        self.tokens = burst
+        self.last_time = now
+
+    def consume(self, now: float) -> bool:
+        """
+        :return: True if a token was available (and taken), otherwise False
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.last_time) * self.rate)
+        self.last_time = now
+
+        if self.tokens < 1:
+            return False
+
+        self.tokens -= 1
+        return True
+
+
+class StormControl:
+    """
+    Rate limit the data frames flooded out of a bridge, with a token bucket per ingress port for each of
+    broadcast frames and unknown unicast frames, so a loop transient can't flood every LAN at line rate
+    """
+    def __init__(self, broadcast_rate: float = STORM_CONTROL_BROADCAST_RATE,
+                 unknown_unicast_rate: float = STORM_CONTROL_UNKNOWN_UNICAST_RATE,
+                 burst_seconds: float = STORM_CONTROL_BURST_SECONDS):
+        """
+        :param broadcast_rate: Flooded broadcast frames per second per ingress port (0 disables the limit)
+        :param unknown_unicast_rate: Flooded unknown unicast frames per second per ingress port (0 disables the limit)
+        :param burst_seconds: Seconds of traffic at the rate that can be flooded at once
+        """
+        self.broadcast_rate = broadcast_rate
+        self.unknown_unicast_rate = unknown_unicast_rate
+        self.burst_seconds = burst_seconds
+
+        # map a port index to its bucket
+        self._broadcast_buckets: Dict[int, TokenBucket] = {}
+        self._unknown_unicast_buckets: Dict[int, TokenBucket] = {}
+
+    def admits(self, ingress_port: Port, broadcast: bool, now: float) -> bool:
+        """
+        :return: True if a frame received on the port may be flooded, otherwise False
+        """
+        if broadcast:
+            rate, buckets = self.broadcast_rate, self._broadcast_buckets
+        else:
+            rate, buckets = self.unknown_unicast_rate, self._unknown_unicast_buckets
+
+        if rate <= 0:
+            return True
+
+        bucket = buckets.get(ingress_port.index)
+        if bucket is None:
+            bucket = buckets[ingress_port.index] = TokenBucket(rate, max(1.0, rate * self.burst_seconds), now)
+
+        return bucket.consume(now)
@@ -0,0 +1,175 @@
+from typing import List, Dict, Any, Optional
+
+import sys
+import json
+import random
+import argparse
+
+
+TOPOLOGY_SHAPES = ('ring', 'mesh', 'tree', 'mixed')
+
+
+class TopologyBuilder:
+    """
+    Incrementally build a topology in the format of configs/*.conf with unique bridge ids and LAN ids
+    """
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+        self.bridges: List[Dict[str, Any]] = []
+        self._lan_count = 0
+        self._bridge_ids = set()
+
+    def new_lans(self, count: int) -> List[int]:
+        lans = list(range(self._lan_count + 1, self._lan_count + count + 1))
+        self._lan_count += count
+        return lans
+
+    def add_bridge(self, lans: List[int]) -> Dict[str, Any]:
+        identity = f"{self.rng.randrange(0x10000):04x}"
+        while identity in self._bridge_ids:
+            identity = f"{self.rng.randrange(0x10000):04x}"
+
+        self._bridge_ids.add(identity)
+        bridge = {"id": identity, "lans": sorted(set(lans))}
+        self.bridges.append(bridge)
+        return bridge
+
+    def ring(self, bridge_count: int) -> List[int]:
+        """
+        Every bridge joins two neighbouring LANs of a cycle, so a single link is redundant
+
+        :return: The LANs of the segment
+        """
+        lans = self.new_lans(max(bridge_count, 2))
+
+        for index in range(bridge_count):
+            self.add_bridge([lans[index % len(lans)], lans[(index + 1) % len(lans)]])
+
+        return lans
+
+    def tree(self, bridge_count: int) -> List[int]:
+        """
+        Every bridge joins a new LAN to a random earlier one, so there are no loops
+        """
+        lans = self.new_lans(bridge_count + 1)
+
+        for index in range(bridge_count):
+            self.add_bridge([self.rng.choice(lans[:index + 1]), lans[index + 1]])
+
+        return lans
+
+    def mesh(self, bridge_count: int) -> List[int]:
+        """
+        Every bridge joins 2 to 4 random LANs of a shared pool, creating many parallel paths
+        """
+        lans = self.new_lans(max(bridge_count // 2, 2))
+
+        for _ in range(bridge_count):
+            self.add_bridge(self.rng.sample(lans, min(len(lans), self.rng.randint(2, 4))))
+
+        return lans
+
+    def mixed(self, bridge_count: int, segment_size: int) -> List[int]:
+        """
+        Segments of every other shape, joined by a ring of backbone bridges
+        """
+        shapes = [self.ring, self.mesh, self.tree]
+        segments: List[List[int]] = []
+
+        remaining = bridge_count
+        while remaining > 0:
+            size = min(segment_size, remaining)
+            segments.append(shapes[len(segments) % len(shapes)](size))
+            remaining -= size
+
+        if len(segments) > 1:
+            for index, segment in enumerate(segments):
+                next_segment = segments[(index + 1) % len(segments)]
+                self.add_bridge([self.rng.choice(segment), self.rng.choice(next_segment)])
+
+        return [lan for segment in segments for lan in segment]
+
+    def add_churn(self, fraction: float, lifetime: float) -> None:
+        """
+        Start some bridges late and stop others early, between 20% and 70% of the lifetime
+        """
+        churned = self.rng.sample(self.bridges, int(len(self.bridges) * fraction))
+
+        for bridge in churned:
+            change_time = round(self.rng.uniform(lifetime * 0.2, lifetime * 0.7), 2)
+
+            if self.rng.random() < 0.5:
+                bridge["start"] = change_time
+            else:
+                bridge["stop"] = change_time
+
+
+def generate_topology(shape: str, bridge_count: int, hosts: int = 20, packets: int = 200, lifetime: float = 30,
+                      churn: float = 0.0, segment_size: int = 16, seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    :param shape: One of TOPOLOGY_SHAPES
+    :param churn: Fraction of the bridges that start late or stop early
+    :param segment_size: Bridges per segment of a mixed topology
+    :return: A topology in the format of configs/*.conf
+    """
+    if shape not in TOPOLOGY_SHAPES:
+        raise ValueError(f"Unknown topology shape '{shape}', expected one of {TOPOLOGY_SHAPES}")
+
+    rng = random.Random(seed)
+    builder = TopologyBuilder(rng)
+
+    if shape == 'mixed':
+        builder.mixed(bridge_count, segment_size)
+    else:
+        getattr(builder, shape)(bridge_count)
+
+    builder.add_churn(churn, lifetime)
+
+    topology = {
+        "lifetime": lifetime,
+        "bridges": builder.bridges,
+        "hosts": hosts,
+        "packets": packets,
+    }
+
+    if seed is not None:
+        topology["seed"] = seed
+
+    return topology
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Generate parser for commandline arguments:
+
+    shape: ring, mesh, tree or mixed
+    bridges: number of bridges of the topology
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='CS 3700 topology generator')
+    parser.add_argument('shape', type=str, choices=TOPOLOGY_SHAPES, help="Shape of the topology")
+    parser.add_argument('bridges', type=int, help="Number of bridges")
+    parser.add_argument('--hosts', type=int, default=20, help="Number of hosts")
+    parser.add_argument('--packets', type=int, default=200, help="Number of data packets sent by the hosts")
+    parser.add_argument('--lifetime', type=float, default=30, help="Seconds the topology runs for")
+    parser.add_argument('--churn', type=float, default=0.0, help="Fraction of bridges that start late or stop early")
+    parser.add_argument('--segment-size', type=int, default=16, help="Bridges per segment of a mixed topology")
+    parser.add_argument('--seed', type=int, default=None, help="Seed of the generator and of the traffic")
+
+    return parser
+
+
+def main() -> None:
+    parser = create_parser()
+    args: argparse.Namespace = parser.parse_args(sys.argv[1:])
+
+    topology = generate_topology(args.shape, args.bridges, hosts=args.hosts, packets=args.packets,
+                                 lifetime=args.lifetime, churn=args.churn, segment_size=args.segment_size,
+                                 seed=args.seed)
+
+    json.dump(topology, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
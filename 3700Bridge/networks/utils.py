@@ -4,11 +4,15 @@ import dataclasses
 
 
 class Replaceable:
+    __slots__ = ()
+
     def replace(self, **kwargs) -> 'Replaceable':
         return dataclasses.replace(self, **kwargs)
 
 
 class Serializable:
+    __slots__ = ()
+
     def serialize(self) -> Any:
         """
         :return: JSON compatible equivalent of this Packet instance
@@ -36,6 +40,7 @@ class Deserializable:
     """
     Parent for a dataclass that can be deserialized from a JSON object
     """
+    __slots__ = ()
 
     @classmethod
     def deserialize(cls, **json_kwargs):
@@ -0,0 +1,52 @@
+import io
+import unittest
+
+from typing import Any, Dict, Optional, Tuple
+
+from socket import socket, AF_INET, SOCK_DGRAM
+
+from networks.bridge import Bridge
+from networks.port import Port
+from networks.reactor import Reactor
+from networks.packet import Packet
+from networks.event_log import EventLog
+
+
+def bind_lan_port(index: int = 0, lan_timeout: Optional[float] = None) -> Tuple[socket, Port]:
+    """
+    :param index: The index of the created Port
+    :param lan_timeout: The timeout of the LAN socket, 0 for a non-blocking socket and None for a blocking one
+    :return: A localhost socket standing in for the LAN and a Port connected to it
+    """
+    lan_socket = socket(AF_INET, SOCK_DGRAM)
+    lan_socket.bind(('localhost', 0))
+    lan_socket.settimeout(lan_timeout)
+
+    port_socket = socket(AF_INET, SOCK_DGRAM)
+    port_socket.bind(('localhost', 0))
+
+    return lan_socket, Port(index, lan_socket.getsockname()[1], port_socket)
+
+
+class LanBridgeTestCase(unittest.TestCase):
+    """
+    A Bridge with a single Port on a localhost LAN, run by its own Reactor.
+
+    Subclasses pass their Bridge arguments through bridge_options
+    """
+    bridge_options: Dict[str, Any] = {}
+
+    def setUp(self) -> None:
+        self.lan_socket, self.port = bind_lan_port(lan_timeout=1)
+
+        self.reactor = Reactor()
+        self.bridge = Bridge(identity="92b4", ports=[self.port], log=EventLog(stream=io.StringIO()),
+                             clock=self.reactor.clock, **self.bridge_options)
+
+    def tearDown(self) -> None:
+        self.bridge.stop()
+        self.lan_socket.close()
+        self.port.socket.close()
+
+    def _send_to_port(self, packet: Packet) -> None:
+        self.lan_socket.sendto(packet.encode(), self.port.socket.getsockname())
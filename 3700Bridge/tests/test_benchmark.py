@@ -0,0 +1,83 @@
+import unittest
+
+from socket import socket, AF_INET, SOCK_DGRAM
+
+from networks.benchmark import Benchmark, SimulatedHost, SimulatedLAN
+from networks.frame import Frame
+from networks.packet import Packet, MessageType
+from networks.reactor import Reactor
+
+
+class TestSimulatedLAN(unittest.TestCase):
+    def setUp(self) -> None:
+        self.reactor = Reactor()
+        self.lan = SimulatedLAN(1, self.reactor, delay=0)
+
+        self.clients = []
+        for _ in range(2):
+            client = socket(AF_INET, SOCK_DGRAM)
+            client.bind(('localhost', 0))
+            client.settimeout(1)
+            self.clients.append(client)
+
+    def tearDown(self) -> None:
+        self.lan.close()
+        for client in self.clients:
+            client.close()
+
+    def test_repeats_to_other_clients_and_hosts(self):
+        host = SimulatedHost("97bf", self.lan)
+        first, second = self.clients
+
+        # the LAN learns a client from the first datagram it sends
+        second.sendto(Packet(source="28aa", dest="ffff", msg_id=0, type=MessageType.DataMessage,
+                             message={}).encode(), ('localhost', self.lan.port))
+        self.reactor.run_once(max_timeout=1)
+
+        first.sendto(Packet(source="28aa", dest="97bf", msg_id=1, type=MessageType.DataMessage,
+                            message={}).encode(), ('localhost', self.lan.port))
+        self.reactor.run_once(max_timeout=1)
+
+        self.assertEqual(1, Frame.peek(second.recvfrom(1500)[0]).msg_id)
+        self.assertEqual({("28aa", 1): 1}, host.deliveries)
+        self.assertEqual(2, self.lan.data_frames)
+
+
+class TestBenchmark(unittest.TestCase):
+    def setUp(self) -> None:
+        topology = {
+            "lifetime": 10,
+            "bridges": [{"id": "f8ad", "lans": [1, 2]},
+                        {"id": "9e3a", "lans": [2, 3], "stop": 4},
+                        {"id": "1000", "lans": [1, 3], "start": 4}],
+            "hosts": 4,
+            "packets": 10,
+            "seed": 1
+        }
+        self.benchmark = Benchmark(topology, lan_delay=0, sample_interval=0.01)
+
+    def tearDown(self) -> None:
+        for identity in list(self.benchmark.fabric.bridges):
+            self.benchmark.fabric.remove_bridge(identity)
+
+        for lan in self.benchmark.lans.values():
+            lan.close()
+
+    def test_simultaneous_events_are_grouped(self):
+        self.assertEqual([(0.0, "initial"), (4, "stop 9e3a, start 1000")], self.benchmark.events)
+
+    def test_convergence(self):
+        self.benchmark.change_times = [0.01, 0.05, 4.2, 9.99]
+
+        convergence = self.benchmark.convergence()
+
+        self.assertEqual([0.05, 5.99], [event["seconds"] for event in convergence])
+        self.assertEqual([True, False], [event["settled"] for event in convergence])
+
+    def test_results_before_running(self):
+        results = self.benchmark.results()
+
+        self.assertEqual(3, results["bridges"])
+        self.assertEqual(3, results["lans"])
+        self.assertEqual(0, results["delivery"]["sent"])
+        self.assertEqual(0.0, results["throughput"]["frames_per_second"])
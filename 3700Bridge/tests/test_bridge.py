@@ -1,10 +1,73 @@
+import time
 import unittest
 
+from lan_fixture import bind_lan_port
+
+from networks.bridge import Bridge
 from networks.port import Port
+from networks.packet import Packet, BPDU, MessageType
 
 class CalculateBridgeSource(unittest.TestCase):
 
     def setUp(self) -> None:
         self.port1 = Port()
 
-        self.bridge = None
\ No newline at end of file
+        self.bridge = None
+
+class TestIngressBatching(unittest.TestCase):
+    def setUp(self) -> None:
+        self.lan_socket, self.port = bind_lan_port()
+
+    def tearDown(self) -> None:
+        self.lan_socket.close()
+        self.port.socket.close()
+
+    def _send_to_port(self, packet: Packet) -> None:
+        self.lan_socket.sendto(packet.encode(), self.port.socket.getsockname())
+
+    def test_drains_ready_port(self):
+        bridge = Bridge(identity="92b4", ports=[self.port], ingress_budget=64)
+
+        bpdu = BPDU(id="02a1", root="02a1", cost=0, port=0)
+        self._send_to_port(Packet(source="02a1", dest="ffff", msg_id=0,
+                                  type=MessageType.BridgeProtocolDataUnit, message=bpdu))
+        for msg_id in range(4):
+            self._send_to_port(Packet(source="28aa", dest="97bf", msg_id=msg_id,
+                                      type=MessageType.DataMessage, message={}))
+
+        # give the loopback datagrams time to be queued
+        time.sleep(0.05)
+        spanning_requests, forwarding_requests = bridge.accept_requests(sec_timeout=1)
+
+        self.assertEqual([bpdu], [request.bpdu for request in spanning_requests])
+        self.assertEqual([0, 1, 2, 3], [request.packet.msg_id for request in forwarding_requests])
+        self.assertEqual(1, bridge.ingress_stats.batch_count)
+        self.assertEqual(5, bridge.ingress_stats.max_depth)
+
+    def test_long_bridge_ids(self):
+        bridge = Bridge(identity="bridge-long-id", ports=[self.port], ingress_budget=64)
+
+        bpdu = BPDU(id="neighbour-long-id", root="02a1", cost=1, port=0)
+        self._send_to_port(Packet(source="neighbour-long-id", dest="ffff", msg_id=0,
+                                  type=MessageType.BridgeProtocolDataUnit, message=bpdu))
+
+        time.sleep(0.05)
+        spanning_requests, _ = bridge.accept_requests(sec_timeout=1)
+
+        self.assertEqual([bpdu], [request.bpdu for request in spanning_requests])
+        self.assertLess(bpdu, bridge.DEFAULT_ROOT_BPDU)
+
+    def test_budget_limits_batch(self):
+        bridge = Bridge(identity="92b4", ports=[self.port], ingress_budget=2)
+
+        for msg_id in range(3):
+            self._send_to_port(Packet(source="28aa", dest="97bf", msg_id=msg_id,
+                                      type=MessageType.DataMessage, message={}))
+
+        time.sleep(0.05)
+        _, first_batch = bridge.accept_requests(sec_timeout=1)
+        _, second_batch = bridge.accept_requests(sec_timeout=1)
+
+        self.assertEqual([0, 1], [request.packet.msg_id for request in first_batch])
+        self.assertEqual([2], [request.packet.msg_id for request in second_batch])
+        self.assertEqual({2: 1, 1: 1}, dict(bridge.ingress_stats.depth_histogram))
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+
+from networks.capture import CaptureWriter, CaptureDirection, read_capture
+from networks.packet import Packet, BPDU, MessageType
+from networks.replay import Replay
+
+from networks.constants import ALL_LANS_ID
+
+
+class TestCapture(unittest.TestCase):
+    def setUp(self) -> None:
+        capture_file, self.path = tempfile.mkstemp()
+        os.close(capture_file)
+
+        self.now = 100.0
+        self.writer = CaptureWriter(self.path, identity="92b4", port_count=2, clock=lambda: self.now)
+
+    def tearDown(self) -> None:
+        self.writer.close()
+        os.unlink(self.path)
+
+    def _data(self, source: str, dest: str, msg_id: int) -> bytes:
+        return Packet(source=source, dest=dest, msg_id=msg_id, type=MessageType.DataMessage,
+                      message={}).encode()
+
+    def test_round_trip(self):
+        self.writer.record(CaptureDirection.Ingress, 1, b'{"first": 1}')
+        self.now = 100.5
+        self.writer.record(CaptureDirection.Egress, 0, b'{"second": 2}')
+        self.writer.flush()
+
+        header, records = read_capture(self.path)
+        records = list(records)
+
+        self.assertEqual({"identity": "92b4", "port_count": 2, "start_time": 100.0}, header)
+        self.assertEqual([(100.0, CaptureDirection.Ingress, 1, b'{"first": 1}'),
+                          (100.5, CaptureDirection.Egress, 0, b'{"second": 2}')],
+                         [(record.time, record.direction, record.port, record.data) for record in records])
+
+    def test_truncated_record_ignored(self):
+        self.writer.record(CaptureDirection.Ingress, 1, b'{"first": 1}')
+        self.writer.record(CaptureDirection.Ingress, 1, b'{"second": 2}')
+        self.writer.close()
+
+        with open(self.path, 'r+b') as capture_file:
+            capture_file.truncate(os.path.getsize(self.path) - 1)
+
+        _header, records = read_capture(self.path)
+        self.assertEqual(1, len(list(records)))
+
+    def test_not_a_capture(self):
+        with open(self.path, 'wb') as capture_file:
+            capture_file.write(b'{"source": "28aa"}')
+
+        with self.assertRaises(ValueError):
+            read_capture(self.path)
+
+    def test_replay(self):
+        bpdu = BPDU(id="02a1", root="02a1", cost=0, port=0)
+        self.writer.record(CaptureDirection.Ingress, 0, Packet(source="02a1", dest=ALL_LANS_ID, msg_id=0,
+                                                               type=MessageType.BridgeProtocolDataUnit,
+                                                               message=bpdu).encode())
+
+        # before the BPDU expires: a frame from a host behind port 1, then the answer from behind port 0
+        self.now = 100.3
+        self.writer.record(CaptureDirection.Ingress, 1, self._data("28aa", "97bf", 0))
+        self.now = 100.4
+        self.writer.record(CaptureDirection.Ingress, 0, self._data("97bf", "28aa", 0))
+        self.writer.flush()
+
+        replay = Replay(self.path, hold_max_depth=0)
+        result = replay.run()
+
+        self.assertEqual(3, result["ingress_frames"])
+        self.assertEqual(0, replay.bridge.root_port)
+        self.assertEqual(1, replay.bridge.counters.learning_misses)
+        self.assertEqual(1, replay.bridge.counters.learning_hits)
+
+        # the flooded frame left on port 0 and the answer on port 1, besides the BPDUs
+        self.assertEqual(1, replay.ports[0].counters.broadcasts_out)
+        self.assertEqual(1, replay.ports[1].counters.frames_out - replay.ports[1].counters.bpdus_out)
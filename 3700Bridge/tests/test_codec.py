@@ -0,0 +1,55 @@
+import unittest
+
+from networks import codec
+from networks.frame import Frame
+from networks.packet import Packet, BPDU, BPDUFlags, MessageType
+
+
+class TestBinaryCodec(unittest.TestCase):
+    def setUp(self) -> None:
+        self.bpdu_packet = Packet(source="92b4", dest="ffff", msg_id=27, type=MessageType.BridgeProtocolDataUnit,
+                                  message=BPDU(id="92b4", root="02a1", cost=3, port=2))
+        self.data_packet = Packet(source="28aa", dest="97bf", msg_id=4, type=MessageType.DataMessage,
+                                  message={"data": "0123456789abcdef"})
+
+    def test_bpdu_round_trip(self):
+        encoded = codec.encode_packet(self.bpdu_packet)
+
+        self.assertTrue(codec.is_binary(encoded))
+        self.assertLess(len(encoded), len(self.bpdu_packet.encode()))
+        self.assertEqual(self.bpdu_packet, codec.decode_packet(encoded))
+
+    def test_bpdu_flags_round_trip(self):
+        flagged_packet = self.bpdu_packet.replace(message=self.bpdu_packet.message.with_flags(BPDUFlags.Agreement))
+
+        self.assertEqual(BPDUFlags.Agreement, codec.decode_packet(codec.encode_packet(flagged_packet)).message.flags)
+
+    def test_data_round_trip(self):
+        encoded = codec.encode_packet(self.data_packet)
+
+        self.assertEqual(self.data_packet, codec.decode_packet(encoded))
+
+    def test_json_is_not_binary(self):
+        self.assertFalse(codec.is_binary(self.bpdu_packet.encode()))
+
+    def test_frame_peeks_both_encodings(self):
+        for encoded in (codec.encode_packet(self.data_packet), self.data_packet.encode()):
+            frame = Frame.peek(encoded)
+
+            self.assertEqual(("28aa", "97bf", 4), (frame.source, frame.dest, frame.msg_id))
+            self.assertFalse(frame.is_bpdu)
+            self.assertEqual(self.data_packet, frame.to_packet())
+
+        self.assertTrue(Frame.peek(codec.encode_packet(self.bpdu_packet)).is_bpdu)
+
+    def test_template_renders_per_port(self):
+        template = codec.BinaryBPDUTemplate(self.bpdu_packet)
+
+        rendered = template.render({'msg_id': 9, 'message.port': 5})
+
+        expected_packet = self.bpdu_packet.replace(msg_id=9, message=self.bpdu_packet.message.replace(port=5))
+        self.assertEqual(expected_packet, codec.decode_packet(rendered))
+
+    def test_rejects_long_ids(self):
+        with self.assertRaises(ValueError):
+            codec.encode_packet(self.bpdu_packet.replace(source="92b4a"))
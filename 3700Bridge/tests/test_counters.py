@@ -0,0 +1,87 @@
+import io
+import os
+import json
+import time
+import tempfile
+import unittest
+
+from socket import socket, AF_UNIX, SOCK_STREAM
+
+from lan_fixture import LanBridgeTestCase
+
+from networks.reactor import Reactor
+from networks.packet import Packet, BPDU, MessageType
+from networks.counters import LatencyHistogram, CountersExporter
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_power_of_two_buckets(self):
+        histogram = LatencyHistogram()
+
+        for seconds in (0.000003, 0.000005, 0.0001):
+            histogram.record(seconds)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(3, snapshot['count'])
+        self.assertEqual({"<4": 1, "<8": 1, "<128": 1}, snapshot['buckets_us'])
+        self.assertAlmostEqual(100, snapshot['max_us'])
+
+
+class TestBridgeCounters(LanBridgeTestCase):
+    # the data frame sent right after the start is forwarded instead of held until the tree is stable
+    bridge_options = {'hold_max_depth': 0}
+
+    def test_counts_frames_and_bpdus(self):
+        self.bridge.start(self.reactor)
+
+        self._send_to_port(Packet(source="02a1", dest="ffff", msg_id=0, type=MessageType.BridgeProtocolDataUnit,
+                                  message=BPDU(id="02a1", root="02a1", cost=0, port=0)))
+        self._send_to_port(Packet(source="28aa", dest="97bf", msg_id=1, type=MessageType.DataMessage, message={}))
+
+        time.sleep(0.05)
+        self.reactor.run_once(max_timeout=0.1)
+
+        snapshot = self.bridge.counters_snapshot()
+        port_snapshot = snapshot['ports'][0]
+
+        self.assertEqual(2, port_snapshot['frames_in'])
+        self.assertEqual(1, port_snapshot['bpdus_in'])
+        self.assertGreaterEqual(port_snapshot['bpdus_out'], 1)
+        self.assertEqual(1, snapshot['learning_misses'])
+        self.assertEqual("02a1", snapshot['root'])
+        self.assertGreaterEqual(snapshot['root_changes'], 2)
+        self.assertEqual(1, snapshot['loop_latency']['count'])
+
+        # the snapshot is exported as JSON
+        json.dumps(snapshot)
+
+
+class TestCountersExporter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.reactor = Reactor()
+        self.socket_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.socket_dir.cleanup()
+
+    def test_interval_snapshots(self):
+        stream = io.StringIO()
+        exporter = CountersExporter(self.reactor, lambda: {'frames': 3}, stream=stream, interval=0.01)
+
+        time.sleep(0.02)
+        self.reactor.run_once(max_timeout=0.05)
+        exporter.close()
+
+        self.assertEqual(3, json.loads(stream.getvalue().splitlines()[0])['frames'])
+
+    def test_socket_snapshot(self):
+        socket_path = os.path.join(self.socket_dir.name, "counters.sock")
+        exporter = CountersExporter(self.reactor, lambda: {'frames': 5}, socket_path=socket_path)
+
+        with socket(AF_UNIX, SOCK_STREAM) as client:
+            client.connect(socket_path)
+            self.reactor.run_once(max_timeout=0.1)
+
+            self.assertEqual(5, json.loads(client.makefile().readline())['frames'])
+
+        exporter.close()
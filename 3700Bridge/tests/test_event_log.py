@@ -0,0 +1,56 @@
+import io
+import unittest
+
+from networks.event_log import EventLog, EventKind, LogLevel
+
+
+class TestEventLog(unittest.TestCase):
+    def setUp(self) -> None:
+        self.stream = io.StringIO()
+
+    def test_buffers_until_flush(self):
+        log = EventLog(stream=self.stream)
+
+        log.debug(EventKind.Forwarded, "Forwarding %s/%s to port %s", "28aa", 4, 5000)
+        log.info(EventKind.PortRole, "Disabled port: %d", 1)
+        self.assertEqual("", self.stream.getvalue())
+
+        log.flush()
+        self.assertEqual("Forwarding 28aa/4 to port 5000\nDisabled port: 1\n", self.stream.getvalue())
+
+    def test_flushes_when_buffer_is_full(self):
+        log = EventLog(stream=self.stream, buffer_size=2)
+
+        log.debug(EventKind.Broadcast, "first")
+        log.debug(EventKind.Broadcast, "second")
+
+        self.assertEqual("first\nsecond\n", self.stream.getvalue())
+
+    def test_level_filters_lines_but_counts_events(self):
+        log = EventLog(stream=self.stream, level=LogLevel.INFO)
+
+        log.debug(EventKind.Dropped, "Not forwarding %s/%s", "28aa", 4)
+        log.info(EventKind.Startup, "Bridge starting up")
+        log.flush()
+
+        self.assertEqual("Bridge starting up\n", self.stream.getvalue())
+        self.assertEqual(1, log.event_counts[EventKind.Dropped])
+
+    def test_unbuffered_writes_immediately(self):
+        log = EventLog(stream=self.stream, buffered=False)
+
+        log.info(EventKind.Startup, "Bridge starting up")
+        self.assertEqual("Bridge starting up\n", self.stream.getvalue())
+
+    def test_summary_only(self):
+        log = EventLog(stream=self.stream, summary_only=True)
+
+        log.debug(EventKind.Broadcast, "Broadcasting %s/%s to all active ports", "28aa", 4)
+        log.debug(EventKind.Broadcast, "Broadcasting %s/%s to all active ports", "28aa", 5)
+        log.flush()
+
+        # nothing new happened, so nothing is written again
+        log.flush()
+
+        self.assertEqual(1, self.stream.getvalue().count("\n"))
+        self.assertIn("broadcast=2", self.stream.getvalue())
@@ -0,0 +1,52 @@
+import unittest
+
+from socket import socket, AF_INET, SOCK_DGRAM
+
+from networks.fabric import Fabric, load_topology, parse_lan_port
+from networks.frame import Frame
+
+
+class TestFabric(unittest.TestCase):
+    def setUp(self) -> None:
+        self.lan_sockets = {}
+        for lan in (1, 2):
+            self.lan_sockets[lan] = socket(AF_INET, SOCK_DGRAM)
+            self.lan_sockets[lan].bind(('localhost', 0))
+            self.lan_sockets[lan].settimeout(1)
+
+        self.lan_ports = {lan: lan_socket.getsockname()[1] for lan, lan_socket in self.lan_sockets.items()}
+        self.fabric = Fabric(summary_only=True)
+
+    def tearDown(self) -> None:
+        for lan_socket in self.lan_sockets.values():
+            lan_socket.close()
+
+        for identity in list(self.fabric.bridges):
+            self.fabric.remove_bridge(identity)
+
+    def test_bridges_share_one_reactor(self):
+        topology = {
+            "lifetime": 4,
+            "bridges": [{"id": "f8ad", "lans": [1, 2]},
+                        {"id": "9e3a", "lans": [2], "stop": 2}]
+        }
+        load_topology(self.fabric, topology, self.lan_ports)
+
+        # both bridges start on the first wakeup
+        self.fabric.reactor.run_once(max_timeout=0.1)
+
+        bpdu_sources = {Frame.peek(self.lan_sockets[2].recvfrom(1500)[0]).source for _ in range(2)}
+        self.assertEqual({"f8ad", "9e3a"}, bpdu_sources)
+        self.assertTrue(all(bridge.active for bridge in self.fabric.bridges.values()))
+
+        self.fabric.remove_bridge("9e3a")
+        self.assertEqual(["f8ad"], list(self.fabric.bridges))
+
+    def test_missing_lan_port(self):
+        topology = {"bridges": [{"id": "f8ad", "lans": [1, 3]}]}
+
+        with self.assertRaises(ValueError):
+            load_topology(self.fabric, topology, self.lan_ports)
+
+    def test_parse_lan_port(self):
+        self.assertEqual((3, 40001), parse_lan_port("3=40001"))
@@ -0,0 +1,52 @@
+import unittest
+
+from networks.port import Port
+from networks.forwarding_table import ForwardingTable
+
+
+class TestForwardingTable(unittest.TestCase):
+    def setUp(self) -> None:
+        self.ports = [Port(index, port_num=0, comm_line=None) for index in range(3)]
+        self.table = ForwardingTable(timeout=5.0, max_size=3)
+
+    def test_learn_and_lookup(self):
+        self.table.learn("28aa", self.ports[1], now=0.0)
+
+        self.assertIs(self.ports[1], self.table.lookup("28aa", now=1.0))
+        self.assertIsNone(self.table.lookup("97bf", now=1.0))
+
+    def test_moved_host_is_relearned(self):
+        self.table.learn("28aa", self.ports[1], now=0.0)
+        self.table.learn("28aa", self.ports[2], now=1.0)
+
+        self.assertIs(self.ports[2], self.table.lookup("28aa", now=1.0))
+
+        # the old port no longer owns the entry
+        self.assertEqual(0, self.table.invalidate_ports([self.ports[1]]))
+        self.assertIn("28aa", self.table)
+
+    def test_entries_age_out(self):
+        self.table.learn("28aa", self.ports[0], now=0.0)
+        self.table.learn("97bf", self.ports[0], now=3.0)
+
+        self.assertIsNone(self.table.lookup("28aa", now=5.0))
+        self.assertEqual(1, self.table.expire(now=8.0))
+        self.assertEqual(0, len(self.table))
+
+    def test_least_recently_seen_is_evicted(self):
+        for now, address in enumerate(("0001", "0002", "0003")):
+            self.table.learn(address, self.ports[0], now=float(now))
+
+        # refreshing moves 0001 to the most recent end
+        self.table.learn("0001", self.ports[0], now=3.0)
+        self.table.learn("0004", self.ports[0], now=4.0)
+
+        self.assertEqual(["0003", "0001", "0004"], list(self.table))
+
+    def test_invalidate_only_changed_ports(self):
+        self.table.learn("28aa", self.ports[0], now=0.0)
+        self.table.learn("97bf", self.ports[1], now=0.0)
+        self.table.learn("0001", self.ports[1], now=0.0)
+
+        self.assertEqual(2, self.table.invalidate_ports([self.ports[1]]))
+        self.assertEqual(["28aa"], list(self.table))
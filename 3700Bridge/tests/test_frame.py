@@ -0,0 +1,64 @@
+import json
+import unittest
+
+from networks.frame import Frame, FrameTemplate
+from networks.packet import Packet, BPDU, BPDUFlags, MessageType
+from networks import codec
+
+
+class TestFrame(unittest.TestCase):
+    def test_peek_data_frame(self):
+        example_data_json = {
+            "source": "28aa",
+            "dest": "97bf",
+            "msg_id": 4,
+            "type": "data",
+            "message": {"data": "0123456789abcdef"}
+        }
+        raw_bytes = json.dumps(example_data_json).encode('utf-8')
+
+        frame = Frame.peek(raw_bytes)
+
+        self.assertEqual("28aa", frame.source)
+        self.assertEqual("97bf", frame.dest)
+        self.assertEqual(4, frame.msg_id)
+        self.assertEqual(MessageType.DataMessage, frame.type)
+        self.assertFalse(frame.is_bpdu)
+
+        # forwarded bytes are identical to the received bytes
+        self.assertIs(raw_bytes, frame.encode())
+
+    def test_peek_bpdu_frame(self):
+        bpdu = BPDU(id="92b4", root="02a1", cost=3, port=2)
+        packet = Packet(source="92b4", dest="ffff", msg_id=27, type=MessageType.BridgeProtocolDataUnit, message=bpdu)
+
+        frame = Frame.peek(packet.encode())
+
+        self.assertTrue(frame.is_bpdu)
+        self.assertEqual(packet, frame.to_packet())
+
+    def test_to_bpdu(self):
+        bpdu = BPDU(id="92b4", root="02a1", cost=3, port=2).with_flags(BPDUFlags.Proposal)
+        packet = Packet(source="92b4", dest="ffff", msg_id=27, type=MessageType.BridgeProtocolDataUnit, message=bpdu)
+
+        for encoded in (packet.encode(), codec.encode_packet(packet)):
+            decoded_bpdu = Frame.peek(encoded).to_bpdu()
+
+            self.assertEqual(bpdu, decoded_bpdu)
+            self.assertEqual(BPDUFlags.Proposal, decoded_bpdu.flags)
+
+
+class TestFrameTemplate(unittest.TestCase):
+    def test_render_matches_packet_encoding(self):
+        bpdu = BPDU(id="92b4", root="02a1", cost=3, port=0)
+        template = FrameTemplate(Packet(source="92b4", dest="ffff", msg_id=0,
+                                        type=MessageType.BridgeProtocolDataUnit, message=bpdu),
+                                 'msg_id', 'message.port')
+
+        for msg_id, port in ((0, 0), (27, 2), (1024, 13)):
+            expected_packet = Packet(source="92b4", dest="ffff", msg_id=msg_id,
+                                     type=MessageType.BridgeProtocolDataUnit, message=bpdu.replace(port=port))
+
+            rendered = template.render({'msg_id': msg_id, 'message.port': port})
+
+            self.assertEqual(expected_packet, Frame.peek(rendered).to_packet())
@@ -0,0 +1,92 @@
+import time
+import unittest
+
+from lan_fixture import LanBridgeTestCase
+
+from networks.packet import Packet, BPDU, MessageType
+from networks.hold_queue import HoldQueue
+
+
+class TestHoldQueue(unittest.TestCase):
+    def setUp(self) -> None:
+        self.queue = HoldQueue(max_age=0.5, max_depth=2)
+
+    def test_overflow_pushes_out_oldest(self):
+        self.assertIsNone(self.queue.hold("first", now=0.0))
+        self.assertIsNone(self.queue.hold("second", now=0.1))
+
+        self.assertEqual("first", self.queue.hold("third", now=0.2))
+        self.assertEqual(["second", "third"], self.queue.drain())
+        self.assertEqual(0, len(self.queue))
+
+    def test_pop_aged(self):
+        self.queue.hold("first", now=0.0)
+        self.queue.hold("second", now=0.3)
+
+        self.assertEqual([], self.queue.pop_aged(now=0.4))
+        self.assertEqual(["first"], self.queue.pop_aged(now=0.5))
+        self.assertEqual(0.3, self.queue.oldest_time)
+
+    def test_disabled(self):
+        self.assertFalse(HoldQueue(max_depth=0).enabled)
+
+
+class TestBridgeHoldQueue(LanBridgeTestCase):
+    bridge_options = {'hold_max_age': 5.0}
+
+    def _send_data(self, msg_id: int) -> None:
+        self._send_to_port(Packet(source="28aa", dest="97bf", msg_id=msg_id, type=MessageType.DataMessage,
+                                  message={}))
+
+    def test_held_until_stable(self):
+        self.bridge.start(self.reactor)
+        self.bridge.hold_until_stable(0.05)
+
+        self._send_data(0)
+        time.sleep(0.01)
+        self.reactor.run_once(max_timeout=0.01)
+
+        self.assertEqual(1, len(self.bridge.hold_queue))
+        self.assertEqual(0, self.bridge.counters.learning_misses)
+
+        # released by the hold timer once nothing changed for the settle interval
+        deadline = time.time() + 1
+        while len(self.bridge.hold_queue) and time.time() < deadline:
+            self.reactor.run_once(max_timeout=0.05)
+
+        self.assertEqual(0, len(self.bridge.hold_queue))
+        self.assertEqual(1, self.bridge.counters.hold_released)
+        self.assertEqual(1, self.bridge.counters.learning_misses)
+
+    def test_stable_bridge_forwards_at_once(self):
+        self.bridge.start(self.reactor)
+
+        # the start waits for a hello from every neighbour
+        self.assertFalse(self.bridge.tree_is_stable())
+        self.bridge._unstable_until = float('-inf')
+
+        self._send_data(0)
+        time.sleep(0.01)
+        self.reactor.run_once(max_timeout=0.01)
+
+        self.assertEqual(0, self.bridge.counters.held_frames)
+        self.assertEqual(1, self.bridge.counters.learning_misses)
+
+    def test_bpdu_wakeup_keeps_frames_held(self):
+        self.bridge.start(self.reactor)
+        self.bridge.hold_until_stable(5.0)
+
+        self._send_data(0)
+        time.sleep(0.01)
+        self.reactor.run_once(max_timeout=0.01)
+        self.assertEqual(1, len(self.bridge.hold_queue))
+
+        # a wakeup with only a BPDU within the settle interval
+        self._send_to_port(Packet(source="02a1", dest="ffff", msg_id=1, type=MessageType.BridgeProtocolDataUnit,
+                                  message=BPDU(id="02a1", root="02a1", cost=0, port=0)))
+        time.sleep(0.01)
+        self.reactor.run_once(max_timeout=0.01)
+
+        self.assertFalse(self.bridge.tree_is_stable())
+        self.assertEqual(1, len(self.bridge.hold_queue))
+        self.assertEqual(0, self.bridge.counters.hold_released)
@@ -0,0 +1,14 @@
+import unittest
+
+from networks.microbenchmark import run
+
+
+class TestMicrobenchmark(unittest.TestCase):
+    def test_measures_every_case(self):
+        results = run(frame_count=100)
+
+        self.assertEqual({"data", "data-deserialized", "bpdu", "bpdu-binary"}, set(results))
+
+        for measurements in results.values():
+            self.assertGreater(measurements["ns_per_frame"], 0)
+            self.assertGreater(measurements["blocks_per_frame"], 0)
@@ -1,7 +1,10 @@
 
+import json
+import random
 import unittest
+import dataclasses
 
-from networks.packet import Packet, BPDU, MessageType
+from networks.packet import Packet, BPDU, BPDUFlags, MessageType
 
 
 class TestBDPU(unittest.TestCase):
@@ -35,6 +38,74 @@ class TestBDPU(unittest.TestCase):
             bpdu
         )
 
+    def test_ordering_matches_fields(self):
+        rng = random.Random(3)
+        bpdus = [BPDU(root=rng.choice(["02a1", "92b4", "f00d"]), cost=rng.randrange(4), port=rng.randrange(3),
+                      id=rng.choice(["1000", "92b4", "aa09"])) for _ in range(200)]
+
+        def field_tuple(bpdu: BPDU):
+            return bpdu.root, bpdu.cost, bpdu.port, bpdu.id
+
+        self.assertEqual(sorted(bpdus, key=field_tuple), sorted(bpdus))
+        self.assertEqual(len({field_tuple(bpdu) for bpdu in bpdus}), len(set(bpdus)))
+
+    def test_long_ids_ordered_like_fields(self):
+        rng = random.Random(5)
+        bpdus = [BPDU(root=rng.choice(["02a1", "92b4", "bridge-long-root"]), cost=rng.randrange(4),
+                      port=rng.randrange(3), id=rng.choice(["1000", "bridge-long-id", "aa09"])) for _ in range(200)]
+
+        def field_tuple(bpdu: BPDU):
+            return bpdu.root, bpdu.cost, bpdu.port, bpdu.id
+
+        self.assertEqual(sorted(bpdus, key=field_tuple), sorted(bpdus))
+        self.assertEqual(len({field_tuple(bpdu) for bpdu in bpdus}), len(set(bpdus)))
+
+        long_bpdu = BPDU(id="bridge-long-id", root="02a1", cost=3, port=2)
+        self.assertEqual(BPDU(id="92b4", root="02a1", cost=4, port=2), long_bpdu.replace(cost=4).replace(id="92b4"))
+
+    def test_root_bpdu_sorts_first(self):
+        self.assertLess(BPDU(id="92b4", root="92b4", cost=0, port=None),
+                        BPDU(id="92b4", root="92b4", cost=0, port=0))
+
+    def test_out_of_range_fields_ordered_like_fields(self):
+        # from the first to the last BPDU; the outermost ports and costs don't fit in the integer key
+        bpdus = [BPDU(id="92b4", root="02a1", cost=cost, port=port)
+                 for cost in (-1, 0, 2 ** 32 - 1, 2 ** 32) for port in (None, -1, 0, 65534, 65535, 70000)]
+
+        self.assertEqual(bpdus, sorted(random.Random(7).sample(bpdus, len(bpdus))))
+        self.assertEqual(len(bpdus), len(set(bpdus)))
+        self.assertNotEqual(BPDU(id="92b4", root="02a1", cost=0, port=None),
+                            BPDU(id="92b4", root="02a1", cost=0, port=-1))
+
+        self.assertEqual(BPDU(id="92b4", root="02a1", cost=2 ** 32, port=65535),
+                         BPDU.deserialize(id="92b4", root="02a1", cost=2 ** 32, port=65535))
+        self.assertEqual(BPDU(id="92b4", root="02a1", cost=2 ** 32, port=2),
+                         BPDU(id="92b4", root="02a1", cost=3, port=2).replace(cost=2 ** 32))
+
+    def test_replace(self):
+        bpdu = BPDU(id="92b4", root="02a1", cost=3, port=2)
+
+        self.assertEqual(BPDU(id="1000", root="02a1", cost=4, port=2), bpdu.replace(cost=4, id="1000"))
+        self.assertEqual(BPDU(id="92b4", root="02a1", cost=3, port=0), bpdu.replace(port=0))
+        self.assertEqual(BPDU(id="92b4", root="02a1", cost=3, port=2).priority_key, bpdu.replace(cost=3).priority_key)
+
+    def test_flags_only_serialized_when_set(self):
+        bpdu = BPDU(id="92b4", root="02a1", cost=3, port=2)
+        flagged_bpdu = bpdu.with_flags(BPDUFlags.Proposal | BPDUFlags.TopologyChange)
+
+        self.assertNotIn('flags', bpdu.serialize())
+        self.assertEqual(bpdu, flagged_bpdu)
+        self.assertEqual(BPDUFlags.Proposal | BPDUFlags.TopologyChange,
+                         BPDU.deserialize(**flagged_bpdu.serialize()).flags)
+        self.assertEqual(0, flagged_bpdu.replace(cost=4).flags)
+
+    def test_immutable(self):
+        bpdu = BPDU(id="92b4", root="02a1", cost=3, port=2)
+
+        self.assertFalse(hasattr(bpdu, '__dict__'))
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            bpdu.cost = 1
+
 
 class TestPacket(unittest.TestCase):
     def test_networks_bpdu_example(self):
@@ -122,3 +193,17 @@ class TestPacket(unittest.TestCase):
         self.assertEqual(27, packet.msg_id)
         self.assertEqual(MessageType.BridgeProtocolDataUnit, packet.type)
         self.assertEqual(bpdu, packet.message)
+
+    def test_slotted_and_encoded_once(self):
+        packet = Packet(source="28aa", dest="97bf", msg_id=4, type=MessageType.DataMessage, message={})
+
+        self.assertFalse(hasattr(packet, '__dict__'))
+        self.assertIs(packet.encode(), packet.encode())
+        self.assertEqual(packet, Packet.deserialize(**json.loads(packet.encode())))
+
+    def test_deserialize_rejects_mismatched_fields(self):
+        with self.assertRaises(ValueError):
+            Packet.deserialize(source="92b4", dest="ffff", msg_id=27, type="bpdu", message={"data": "0123"})
+
+        with self.assertRaises(ValueError):
+            Packet.deserialize(source="92b4", dest="ffff", msg_id=27, type="data", message={}, extra=1)
@@ -0,0 +1,146 @@
+import io
+import unittest
+
+from typing import List
+
+from socket import socket
+
+from lan_fixture import bind_lan_port
+
+from networks.bridge import Bridge
+from networks.port import Port, PortStatus, PortRole
+from networks.frame import Frame
+from networks.packet import BPDU, BPDUFlags
+from networks.event_log import EventLog
+from networks.request_handler import SpanningTreeRequest
+
+
+class TestRapidSpanningTree(unittest.TestCase):
+    def setUp(self) -> None:
+        self.lan_sockets: List[socket] = []
+        self.ports: List[Port] = []
+
+        for index in range(3):
+            lan_socket, port = bind_lan_port(index, lan_timeout=0)
+            self.lan_sockets.append(lan_socket)
+            self.ports.append(port)
+
+        # without a reactor the proposals never time out, they only end with an agreement
+        self.now = 0.0
+        self.bridge = Bridge(identity="92b4", ports=self.ports, log=EventLog(stream=io.StringIO()),
+                             clock=lambda: self.now, rapid_spanning_tree=True)
+
+        self.bridge.root_port = self.bridge.DEFAULT_ROOT_PORT
+        self.bridge.root_bpdu = self.bridge.DEFAULT_ROOT_BPDU
+        self.bridge.rapid.start()
+
+        self.root_bpdu = BPDU(id="02a1", root="02a1", cost=0, port=0)
+        self.alternate_bpdu = BPDU(id="1000", root="02a1", cost=1, port=0)
+
+    def tearDown(self) -> None:
+        for lan_socket in self.lan_sockets:
+            lan_socket.close()
+
+        for port in self.ports:
+            port.socket.close()
+
+    def _receive(self, *port_bpdu_pairs) -> None:
+        self.bridge.rapid.receive([SpanningTreeRequest(self.ports[index], bpdu) for index, bpdu in port_bpdu_pairs])
+
+    def _sent_flags(self, index: int) -> List[int]:
+        flags = []
+
+        while True:
+            try:
+                data = self.lan_sockets[index].recv(1500)
+            except BlockingIOError:
+                return flags
+
+            flags.append(Frame.peek(data).to_packet().message.flags)
+
+    def test_starts_proposing_on_every_port(self):
+        self.assertEqual([PortRole.DESIGNATED] * 3, [port.role for port in self.ports])
+        self.assertEqual([PortStatus.DISABLED] * 3, [port.status for port in self.ports])
+        self.assertTrue(all(flags & BPDUFlags.Proposal for flags in self._sent_flags(0)))
+
+    def test_roles(self):
+        self._receive((0, self.root_bpdu), (1, self.alternate_bpdu))
+
+        self.assertEqual(0, self.bridge.root_port)
+        self.assertEqual(BPDU(id="92b4", root="02a1", cost=1, port=0), self.bridge.root_bpdu)
+        self.assertEqual([PortRole.ROOT, PortRole.ALTERNATE, PortRole.DESIGNATED],
+                         [port.role for port in self.ports])
+
+    def test_backup_port(self):
+        self._receive((0, self.root_bpdu), (2, BPDU(id="92b4", root="02a1", cost=1, port=1)))
+
+        self.assertEqual(PortRole.BACKUP, self.ports[2].role)
+
+    def test_alternate_promoted_when_root_port_fails(self):
+        self._receive((0, self.root_bpdu), (1, self.alternate_bpdu))
+
+        # only the alternate path is still refreshed when the root BPDU ages out
+        self.now = 1.0
+        self._receive((1, self.alternate_bpdu))
+        self.bridge.rapid.update()
+
+        self.assertEqual(1, self.bridge.root_port)
+        self.assertEqual(BPDU(id="92b4", root="02a1", cost=2, port=0), self.bridge.root_bpdu)
+        self.assertEqual(PortRole.DESIGNATED, self.ports[0].role)
+
+    def test_root_replaced_when_it_dies(self):
+        self._receive((0, self.root_bpdu))
+
+        self.now = 1.0
+        self.bridge.rapid.update()
+
+        self.assertIsNone(self.bridge.root_port)
+        self.assertEqual(self.bridge.DEFAULT_ROOT_BPDU, self.bridge.root_bpdu)
+
+    def test_non_designated_bpdu_is_not_a_path_to_the_root(self):
+        self._receive((0, self.root_bpdu.with_flags(BPDUFlags.NonDesignated)))
+
+        self.assertIsNone(self.bridge.root_port)
+        self.assertEqual(0, len(self.ports[0].seen_bpdus))
+
+    def test_proposal_syncs_then_agrees(self):
+        self._receive((0, self.root_bpdu))
+        self._receive((2, BPDU(id="f00d", root="02a1", cost=2, port=0).with_flags(BPDUFlags.Agreement)))
+        self.assertEqual(PortStatus.DESIGNATED, self.ports[2].status)
+
+        for index in range(3):
+            self._sent_flags(index)
+
+        self._receive((0, self.root_bpdu.with_flags(BPDUFlags.Proposal)))
+
+        # the designated port discards again until its own LAN agrees
+        self.assertEqual(PortStatus.DISABLED, self.ports[2].status)
+        self.assertTrue(any(flags & BPDUFlags.Proposal for flags in self._sent_flags(2)))
+
+        agreement_flags = self._sent_flags(0)
+        self.assertTrue(any(flags & BPDUFlags.Agreement for flags in agreement_flags))
+        self.assertTrue(all(flags & BPDUFlags.NonDesignated for flags in agreement_flags))
+
+    def test_agreement_of_every_neighbor_forwards(self):
+        self._receive((1, BPDU(id="f00d", root="f00d", cost=0, port=0)),
+                      (1, BPDU(id="fff0", root="fff0", cost=0, port=0)))
+        self.assertEqual(PortRole.DESIGNATED, self.ports[1].role)
+
+        agreement = BPDUFlags.Agreement | BPDUFlags.NonDesignated
+        self._receive((1, BPDU(id="f00d", root="92b4", cost=1, port=0).with_flags(agreement)))
+        self.assertEqual(PortStatus.DISABLED, self.ports[1].status)
+
+        self._receive((1, BPDU(id="fff0", root="92b4", cost=1, port=0).with_flags(agreement)))
+        self.assertEqual(PortStatus.DESIGNATED, self.ports[1].status)
+
+    def test_topology_change_flushes_other_ports(self):
+        self._receive((0, self.root_bpdu))
+
+        self.bridge.forwarding_table.learn("28aa", self.ports[0], self.now)
+        self.bridge.forwarding_table.learn("97bf", self.ports[1], self.now)
+
+        self._receive((0, self.root_bpdu.with_flags(BPDUFlags.TopologyChange)))
+
+        self.assertIn("28aa", self.bridge.forwarding_table)
+        self.assertNotIn("97bf", self.bridge.forwarding_table)
+        self.assertTrue(any(flags & BPDUFlags.TopologyChange for flags in self._sent_flags(1)))
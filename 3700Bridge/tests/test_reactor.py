@@ -0,0 +1,103 @@
+import unittest
+
+from socket import socket, AF_INET, SOCK_DGRAM
+
+from networks.reactor import TimerWheel, Reactor
+
+
+class FakeClock:
+    def __init__(self, now: float = 100.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTimerWheel(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.wheel = TimerWheel(clock=self.clock, tick=0.01, slot_count=16)
+        self.fired = []
+
+    def test_fires_in_deadline_order(self):
+        self.wheel.schedule(0.05, lambda: self.fired.append('second'))
+        self.wheel.schedule(0.02, lambda: self.fired.append('first'))
+
+        self.clock.now += 0.03
+        self.assertEqual(1, self.wheel.advance())
+        self.assertEqual(['first'], self.fired)
+
+        self.clock.now += 0.03
+        self.wheel.advance()
+        self.assertEqual(['first', 'second'], self.fired)
+
+    def test_cancelled_timer_does_not_fire(self):
+        timer = self.wheel.schedule(0.02, lambda: self.fired.append('cancelled'))
+        timer.cancel()
+
+        self.clock.now += 1
+        self.assertEqual(0, self.wheel.advance())
+        self.assertEqual([], self.fired)
+        self.assertEqual(0, len(self.wheel))
+
+    def test_deadline_beyond_one_revolution(self):
+        # 16 slots of 10ms only cover 160ms
+        self.wheel.schedule(0.5, lambda: self.fired.append('late'))
+
+        self.clock.now += 0.2
+        self.wheel.advance()
+        self.assertEqual([], self.fired)
+        self.assertAlmostEqual(0.3, self.wheel.time_until_next())
+
+        self.clock.now += 0.3
+        self.wheel.advance()
+        self.assertEqual(['late'], self.fired)
+
+    def test_time_until_next(self):
+        self.assertIsNone(self.wheel.time_until_next())
+
+        self.wheel.schedule(0.12, lambda: None)
+        self.wheel.schedule(0.04, lambda: None)
+        self.assertAlmostEqual(0.04, self.wheel.time_until_next())
+
+    def test_rescheduling_from_callback(self):
+        def periodic():
+            self.fired.append(self.clock.now)
+            self.wheel.schedule(0.5, periodic)
+
+        self.wheel.schedule(0.5, periodic)
+
+        for _ in range(3):
+            self.clock.now += 0.5
+            self.wheel.advance()
+
+        self.assertEqual(3, len(self.fired))
+
+
+class TestReactor(unittest.TestCase):
+    def test_dispatches_ready_sockets_by_handler(self):
+        receiver = socket(AF_INET, SOCK_DGRAM)
+        receiver.bind(('localhost', 0))
+        sender = socket(AF_INET, SOCK_DGRAM)
+
+        reactor = Reactor()
+        received = []
+        reactor.register(receiver, lambda ready: received.extend(s.recvfrom(1500)[0] for s in ready))
+
+        sender.sendto(b'hello', receiver.getsockname())
+        reactor.run_once(max_timeout=1)
+
+        self.assertEqual([b'hello'], received)
+
+        reactor.unregister(receiver)
+        receiver.close()
+        sender.close()
+
+    def test_wakes_for_timer(self):
+        reactor = Reactor()
+        fired = []
+        reactor.timers.schedule(0.02, lambda: fired.append(True))
+
+        reactor.run_once(max_timeout=1)
+
+        self.assertEqual([True], fired)
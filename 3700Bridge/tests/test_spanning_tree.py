@@ -0,0 +1,281 @@
+import unittest
+
+from typing import Optional
+
+from networks.bridge import Bridge
+from networks.port import Port, PortStatus
+from networks.packet import BPDU
+from networks.request_handler import SpanningTreeRequest
+from networks.spanning_tree import LazyPriorityQueue, BPDUTable
+
+from networks.constants import ROOT_HOLD_DOWN_SECOND_INTERVAL
+
+
+class TestLazyPriorityQueue(unittest.TestCase):
+    def test_peek_skips_dead_items(self):
+        live = {3, 1, 2}
+        queue = LazyPriorityQueue(is_live=live.__contains__)
+
+        for item in (3, 1, 2):
+            queue.push(item)
+
+        self.assertEqual(1, queue.peek())
+
+        live.discard(1)
+        self.assertEqual(2, queue.peek())
+
+        live.clear()
+        self.assertIsNone(queue.peek())
+
+    def test_revived_item_is_not_duplicated(self):
+        live = {1}
+        queue = LazyPriorityQueue(is_live=live.__contains__)
+
+        queue.push(1)
+        queue.push(1)
+        self.assertEqual(1, len(queue))
+
+    def test_compaction_keeps_live_items(self):
+        live = set()
+        queue = LazyPriorityQueue(is_live=live.__contains__)
+
+        for item in range(1000):
+            live.add(item)
+            queue.push(item)
+
+            # only the last ten items stay alive
+            live.discard(item - 10)
+
+        self.assertLess(len(queue), 1000)
+        self.assertEqual(990, queue.peek())
+
+
+class TestRootElection(unittest.TestCase):
+    def setUp(self) -> None:
+        self.ports = [Port(index, port_num=0, comm_line=None) for index in range(3)]
+        self.bridge = Bridge(identity="92b4", ports=self.ports, ingress_budget=1, clock=lambda: 0.0)
+
+        self.bridge.root_port = self.bridge.DEFAULT_ROOT_PORT
+        self.bridge.root_bpdu = self.bridge.DEFAULT_ROOT_BPDU
+
+    def _receive(self, port: Port, bpdu: BPDU) -> None:
+        if port.record_bpdu(bpdu, now=0.0):
+            self.bridge.root_candidates.push((bpdu, port.index))
+
+        port.status = PortStatus.DISABLED
+
+    def test_no_bpdus_is_root(self):
+        self.assertFalse(self.bridge.calculated_root_changed())
+        self.assertIsNone(self.bridge.root_port)
+
+    def test_best_bpdu_selects_root_port(self):
+        self._receive(self.ports[2], BPDU(id="02a1", root="02a1", cost=0, port=0))
+        self._receive(self.ports[1], BPDU(id="1000", root="02a1", cost=1, port=0))
+
+        self.assertTrue(self.bridge.calculated_root_changed())
+        self.assertEqual(2, self.bridge.root_port)
+        self.assertEqual(BPDU(id="92b4", root="02a1", cost=1, port=0), self.bridge.root_bpdu)
+
+    def test_equal_bpdus_prefer_lowest_port(self):
+        bpdu = BPDU(id="02a1", root="02a1", cost=0, port=0)
+        self._receive(self.ports[2], bpdu)
+        self._receive(self.ports[1], bpdu)
+
+        self.bridge.calculated_root_changed()
+        self.assertEqual(1, self.bridge.root_port)
+
+    def test_expired_bpdu_is_not_a_candidate(self):
+        self._receive(self.ports[0], BPDU(id="02a1", root="02a1", cost=0, port=0))
+        self._receive(self.ports[1], BPDU(id="1000", root="1000", cost=0, port=0))
+
+        self.ports[0].seen_bpdus.discard(BPDU(id="02a1", root="02a1", cost=0, port=0))
+
+        self.bridge.calculated_root_changed()
+        self.assertEqual(1, self.bridge.root_port)
+
+    def test_expired_root_is_replaced(self):
+        root_bpdu = BPDU(id="02a1", root="02a1", cost=0, port=0)
+        self._receive(self.ports[0], root_bpdu)
+        self._receive(self.ports[1], BPDU(id="1000", root="1000", cost=0, port=0))
+
+        self.bridge.calculated_root_changed()
+        self.assertEqual("02a1", self.bridge.root_bpdu.root)
+
+        # the worse root takes over once the BPDUs of the root stop
+        self.ports[0].seen_bpdus.discard(root_bpdu)
+
+        self.assertTrue(self.bridge.calculated_root_changed())
+        self.assertEqual(1, self.bridge.root_port)
+        self.assertEqual(BPDU(id="92b4", root="1000", cost=1, port=0), self.bridge.root_bpdu)
+
+    def test_expired_root_bpdu_elects_again(self):
+        now = 0.0
+        bridge = Bridge(identity="92b4", ports=self.ports, ingress_budget=1, clock=lambda: now)
+        bridge.root_port, bridge.root_bpdu = bridge.DEFAULT_ROOT_PORT, bridge.DEFAULT_ROOT_BPDU
+        bridge.active = True
+        bridge.send_bpdus = lambda: None
+
+        root_port = self.ports[0]
+        root_port.last_bpdu_sent = bridge.DEFAULT_ROOT_BPDU
+
+        root_bpdu = BPDU(id="02a1", root="02a1", cost=0, port=0)
+        other_bpdu = BPDU(id="1000", root="1000", cost=0, port=0)
+
+        for bpdu, seen_time in ((root_bpdu, 0.0), (other_bpdu, 0.5)):
+            root_port.record_bpdu(bpdu, now=seen_time)
+            bridge.root_candidates.push((bpdu, root_port.index))
+
+        root_port.calculate_status_update(now=0.5)
+        bridge.calculated_root_changed()
+        self.assertEqual("02a1", bridge.root_bpdu.root)
+
+        # the root port stays disabled by the BPDU of 1000 when the BPDU of the root expires
+        now = root_port.seen_bpdus.timeout
+        bridge._on_bpdu_expiry(root_port, root_bpdu)
+
+        self.assertEqual(PortStatus.DISABLED, root_port.status)
+        self.assertEqual(BPDU(id="92b4", root="1000", cost=1, port=0), bridge.root_bpdu)
+
+        # once every BPDU expired, this bridge is the root
+        now = 0.5 + root_port.seen_bpdus.timeout
+        bridge._on_bpdu_expiry(root_port, other_bpdu)
+
+        self.assertEqual(bridge.DEFAULT_ROOT_BPDU, bridge.root_bpdu)
+        self.assertIsNone(bridge.root_port)
+
+    def test_better_root_on_designated_port_after_root_died(self):
+        now = 0.0
+        bridge = Bridge(identity="92b4", ports=self.ports, ingress_budget=1, clock=lambda: now)
+        bridge.root_port, bridge.root_bpdu = bridge.DEFAULT_ROOT_PORT, bridge.DEFAULT_ROOT_BPDU
+        bridge.active = True
+        bridge.send_bpdus = lambda: None
+
+        dead_root_bpdu = BPDU(id="0001", root="0001", cost=0, port=0)
+        self.ports[0].last_bpdu_sent = bridge.DEFAULT_ROOT_BPDU
+        self._handle(self.ports[0], dead_root_bpdu, bridge=bridge)
+        self.assertEqual(0, bridge.root_port)
+
+        # port 1 still carries the announcement of the dead root on its LAN
+        self.ports[1].last_bpdu_sent = bridge.root_bpdu.replace(port=1)
+        self.ports[1].status = PortStatus.DESIGNATED
+
+        now = self.ports[0].seen_bpdus.timeout
+        bridge._on_bpdu_expiry(self.ports[0], dead_root_bpdu)
+        self.assertEqual(bridge.DEFAULT_ROOT_BPDU, bridge.root_bpdu)
+
+        # a root better than this bridge, but worse than the dead root, arrives on the designated port
+        self._handle(self.ports[1], BPDU(id="02a1", root="02a1", cost=0, port=0), bridge=bridge)
+
+        self.assertEqual(PortStatus.DESIGNATED, self.ports[1].status)
+        self.assertEqual(1, bridge.root_port)
+        self.assertEqual(BPDU(id="92b4", root="02a1", cost=1, port=0), bridge.root_bpdu)
+
+    def test_echo_of_lost_root_is_held_down(self):
+        now = 0.0
+        bridge = Bridge(identity="92b4", ports=self.ports, ingress_budget=1, clock=lambda: now)
+        bridge.root_port, bridge.root_bpdu = bridge.DEFAULT_ROOT_PORT, bridge.DEFAULT_ROOT_BPDU
+
+        root_bpdu = BPDU(id="02a1", root="02a1", cost=0, port=0)
+        echo_bpdu = BPDU(id="1000", root="02a1", cost=2, port=0)
+        for port, bpdu in ((self.ports[0], root_bpdu), (self.ports[1], echo_bpdu)):
+            port.record_bpdu(bpdu, now=0.0)
+            bridge.root_candidates.push((bpdu, port.index))
+
+        bridge.calculated_root_changed()
+        self.assertEqual(0, bridge.root_port)
+
+        # 1000 announces the root it learned from this bridge until it hears that the root was lost
+        self.ports[0].seen_bpdus.discard(root_bpdu)
+
+        self.assertTrue(bridge.calculated_root_changed())
+        self.assertEqual(bridge.DEFAULT_ROOT_BPDU, bridge.root_bpdu)
+
+        now = ROOT_HOLD_DOWN_SECOND_INTERVAL
+        bridge.calculated_root_changed()
+        self.assertEqual(1, bridge.root_port)
+
+    def test_worse_bpdu_from_root_port_sender_replaces_root(self):
+        self._receive(self.ports[0], BPDU(id="1000", root="02a1", cost=1, port=0))
+        self.bridge.calculated_root_changed()
+
+        # 1000 lost the root and announces itself instead, before its previous BPDU expired
+        self._receive(self.ports[0], BPDU(id="1000", root="1000", cost=0, port=0))
+
+        self.assertTrue(self.bridge.calculated_root_changed())
+        self.assertEqual(BPDU(id="92b4", root="1000", cost=1, port=0), self.bridge.root_bpdu)
+
+    def _handle(self, port: Port, bpdu: BPDU, bridge: Optional[Bridge] = None) -> None:
+        bridge = bridge or self.bridge
+
+        request = SpanningTreeRequest(port, bpdu)
+        updated_ports = [port] if request.handle(bridge) else []
+
+        bridge.apply_port_updates(updated_ports, candidates_changed=request.is_new_bpdu)
+
+    def test_new_bpdu_keeps_unchanged_ports_learned(self):
+        self.ports[2].status = PortStatus.DESIGNATED
+        self.bridge.forwarding_table.learn("28aa", self.ports[2], now=0.0)
+
+        # a worse root on a port that stays designated changes neither a port status nor the root
+        self._handle(self.ports[2], BPDU(id="f00d", root="f00d", cost=0, port=0))
+
+        self.assertIsNone(self.bridge.root_port)
+        self.assertEqual(self.ports[2], self.bridge.forwarding_table.lookup("28aa", now=0.0))
+
+    def test_new_bpdu_recalculates_root(self):
+        self.ports[2].status = PortStatus.DISABLED
+        self.bridge.forwarding_table.learn("28aa", self.ports[2], now=0.0)
+
+        # the status of the already disabled port doesn't change, but its BPDU carries a better root
+        self.ports[2].last_bpdu_sent = self.bridge.DEFAULT_ROOT_BPDU
+        self.bridge.send_bpdus = lambda: None
+        self._handle(self.ports[2], BPDU(id="02a1", root="02a1", cost=0, port=0))
+
+        self.assertEqual(2, self.bridge.root_port)
+        self.assertIsNone(self.bridge.forwarding_table.lookup("28aa", now=0.0))
+
+
+class TestBPDUTable(unittest.TestCase):
+    def setUp(self) -> None:
+        self.table = BPDUTable(timeout=1.0)
+
+        self.root_bpdu = BPDU(id="02a1", root="02a1", cost=0, port=0)
+        self.other_bpdu = BPDU(id="1000", root="02a1", cost=1, port=3)
+
+    def test_record_counts_and_refreshes(self):
+        self.assertTrue(self.table.record(self.root_bpdu, now=0.0))
+        self.assertFalse(self.table.record(self.root_bpdu, now=0.5))
+
+        self.assertEqual(2, self.table[self.root_bpdu].count)
+        self.assertEqual(0.5, self.table[self.root_bpdu].last_seen_time)
+
+    def test_expire_only_stale_bpdus(self):
+        self.table.record(self.root_bpdu, now=0.0)
+        self.table.record(self.other_bpdu, now=0.2)
+
+        # the refresh moves the root BPDU behind the other one
+        self.table.record(self.root_bpdu, now=0.8)
+
+        self.assertEqual([self.other_bpdu], self.table.expire(now=1.5))
+        self.assertEqual([self.root_bpdu], list(self.table))
+        self.assertEqual([self.root_bpdu], self.table.expire(now=1.8))
+        self.assertEqual(0, len(self.table))
+
+    def test_record_latest_discards_superseded(self):
+        self.table.record_latest(self.other_bpdu, now=0.0)
+        self.table.record_latest(self.root_bpdu, now=0.0)
+
+        updated_bpdu = self.other_bpdu.replace(cost=2)
+        self.assertTrue(self.table.record_latest(updated_bpdu, now=0.1))
+        self.assertEqual([self.root_bpdu, updated_bpdu], sorted(self.table))
+
+    def test_best_skips_expired(self):
+        self.table.record(self.root_bpdu, now=0.0)
+        self.table.record(self.other_bpdu, now=0.5)
+        self.assertEqual(self.root_bpdu, self.table.best())
+
+        self.table.expire(now=1.2)
+        self.assertEqual(self.other_bpdu, self.table.best())
+
+        self.table.expire(now=2.0)
+        self.assertIsNone(self.table.best())
@@ -0,0 +1,63 @@
+import time
+import unittest
+
+from lan_fixture import LanBridgeTestCase
+
+from networks.port import Port
+from networks.packet import Packet, MessageType
+from networks.storm_control import TokenBucket, StormControl
+
+from networks.constants import ALL_LANS_ID
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate=10.0, burst=2.0, now=0.0)
+
+        self.assertTrue(bucket.consume(now=0.0))
+        self.assertTrue(bucket.consume(now=0.0))
+        self.assertFalse(bucket.consume(now=0.0))
+
+        # a token every tenth of a second, never more than the burst
+        self.assertTrue(bucket.consume(now=0.1))
+        self.assertFalse(bucket.consume(now=0.1))
+        self.assertTrue(bucket.consume(now=10.0))
+        self.assertTrue(bucket.consume(now=10.0))
+        self.assertFalse(bucket.consume(now=10.0))
+
+
+class TestStormControl(unittest.TestCase):
+    def setUp(self) -> None:
+        self.ports = [Port(0, 0, None), Port(1, 0, None)]
+
+    def test_limits_per_port_and_kind(self):
+        storm_control = StormControl(broadcast_rate=1.0, unknown_unicast_rate=1.0, burst_seconds=1.0)
+
+        self.assertTrue(storm_control.admits(self.ports[0], broadcast=True, now=0.0))
+        self.assertFalse(storm_control.admits(self.ports[0], broadcast=True, now=0.0))
+
+        # the other port and the unknown unicast frames have their own buckets
+        self.assertTrue(storm_control.admits(self.ports[1], broadcast=True, now=0.0))
+        self.assertTrue(storm_control.admits(self.ports[0], broadcast=False, now=0.0))
+
+    def test_disabled(self):
+        storm_control = StormControl(broadcast_rate=0.0, unknown_unicast_rate=1.0)
+
+        for _ in range(100):
+            self.assertTrue(storm_control.admits(self.ports[0], broadcast=True, now=0.0))
+
+
+class TestBridgeStormControl(LanBridgeTestCase):
+    bridge_options = {'hold_max_depth': 0, 'storm_broadcast_rate': 1.0}
+
+    def test_broadcast_storm_dropped(self):
+        self.bridge.start(self.reactor)
+
+        for msg_id in range(3):
+            self._send_to_port(Packet(source="28aa", dest=ALL_LANS_ID, msg_id=msg_id,
+                                      type=MessageType.DataMessage, message={}))
+        time.sleep(0.01)
+        self.reactor.run_once(max_timeout=0.01)
+
+        self.assertEqual(3, self.bridge.counters.learning_misses)
+        self.assertEqual(2, self.port.counters.storm_drops)
@@ -0,0 +1,34 @@
+import unittest
+
+from networks.topology import generate_topology, TOPOLOGY_SHAPES
+
+
+class TestGenerateTopology(unittest.TestCase):
+    def test_shapes(self):
+        for shape in TOPOLOGY_SHAPES:
+            topology = generate_topology(shape, 40, seed=7)
+
+            bridge_ids = [bridge["id"] for bridge in topology["bridges"]]
+            self.assertGreaterEqual(len(bridge_ids), 40)
+            self.assertEqual(len(bridge_ids), len(set(bridge_ids)))
+            self.assertTrue(all(len(bridge["lans"]) >= 2 for bridge in topology["bridges"]))
+
+    def test_ring_is_a_cycle(self):
+        topology = generate_topology('ring', 5, seed=1)
+
+        self.assertEqual([[1, 2], [2, 3], [3, 4], [4, 5], [1, 5]], [bridge["lans"] for bridge in topology["bridges"]])
+
+    def test_seed_is_reproducible(self):
+        self.assertEqual(generate_topology('mixed', 100, churn=0.2, seed=3),
+                         generate_topology('mixed', 100, churn=0.2, seed=3))
+
+    def test_churn(self):
+        topology = generate_topology('mesh', 50, lifetime=20, churn=0.2, seed=2)
+
+        churned = [bridge for bridge in topology["bridges"] if "start" in bridge or "stop" in bridge]
+        self.assertEqual(10, len(churned))
+        self.assertTrue(all(4 <= bridge.get("start", bridge.get("stop")) <= 14 for bridge in churned))
+
+    def test_unknown_shape(self):
+        with self.assertRaises(ValueError):
+            generate_topology('star', 10)
@@ -0,0 +1,118 @@
+from typing import Dict, Iterator, Optional, Tuple
+
+from networks.packet import UpdateMsg
+from networks.ipaddress import IPAddress, SubnetMask
+from networks.prefix_trie import PrefixTrie
+from networks.rib import RoutingInformationBase
+
+from networks.constants import ADDRESS_BIT_LENGTH
+
+
+class RouteAggregator:
+    """
+    Representation of the aggregated routing table, kept up to date as routes are announced and withdrawn.
+
+    Every peer has a trie of its aggregated routes. An added route merges with its sibling prefix when both
+    have the same attributes, and the merged route keeps merging upwards, so an announcement costs at most
+    one merge per prefix bit. A change to a prefix only rebuilds the aggregate covering it from the routes
+    of the routing table, instead of aggregating the whole table on every DUMP
+    """
+
+    def __init__(self):
+        # map a peer to its (aggregated route, whether routes were merged into it) per prefix
+        self._peer_routes: Dict[IPAddress, PrefixTrie[Tuple[UpdateMsg, bool]]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(aggregated_routes) for aggregated_routes in self._peer_routes.values())
+
+    def refresh(self, routing_table: RoutingInformationBase, peer: IPAddress, network: int, length: int) -> None:
+        """
+        Rebuild the aggregated routes of a peer after its route for the prefix changed in the routing table
+        """
+        aggregated_routes = self._peer_routes.get(peer)
+        if aggregated_routes is None:
+            aggregated_routes = self._peer_routes[peer] = PrefixTrie()
+
+        # the routes merged into the shortest aggregate containing the prefix have to be merged again
+        network, length = self._covering_aggregate(aggregated_routes, network, length)
+
+        for aggregated_network, aggregated_length, _aggregated_route in list(aggregated_routes.items(network, length)):
+            aggregated_routes.remove(aggregated_network, aggregated_length)
+
+        # shorter prefixes come first, so a merge never lands on a route that is re-added later
+        for update_msg in routing_table.peer_routes(peer, network, length):
+            self._insert(aggregated_routes, update_msg, merged=False)
+
+        if not len(aggregated_routes):
+            del self._peer_routes[peer]
+
+    def routes(self) -> Iterator[Tuple[UpdateMsg, IPAddress]]:
+        """
+        :return: Every aggregated route with the peer it is forwarded to
+        """
+        for peer, aggregated_routes in self._peer_routes.items():
+            for _network, _length, (update_msg, _merged) in aggregated_routes.items():
+                yield update_msg, peer
+
+    @staticmethod
+    def _covering_aggregate(aggregated_routes: PrefixTrie[Tuple[UpdateMsg, bool]],
+                            network: int, length: int) -> Tuple[int, int]:
+        """
+        :return: The prefix of the shortest merged route containing the provided prefix, otherwise the prefix itself
+        """
+        for covering_length in range(length + 1):
+            covering_network = network & _prefix_mask(covering_length)
+            covering_route = aggregated_routes.get(covering_network, covering_length)
+
+            if covering_route is not None and covering_route[1]:
+                return covering_network, covering_length
+
+        return network & _prefix_mask(length), length
+
+    @classmethod
+    def _insert(cls, aggregated_routes: PrefixTrie[Tuple[UpdateMsg, bool]], update_msg: UpdateMsg,
+                merged: bool) -> None:
+        """
+        Save a route and merge it with its sibling prefix for as long as the attributes of both match
+        """
+        network, length = update_msg.network.binary, update_msg.netmask.length
+
+        existing_route = aggregated_routes.get(network, length)
+        if existing_route is not None:
+            # only a merged route identical to the saved one reaches an occupied prefix
+            existing_msg, existing_merged = existing_route
+            aggregated_routes.insert(network, length, (existing_msg, existing_merged or merged))
+            return
+
+        aggregated_routes.insert(network, length, (update_msg, merged))
+
+        if length == 0:
+            return
+
+        sibling_network = network ^ (1 << (ADDRESS_BIT_LENGTH - length))
+        sibling_route = aggregated_routes.get(sibling_network, length)
+
+        # (1) adjacent numerically and (2, 3) the same next-hop router and attributes
+        if sibling_route is None or update_msg.replace(network=sibling_route[0].network) != sibling_route[0]:
+            return
+
+        parent_network = network & _prefix_mask(length - 1)
+        parent_msg = update_msg.replace(network=IPAddress.from_binary(parent_network),
+                                        netmask=SubnetMask.from_binary(_prefix_mask(length - 1)))
+
+        # a different route of the parent prefix is more specific than the merge would be
+        parent_route: Optional[Tuple[UpdateMsg, bool]] = aggregated_routes.get(parent_network, length - 1)
+        if parent_route is not None and parent_route[0] != parent_msg:
+            return
+
+        aggregated_routes.remove(network, length)
+        aggregated_routes.remove(sibling_network, length)
+
+        cls._insert(aggregated_routes, parent_msg, merged=True)
+
+
+def _prefix_mask(length: int) -> int:
+    """
+    :return: The netmask of a prefix length as an integer
+    """
+    return ((1 << length) - 1) << (ADDRESS_BIT_LENGTH - length)
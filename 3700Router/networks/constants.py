@@ -14,3 +14,18 @@ DEFAULT_SELECT_SEC_TIMEOUT: float = 0.1
 """
 Value set by the starter code
 """
+
+ADDRESS_BIT_LENGTH: int = 32
+"""
+Number of bits in an IP Address, which is also the maximum depth of a prefix trie
+"""
+
+TABLE_CHUNK_BYTE_SIZE: int = 60000
+"""
+Bytes of encoded entries in a TABLE message, leaving room for the other packet fields in a UDP datagram
+"""
+
+ADDRESS_INTERN_CACHE_SIZE: int = 65536
+"""
+Number of IP Addresses (and Subnet Masks) reused by their string or integer value before the cache is emptied
+"""
@@ -1,56 +1,94 @@
-
-from typing import Any, Tuple, Union
+from typing import Any, Dict, Tuple, Union
 
 import struct
 
-from dataclasses import dataclass, field, InitVar
-
 from networks.utils import Serializable
 
+from networks.constants import ADDRESS_BIT_LENGTH, ADDRESS_INTERN_CACHE_SIZE
+
 
-@dataclass(frozen=True, order=True)
 class QuadrupleOctet(Serializable):
-    address: InitVar[str]
-    binary: int = field(init=False)
+    """
+    Immutable 32 bit value written as four dot separated octets.
+
+    Instances are interned: building the same address from its string or its integer again returns the
+    instance that was already built, so the addresses of every received packet are only parsed once
+    """
+    __slots__ = ('binary', '_string')
 
-    def __post_init__(self, str_address: str) -> None:
+    _interned_strings: Dict[str, 'QuadrupleOctet'] = {}
+    _interned_binaries: Dict[int, 'QuadrupleOctet'] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        # every subclass has its own instances, apart from the ones of this class
+        cls._interned_strings = {}
+        cls._interned_binaries = {}
+
+    def __new__(cls, address: str) -> 'QuadrupleOctet':
         """
         Split the string address into 4 octets and pack into a single integer.
         """
-        first_octet, second_octet, third_octet, fourth_octet = str_address.split('.')
+        instance = cls._interned_strings.get(address)
+        if instance is not None:
+            return instance
 
-        # 'B' is an unsigned byte
-        octet_bytes = struct.pack(">BBBB", int(first_octet), int(second_octet),
-                                  int(third_octet), int(fourth_octet))
+        first_octet, second_octet, third_octet, fourth_octet = address.split('.')
+        o1, o2, o3, o4 = int(first_octet), int(second_octet), int(third_octet), int(fourth_octet)
 
-        # 'I' is an unsigned integer
-        # '>' indicates BIG endian (most significant byte first)
-        integer_conversion, = struct.unpack(">I", octet_bytes)
+        # a negative octet or an octet over 255 has bits outside of the lowest byte
+        if (o1 | o2 | o3 | o4) >> 8:
+            raise struct.error('ubyte format requires 0 <= number <= 255')
 
-        # integer_conversion = (int(a1) << 24) + (int(a2) << 16) + (int(a3) << 8) + int(a4)
-        object.__setattr__(self, 'binary', integer_conversion)
+        instance = cls.from_binary((o1 << 24) | (o2 << 16) | (o3 << 8) | o4)
+
+        if len(cls._interned_strings) >= ADDRESS_INTERN_CACHE_SIZE:
+            cls._interned_strings.clear()
+
+        cls._interned_strings[address] = instance
+        return instance
+
+    @classmethod
+    def from_binary(cls, binary_val: int) -> 'QuadrupleOctet':
+        """
+        :return: An instance of this class given a binary representation of the QuadrupleOctet
+        """
+        instance = cls._interned_binaries.get(binary_val)
+        if instance is not None:
+            return instance
+
+        instance = object.__new__(cls)
+        object.__setattr__(instance, 'binary', binary_val)
+        object.__setattr__(instance, '_string', None)
+
+        if len(cls._interned_binaries) >= ADDRESS_INTERN_CACHE_SIZE:
+            cls._interned_binaries.clear()
+
+        cls._interned_binaries[binary_val] = instance
+        return instance
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"cannot delete field '{name}'")
+
+    def __reduce__(self):
+        return type(self).from_binary, (self.binary,)
 
     def network_gateway(self) -> 'IPAddress':
         """
         :return: The lowest IP Address in this network
         """
-        o1, o2, o3, o4 = self._split_into_octets(self.binary)
-        return IPAddress(self._stringify_octets(o1, o2, o3, 1))
+        return IPAddress.from_binary((self.binary & 0xFFFFFF00) | 1)
 
     @staticmethod
     def _split_into_octets(binary_val: int) -> Tuple[int, int, int, int]:
         """
         :return: This IP Address represented by its four components
         """
-        octet_bytes = struct.pack(">I", binary_val)
-        return struct.unpack(">BBBB", octet_bytes)
-
-    @classmethod
-    def from_binary(cls, binary_val: int) -> 'Octet':
-        """
-        :return: An instance of this class given a binary representation of the QuadrupleOctet
-        """
-        return cls(cls._stringify_octets(*cls._split_into_octets(binary_val)))
+        return (binary_val >> 24) & 0xFF, (binary_val >> 16) & 0xFF, (binary_val >> 8) & 0xFF, binary_val & 0xFF
 
     @staticmethod
     def _stringify_octets(o1: Union[int, str], o2: Union[int, str],
@@ -60,6 +98,39 @@ class QuadrupleOctet(Serializable):
         """
         return f"{o1}.{o2}.{o3}.{o4}"
 
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+
+        return self.binary == other.binary
+
+    def __lt__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+
+        return self.binary < other.binary
+
+    def __le__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+
+        return self.binary <= other.binary
+
+    def __gt__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+
+        return self.binary > other.binary
+
+    def __ge__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+
+        return self.binary >= other.binary
+
+    def __hash__(self):
+        return hash(self.binary)
+
     def __repr__(self):
         """
         :return: Debugging version of this object
@@ -70,7 +141,10 @@ class QuadrupleOctet(Serializable):
         """
         :return: String representation of the IPAddress
         """
-        return self._stringify_octets(*self._split_into_octets(self.binary))
+        if self._string is None:
+            object.__setattr__(self, '_string', self._stringify_octets(*self._split_into_octets(self.binary)))
+
+        return self._string
 
     def serialize(self) -> Any:
         """
@@ -83,34 +157,41 @@ class QuadrupleOctet(Serializable):
         """
         :return: read-only number of bits in the QuadrupleOctet
         """
-        return 32
+        return ADDRESS_BIT_LENGTH
+
+
+# map every contiguous netmask to its number of 1's
+_MASK_LENGTHS: Dict[int, int] = {
+    ((1 << length) - 1) << (ADDRESS_BIT_LENGTH - length): length for length in range(ADDRESS_BIT_LENGTH + 1)
+}
 
 
 class SubnetMask(QuadrupleOctet):
+    __slots__ = ()
+
     @property
     def length(self) -> int:
         """
         :return: Maximum number of consecutive 1's
         """
-        count = 0
-        for i in range(31, -1, -1):
-            if (self.binary >> i) & 0x1 != 0x1:
-                return count
-            count += 1
-        return count
+        length = _MASK_LENGTHS.get(self.binary)
+
+        if length is None:
+            # the leading 1's of a non-contiguous mask are the bits after the highest 1 of its inverse
+            length = ADDRESS_BIT_LENGTH - (~self.binary & 0xFFFFFFFF).bit_length()
+
+        return length
 
     @property
     def prefix_shift_amount(self) -> int:
         """
         :return: The number of right-shifts required to match the prefix
         """
-        return self.BIT_LENGTH - self.length
+        return ADDRESS_BIT_LENGTH - self.length
 
 
 class IPAddress(QuadrupleOctet):
     """
     Representation of an IP Address
     """
-    ...
-
-
+    __slots__ = ()
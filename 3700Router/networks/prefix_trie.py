@@ -0,0 +1,158 @@
+from typing import Generic, Iterator, List, Optional, Tuple, TypeVar
+
+from networks.constants import ADDRESS_BIT_LENGTH
+
+T = TypeVar('T')
+
+
+class _TrieNode(Generic[T]):
+    """
+    A node of the PrefixTrie, one per prefix bit
+    """
+    __slots__ = ('children', 'value', 'has_value')
+
+    def __init__(self):
+        self.children: List[Optional['_TrieNode[T]']] = [None, None]
+        self.value: Optional[T] = None
+        self.has_value: bool = False
+
+
+class PrefixTrie(Generic[T]):
+    """
+    Binary radix trie mapping (network, prefix length) keys to values.
+
+    Every level of the trie consumes one bit of the network from the most significant bit,
+    so an insert, a removal or a longest prefix match takes at most 32 steps regardless of
+    the number of stored prefixes
+    """
+    def __init__(self):
+        self._root: _TrieNode[T] = _TrieNode()
+        self._size: int = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _bit(address: int, depth: int) -> int:
+        """
+        :return: The bit of the address at the provided depth (0 is the most significant bit)
+        """
+        return (address >> (ADDRESS_BIT_LENGTH - 1 - depth)) & 0x1
+
+    def _find(self, network: int, length: int) -> Optional[_TrieNode[T]]:
+        node = self._root
+
+        for depth in range(length):
+            node = node.children[self._bit(network, depth)]
+
+            if node is None:
+                return None
+
+        return node
+
+    def get(self, network: int, length: int) -> Optional[T]:
+        """
+        :return: The value stored for the prefix, otherwise None
+        """
+        node = self._find(network, length)
+
+        return node.value if node is not None and node.has_value else None
+
+    def insert(self, network: int, length: int, value: T) -> None:
+        """
+        Store the value for the prefix (the bits of the network after the prefix length are ignored)
+        """
+        node = self._root
+
+        for depth in range(length):
+            bit = self._bit(network, depth)
+
+            if node.children[bit] is None:
+                node.children[bit] = _TrieNode()
+
+            node = node.children[bit]
+
+        if not node.has_value:
+            self._size += 1
+
+        node.value = value
+        node.has_value = True
+
+    def remove(self, network: int, length: int) -> Optional[T]:
+        """
+        Remove the prefix and prune the nodes that no longer lead to a value
+
+        :return: The removed value, otherwise None
+        """
+        path: List[_TrieNode[T]] = [self._root]
+
+        for depth in range(length):
+            node = path[-1].children[self._bit(network, depth)]
+
+            if node is None:
+                return None
+
+            path.append(node)
+
+        removed_node = path[-1]
+        if not removed_node.has_value:
+            return None
+
+        removed_value = removed_node.value
+        removed_node.value = None
+        removed_node.has_value = False
+        self._size -= 1
+
+        # walk back up while the nodes are empty leaves
+        for depth in range(length, 0, -1):
+            node = path[depth]
+
+            if node.has_value or node.children[0] is not None or node.children[1] is not None:
+                break
+
+            path[depth - 1].children[self._bit(network, depth - 1)] = None
+
+        return removed_value
+
+    def longest_match(self, address: int) -> Optional[Tuple[int, T]]:
+        """
+        :return: The prefix length and value of the longest stored prefix containing the address, otherwise None
+        """
+        node = self._root
+        best_match: Optional[Tuple[int, T]] = (0, node.value) if node.has_value else None
+
+        for depth in range(ADDRESS_BIT_LENGTH):
+            node = node.children[self._bit(address, depth)]
+
+            if node is None:
+                break
+
+            if node.has_value:
+                best_match = (depth + 1, node.value)
+
+        return best_match
+
+    def items(self, network: int = 0, length: int = 0) -> Iterator[Tuple[int, int, T]]:
+        """
+        :return: The (network, prefix length, value) of every stored prefix within the provided prefix
+                 (every prefix by default), shorter prefixes first along each branch
+        """
+        node = self._find(network, length)
+        if node is None:
+            return
+
+        mask = ((1 << length) - 1) << (ADDRESS_BIT_LENGTH - length)
+        stack: List[Tuple[_TrieNode[T], int, int]] = [(node, network & mask, length)]
+
+        while stack:
+            node, prefix, depth = stack.pop()
+
+            if node.has_value:
+                yield prefix, depth, node.value
+
+            # push the one-branch first so the zero-branch is visited first
+            for bit in (1, 0):
+                child = node.children[bit]
+
+                if child is not None:
+                    stack.append((child, prefix | (bit << (ADDRESS_BIT_LENGTH - 1 - depth)), depth + 1))
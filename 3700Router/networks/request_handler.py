@@ -1,10 +1,9 @@
-from typing import List, Optional, Tuple, Dict, Any
+from typing import List, Any
 
 from abc import ABC, abstractmethod
-from collections import defaultdict
 
 from networks.packet import Packet, PacketType, UpdateMsg, UpdatePing, DumpPing, NetworkDescription
-from networks.ipaddress import IPAddress, SubnetMask
+from networks.ipaddress import IPAddress
 
 from networks.utils import ConnectionType
 
@@ -17,18 +16,6 @@ class Handler(ABC):
     def process(self, router: 'Router') -> None:
         ...
 
-    @staticmethod
-    def matched_subnet(destination_ip: IPAddress, entry: UpdateMsg) -> Optional[int]:
-        """
-        :return: Netmask length if the Destination IP works with the entry IP and subnet, otherwise None
-        """
-        match_shift = entry.netmask.prefix_shift_amount
-
-        if (entry.network.binary >> match_shift) == (destination_ip.binary >> match_shift):
-            return entry.netmask.length
-
-        return None
-
 
 class UpdatePacketHandler(Handler):
     """
@@ -46,7 +33,7 @@ class UpdatePacketHandler(Handler):
         # print(f"** Received an UPDATE message on {self.sender_ip}", flush=True)
 
         # Add an entry in the forwarding table
-        router.forwarding_table[self.update_msg] = self.sender_ip
+        router.add_route(self.update_msg, self.sender_ip)
 
         # Potentially send copies of the announcement ot neighboring routers
         update_data = UpdatePing(network=self.update_msg.network,
@@ -90,30 +77,18 @@ class DumpPacketHandler(Handler):
         """
         # print(f"** Received a DUMP message on {self.sender_ip}", flush=True)
 
-        full_table: List[DumpPing] = []
+        # the table is only encoded again after the routing table changed
+        if router.table_encoding.version != router.routing_table.version:
+            router.table_encoding.update(router.routing_table.version, self._dump_table(router))
 
-        aggregated_table = self._aggregate_forwarding_table(router)
-
-        for forwarding_update, forwarding_ip in aggregated_table.items():
-            entry = DumpPing(
-                network=forwarding_update.network,
-                netmask=forwarding_update.netmask,
-                peer=forwarding_ip,
-                localpref=forwarding_update.localpref,
-                ASPath=forwarding_update.ASPath,
-                selfOrigin=forwarding_update.selfOrigin,
-                origin=forwarding_update.origin
-            )
-
-            full_table.append(entry)
-
-        router.send(self.sender_ip, Packet(src=self.sender_ip.network_gateway(), dst=self.sender_ip,
-                                           type=PacketType.TABLE, msg=full_table))
+        for json_packet in router.table_encoding.packets(source=self.sender_ip.network_gateway(),
+                                                          destination=self.sender_ip):
+            router.send_encoded(self.sender_ip, json_packet)
 
     @classmethod
-    def _aggregate_forwarding_table(cls, router: 'Router') -> Dict[UpdateMsg, IPAddress]:
+    def _dump_table(cls, router: 'Router') -> List[DumpPing]:
         """
-        Aggregate entries in the forwarding table if they are:
+        The entries of the routing table, which were aggregated as the routes were received if they are:
             (1) adjacent numerically
             (2) forward to the same next-hop router
             (3) have the same attributes (e.g., localpref, origin, etc.)
@@ -123,90 +98,26 @@ class DumpPacketHandler(Handler):
 
             Assuming the next-hop router and attributes are the same,
             these can be combined into 192.168.0.0/23
-        """
-        # sort by sending IPAddress
-        ip_filters = defaultdict(list)
-
-        for update_msg, ip_addr in router.forwarding_table.items():
-            ip_filters[ip_addr].append(update_msg)
-
-        aggregrated_table = {}
-        for ip_addr, aggregration_group in ip_filters.items():
-            aggregrated = cls._aggregate_msg_group(aggregration_group)
-
-            for update_msg in aggregrated:
-                aggregrated_table[update_msg] = ip_addr
-
-        return aggregrated_table
-
-    @classmethod
-    def _aggregate_msg_group(cls, group: List[UpdateMsg]) -> List[UpdateMsg]:
-        """
-        :param group: A Sequence of Update Messages that are all forwarded to the same neighbor
-        :return: An aggregated
-        """
-        parsed_list = list(group)
-        last_edited: Optional[UpdateMsg] = None
-
-        while parsed_list[0] != last_edited:
-            first_element = parsed_list.pop(0)
-
-            if last_edited is None:
-                last_edited = first_element
-
-            combinations: List[UpdateMsg] = cls._find_matching_messages(reference=first_element, options=parsed_list)
-
-            if combinations:
-                # actually combine the combinations
-                for combo in combinations:
-                    parsed_list.remove(combo)
-
-                last_edited = cls._calculate_aggregation(matches=[first_element] + combinations)
-                parsed_list.append(last_edited)
-            else:
-                parsed_list.append(first_element)
-
-        return parsed_list
-
-    @classmethod
-    def _find_matching_messages(cls, reference: UpdateMsg, options: List[UpdateMsg]) -> List[UpdateMsg]:
-        """
-        :param reference: The Update Message to which all others should be compared
-        :param options: The Update Messages that should be searched for matches
-        :return: The matches in the option group for the reference
-        """
-        matches: List[UpdateMsg] = []
-
-        bit_shift_count = (reference.netmask.prefix_shift_amount + 1)
-
-        for remaining_element in options:
-            # if everything is the same except for the network
-            if reference == remaining_element.replace(network=reference.network):
-                first_network_prefix = reference.network.binary >> bit_shift_count
-                remaining_network_prefix = remaining_element.network.binary >> bit_shift_count
-
-                if first_network_prefix == remaining_network_prefix:
-                    matches.append(remaining_element)
 
-        return matches
-
-    @classmethod
-    def _calculate_aggregation(cls, matches: List[UpdateMsg]) -> UpdateMsg:
-        """
-        :param matches: A list of Update Messages that can all be combined based on rules defined in
-        https://3700.network/docs/projects/router/#aggregation
-        :return: The aggregated update message given a list of matches
+        :return: The entries of the aggregated routing table as sent in a TABLE message
         """
-        sorted_messages = sorted(matches)
-        smallest_message: UpdateMsg = sorted_messages[0]
+        full_table: List[DumpPing] = []
 
-        # need to remove another bit from the netmask
-        bit_shift_count = (smallest_message.netmask.prefix_shift_amount + 1)
+        # the same route announced by two peers is two entries
+        for forwarding_update, forwarding_ip in router.aggregated_table.routes():
+            entry = DumpPing(
+                network=forwarding_update.network,
+                netmask=forwarding_update.netmask,
+                peer=forwarding_ip,
+                localpref=forwarding_update.localpref,
+                ASPath=forwarding_update.ASPath,
+                selfOrigin=forwarding_update.selfOrigin,
+                origin=forwarding_update.origin
+            )
 
-        updated_netmask = SubnetMask('255.255.255.255').binary >> bit_shift_count
-        updated_netmask = updated_netmask << bit_shift_count
+            full_table.append(entry)
 
-        return smallest_message.replace(netmask=SubnetMask.from_binary(updated_netmask))
+        return full_table
 
 
 class DataPacketHandler(Handler):
@@ -223,77 +134,16 @@ class DataPacketHandler(Handler):
         Accept a Data Message from a sender, find the largest prefix match, and forward data accordingly
         """
         # print(f"** Received a DATA message on {self.sender_ip}", flush=True)
-        largest_ip_address: Optional[IPAddress] = None
-        largest_update: Optional[UpdateMsg] = None
-        largest_mask: int = 0
-
-        for forwarding_update, forwarding_ip_addr in router.forwarding_table.items():
-            # iterate through the forwarding table and find the best match
-            mask_match: Optional[int] = self.matched_subnet(self.packet.destination_ip_address, entry=forwarding_update)
-
-            if mask_match is None:
-                continue
 
-            if mask_match > largest_mask or (mask_match == 0 and largest_mask == 0 and largest_update is None):
-                # if the new match is better, update the found one
-                largest_ip_address, largest_mask, largest_update = (forwarding_ip_addr, mask_match, forwarding_update)
-                continue
+        # the best route of the longest prefix containing the destination was selected when it was received
+        longest_match = router.forwarding_table.longest_match(self.packet.destination_ip_address.binary)
 
-            if mask_match == largest_mask:
-                # if the new match is equivalent, compare the other fields
-                largest_ip_address, largest_update, largest_mask = self._determine_best_route(
-                    largest_update_message=largest_update, largest_ip_address=largest_ip_address,
-                    contending_update_msg=forwarding_update, contending_ip_address=forwarding_ip_addr)
+        if longest_match is not None:
+            _largest_mask, (_largest_update, largest_ip_address) = longest_match
 
-        if not (largest_ip_address is None):
             self._forward_packet(router=router, next_ip_address=largest_ip_address,
                                  destination=self.packet.destination_ip_address)
 
-    @staticmethod
-    def _determine_best_route(largest_update_message: UpdateMsg, largest_ip_address: IPAddress,
-                              contending_update_msg: UpdateMsg, contending_ip_address: IPAddress) -> \
-            Tuple[IPAddress, NetworkDescription, int]:
-        """
-        Match with the longest prefix IPAddress/Mask.
-        """
-        largest_return = (largest_ip_address, largest_update_message, largest_update_message.netmask.length)
-        contending_return = (contending_ip_address, contending_update_msg, contending_update_msg.netmask.length)
-
-        # * The entry with the highest localpref wins. If the localprefs are equal…
-        if largest_update_message.localpref > contending_update_msg.localpref:
-            return largest_return
-
-        if largest_update_message.localpref < contending_update_msg.localpref:
-            return contending_return
-
-        # * The entry with selfOrigin as true wins. If all selfOrigins are the equal…
-        if not (largest_update_message.selfOrigin and contending_update_msg.selfOrigin):
-            if largest_update_message.selfOrigin:
-                return largest_return
-
-            if contending_update_msg.selfOrigin:
-                return contending_return
-
-        # * The entry with the shortest ASPath wins. If multiple entries have the shortest length…
-        if len(largest_update_message.ASPath) < len(contending_update_msg.ASPath):
-            return largest_return
-
-        if len(largest_update_message.ASPath) > len(contending_update_msg.ASPath):
-            return contending_return
-
-        # * The entry with the best origin wins, were IGP < EGP < UNK. If multiple entries have the best origin…
-        if largest_update_message.origin < contending_update_msg.origin:
-            return largest_return
-
-        if largest_update_message.origin > contending_update_msg.origin:
-            return contending_return
-
-        # * The entry from the neighbor router (i.e., the src of the update message) with the lowest IP address.
-        if largest_ip_address.binary < contending_ip_address.binary:
-            return largest_return
-
-        return contending_return
-
     def _forward_packet(self, router: 'Router', next_ip_address: IPAddress, destination: IPAddress) -> None:
         """
         Assuming that your router was able to find a entry for the given data message,
@@ -343,12 +193,9 @@ class WithdrawPacketHandler(Handler):
         # (1) save a copy of the revocation, in case you need it later
         router.revoked_addresses[self.sender_ip].update(set(self.withdrawals))
 
-        # (2) remove the dead entry from the forwarding table
+        # (2) remove the dead entry from the routing and forwarding tables
         for network_description in self.withdrawals:
-            associated_update = self._get_associated_update(router, network_description)
-
-            if associated_update:
-                del router.forwarding_table[associated_update]
+            router.withdraw_route(network_description, self.sender_ip)
 
         # Potentially send copies of the announcement ot neighboring routers
         self._inform_neighbors(router)
@@ -378,21 +225,3 @@ class WithdrawPacketHandler(Handler):
 
             router.send(network_ip, Packet(src=network_ip.network_gateway(), dst=network_ip,
                                            type=PacketType.WITHDRAW, msg=self.withdrawals))
-
-    def _get_associated_update(self, router: 'Router', network_description: NetworkDescription) -> Optional[UpdateMsg]:
-        """
-        :param network_description: The withdrawal request to find in the forwarding table
-        :return: The Update Message associated with a withdrawal request if it exists, Otherwise None
-        """
-        for update_msg, ip_address in router.forwarding_table.items():
-            if ((update_msg.network == network_description.network
-                 and update_msg.netmask == network_description.netmask)
-                    and ip_address == self.sender_ip):
-                return update_msg
-
-        return None
-
-
-
-
-
@@ -0,0 +1,156 @@
+from typing import Dict, Iterator, Optional, Tuple
+
+from networks.packet import UpdateMsg, NetworkDescription
+from networks.ipaddress import IPAddress
+from networks.prefix_trie import PrefixTrie
+
+
+class RoutingInformationBase:
+    """
+    Representation of every candidate route received for every prefix (the RIB).
+
+    The candidates of a prefix are indexed by the peer that announced them, so a peer holds at most one route
+    per prefix: a new announcement replaces its previous route and a withdrawal is a single lookup.
+    The decision process only runs for a prefix whose candidates changed, and hands back the
+    single best route of that prefix for the forwarding table
+    """
+
+    def __init__(self):
+        self._prefix_routes: PrefixTrie[Dict[IPAddress, UpdateMsg]] = PrefixTrie()
+        self._route_count: int = 0
+
+        # changes whenever a route is added or withdrawn
+        self.version: int = 0
+
+    def __len__(self) -> int:
+        return self._route_count
+
+    def add(self, update_msg: UpdateMsg, peer: IPAddress) -> Tuple[UpdateMsg, IPAddress]:
+        """
+        Save the route of a peer, replacing the route the peer previously announced for the same prefix
+
+        :return: The best route of the prefix of the added route
+        """
+        network, length = update_msg.network.binary, update_msg.netmask.length
+
+        candidates = self._prefix_routes.get(network, length)
+        if candidates is None:
+            candidates = {}
+            self._prefix_routes.insert(network, length, candidates)
+
+        if peer not in candidates:
+            self._route_count += 1
+
+        candidates[peer] = update_msg
+        self.version += 1
+
+        return self.select_best_route(candidates)
+
+    def withdraw(self, network_description: NetworkDescription,
+                 peer: IPAddress) -> Tuple[Optional[UpdateMsg], Optional[Tuple[UpdateMsg, IPAddress]]]:
+        """
+        :return: The withdrawn Update Message (None if the peer never announced the network) and the
+                 best remaining route of the prefix (None if no route is left)
+        """
+        network, length = network_description.network.binary, network_description.netmask.length
+
+        candidates = self._prefix_routes.get(network, length)
+        if candidates is None:
+            return None, None
+
+        withdrawn_update = candidates.pop(peer, None)
+
+        if withdrawn_update is None:
+            return None, self.select_best_route(candidates)
+
+        self._route_count -= 1
+        self.version += 1
+
+        if not candidates:
+            self._prefix_routes.remove(network, length)
+            return withdrawn_update, None
+
+        return withdrawn_update, self.select_best_route(candidates)
+
+    def routes(self) -> Iterator[Tuple[UpdateMsg, IPAddress]]:
+        """
+        :return: Every route of every prefix
+        """
+        for _network, _length, candidates in self._prefix_routes.items():
+            for peer, update_msg in candidates.items():
+                yield update_msg, peer
+
+    def peer_routes(self, peer: IPAddress, network: int, length: int) -> Iterator[UpdateMsg]:
+        """
+        :return: Every route of the peer within the provided prefix, shorter prefixes first along each branch
+        """
+        for _network, _length, candidates in self._prefix_routes.items(network, length):
+            update_msg = candidates.get(peer)
+
+            if update_msg is not None:
+                yield update_msg
+
+    @classmethod
+    def select_best_route(cls, candidates: Dict[IPAddress, UpdateMsg]) -> Tuple[UpdateMsg, IPAddress]:
+        """
+        :param candidates: The routes of a single prefix by the peer that announced them
+        :return: The winner of the decision process between the routes
+        """
+        best_ip_address: Optional[IPAddress] = None
+        best_update: Optional[UpdateMsg] = None
+
+        for ip_address, update_msg in candidates.items():
+            if best_update is None:
+                best_ip_address, best_update = ip_address, update_msg
+                continue
+
+            best_ip_address, best_update, _best_mask = cls._determine_best_route(
+                largest_update_message=best_update, largest_ip_address=best_ip_address,
+                contending_update_msg=update_msg, contending_ip_address=ip_address)
+
+        return best_update, best_ip_address
+
+    @staticmethod
+    def _determine_best_route(largest_update_message: UpdateMsg, largest_ip_address: IPAddress,
+                              contending_update_msg: UpdateMsg, contending_ip_address: IPAddress) -> \
+            Tuple[IPAddress, NetworkDescription, int]:
+        """
+        Match with the longest prefix IPAddress/Mask.
+        """
+        largest_return = (largest_ip_address, largest_update_message, largest_update_message.netmask.length)
+        contending_return = (contending_ip_address, contending_update_msg, contending_update_msg.netmask.length)
+
+        # * The entry with the highest localpref wins. If the localprefs are equal…
+        if largest_update_message.localpref > contending_update_msg.localpref:
+            return largest_return
+
+        if largest_update_message.localpref < contending_update_msg.localpref:
+            return contending_return
+
+        # * The entry with selfOrigin as true wins. If all selfOrigins are the equal…
+        if not (largest_update_message.selfOrigin and contending_update_msg.selfOrigin):
+            if largest_update_message.selfOrigin:
+                return largest_return
+
+            if contending_update_msg.selfOrigin:
+                return contending_return
+
+        # * The entry with the shortest ASPath wins. If multiple entries have the shortest length…
+        if len(largest_update_message.ASPath) < len(contending_update_msg.ASPath):
+            return largest_return
+
+        if len(largest_update_message.ASPath) > len(contending_update_msg.ASPath):
+            return contending_return
+
+        # * The entry with the best origin wins, were IGP < EGP < UNK. If multiple entries have the best origin…
+        if largest_update_message.origin < contending_update_msg.origin:
+            return largest_return
+
+        if largest_update_message.origin > contending_update_msg.origin:
+            return contending_return
+
+        # * The entry from the neighbor router (i.e., the src of the update message) with the lowest IP address.
+        if largest_ip_address.binary < contending_ip_address.binary:
+            return largest_return
+
+        return contending_return
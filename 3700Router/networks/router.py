@@ -6,6 +6,10 @@ import select
 
 from networks.ipaddress import IPAddress
 from networks.packet import Packet, PacketType, UpdateMsg, NetworkDescription
+from networks.prefix_trie import PrefixTrie
+from networks.rib import RoutingInformationBase
+from networks.aggregation import RouteAggregator
+from networks.table_encoding import TableEncoding
 from networks.request_handler import (
     Handler, UpdatePacketHandler, DumpPacketHandler, DataPacketHandler,
     WithdrawPacketHandler
@@ -23,9 +27,24 @@ class Router:
     ip_socket_map: Dict[IPAddress, socket.socket] = {}
     ip_port_map: Dict[IPAddress, int] = {}
 
-    forwarding_table: Dict[UpdateMsg, IPAddress] = {}
+    routing_table: RoutingInformationBase
     """
-    Save a mapping of the entire UpdateMsg (including IPAddress and SubnetMask) to the forwarding IPAddress  
+    Save every received UpdateMsg (including IPAddress and SubnetMask) with the IPAddress it was received from
+    """
+
+    forwarding_table: PrefixTrie[Tuple[UpdateMsg, IPAddress]]
+    """
+    Only the best route of every (network, netmask length) prefix, for longest prefix matches of the data packets
+    """
+
+    aggregated_table: RouteAggregator
+    """
+    The routes of the routing table with the adjacent prefixes of every peer aggregated, as sent in a TABLE
+    """
+
+    table_encoding: TableEncoding
+    """
+    The aggregated table encoded for TABLE messages, until the routing table changes
     """
 
     revoked_addresses: Dict[IPAddress, Set[NetworkDescription]] = {}
@@ -34,10 +53,46 @@ class Router:
         self.asn = asn
         self._active = False
 
+        self.routing_table = RoutingInformationBase()
+        self.forwarding_table = PrefixTrie()
+        self.aggregated_table = RouteAggregator()
+        self.table_encoding = TableEncoding()
+
         for port, neighbor_ip, relation in connections:
             self.ip_port_map[neighbor_ip] = port
             self.ip_conn_type_map[neighbor_ip] = relation
 
+    def add_route(self, update_msg: UpdateMsg, peer: IPAddress) -> None:
+        """
+        Save a route in the routing table and forward its prefix along the best route
+        """
+        best_route = self.routing_table.add(update_msg, peer)
+
+        network, length = update_msg.network.binary, update_msg.netmask.length
+
+        self.forwarding_table.insert(network, length, best_route)
+        self.aggregated_table.refresh(self.routing_table, peer, network, length)
+
+    def withdraw_route(self, network_description: NetworkDescription, peer: IPAddress) -> Optional[UpdateMsg]:
+        """
+        Delete the route of a peer from the routing table and forward its prefix along the best remaining route
+
+        :return: The withdrawn Update Message if the peer announced the network, otherwise None
+        """
+        withdrawn_update, best_route = self.routing_table.withdraw(network_description, peer)
+
+        network, length = network_description.network.binary, network_description.netmask.length
+
+        if best_route is None:
+            self.forwarding_table.remove(network, length)
+        else:
+            self.forwarding_table.insert(network, length, best_route)
+
+        if withdrawn_update is not None:
+            self.aggregated_table.refresh(self.routing_table, peer, network, length)
+
+        return withdrawn_update
+
     def send(self, ip_address: IPAddress, message: Packet):
         """
         Actually send the byte data to the correct IP Address on the associated socket
@@ -45,6 +100,12 @@ class Router:
         serialized_packet = message.serialize()
         json_packet = json.dumps(serialized_packet)
 
+        self.send_encoded(ip_address, json_packet)
+
+    def send_encoded(self, ip_address: IPAddress, json_packet: str):
+        """
+        Send an already JSON encoded packet to the IP Address on the associated socket
+        """
         address_socket = self.ip_socket_map[ip_address]
         address_socket.sendto(json_packet.encode('utf-8'), ('localhost', self.ip_port_map[ip_address]))
 
@@ -0,0 +1,60 @@
+from typing import Iterator, List, Optional
+
+import json
+
+from networks.packet import DumpPing, PacketType
+from networks.ipaddress import IPAddress
+
+from networks.constants import TABLE_CHUNK_BYTE_SIZE
+
+
+class TableEncoding:
+    """
+    Cache of the JSON encoded entries of a TABLE message, tagged with the routing table version they were built from.
+
+    A table that fits in a datagram is sent as a plain TABLE packet. A larger table is split into chunks
+    that each fit in a datagram, and every chunk carries its "sequence" number and whether it is the "final" one
+    """
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        self._chunks: List[str] = []
+
+    def update(self, version: int, entries: List[DumpPing]) -> None:
+        """
+        Encode the entries of the table once for every following DUMP of the same routing table version
+        """
+        self.version = version
+        self._chunks = []
+
+        chunk_entries: List[str] = []
+        chunk_size = 0
+
+        for entry in entries:
+            encoded_entry = json.dumps(entry.serialize())
+
+            # account for the ", " separating the entry from the previous one
+            if chunk_entries and chunk_size + len(encoded_entry) + 2 > TABLE_CHUNK_BYTE_SIZE:
+                self._chunks.append(f"[{', '.join(chunk_entries)}]")
+                chunk_entries, chunk_size = [], 0
+
+            chunk_entries.append(encoded_entry)
+            chunk_size += len(encoded_entry) + 2
+
+        self._chunks.append(f"[{', '.join(chunk_entries)}]")
+
+    def packets(self, source: IPAddress, destination: IPAddress) -> Iterator[str]:
+        """
+        :return: The JSON encoded TABLE packets of the cached table from the source to the destination
+        """
+        # the same fields, in the same order, as a serialized TABLE Packet
+        envelope = json.dumps({"src": source.serialize(), "dst": destination.serialize(), "type": PacketType.TABLE})
+
+        if len(self._chunks) == 1:
+            yield f'{envelope[:-1]}, "msg": {self._chunks[0]}}}'
+            return
+
+        for sequence, chunk in enumerate(self._chunks):
+            final = json.dumps(sequence == len(self._chunks) - 1)
+
+            yield f'{envelope[:-1]}, "msg": {chunk}, "sequence": {sequence}, "final": {final}}}'
@@ -1,13 +1,86 @@
+import random
 import unittest
-from unittest.mock import Mock
+from collections import Counter
+from typing import List, Optional
 
 from networks.router import Router
 from networks.request_handler import UpdatePacketHandler, DumpPacketHandler
-from networks.packet import UpdateMsg, AutonomousSystemOrigin
+from networks.packet import UpdateMsg, NetworkDescription, AutonomousSystemOrigin
 from networks.ipaddress import IPAddress, SubnetMask
 from networks.utils import ConnectionType
 
 
+def _aggregate_msg_group(group: List[UpdateMsg]) -> List[UpdateMsg]:
+    """
+    The aggregation of the whole table on every DUMP that the RouteAggregator replaced, kept as a reference
+
+    :param group: A Sequence of Update Messages that are all forwarded to the same neighbor
+    :return: An aggregated
+    """
+    parsed_list = list(group)
+    last_edited: Optional[UpdateMsg] = None
+
+    while parsed_list[0] != last_edited:
+        first_element = parsed_list.pop(0)
+
+        if last_edited is None:
+            last_edited = first_element
+
+        combinations: List[UpdateMsg] = _find_matching_messages(reference=first_element, options=parsed_list)
+
+        if combinations:
+            # actually combine the combinations
+            for combo in combinations:
+                parsed_list.remove(combo)
+
+            last_edited = _calculate_aggregation(matches=[first_element] + combinations)
+            parsed_list.append(last_edited)
+        else:
+            parsed_list.append(first_element)
+
+    return parsed_list
+
+
+def _find_matching_messages(reference: UpdateMsg, options: List[UpdateMsg]) -> List[UpdateMsg]:
+    """
+    :param reference: The Update Message to which all others should be compared
+    :param options: The Update Messages that should be searched for matches
+    :return: The matches in the option group for the reference
+    """
+    matches: List[UpdateMsg] = []
+
+    bit_shift_count = (reference.netmask.prefix_shift_amount + 1)
+
+    for remaining_element in options:
+        # if everything is the same except for the network
+        if reference == remaining_element.replace(network=reference.network):
+            first_network_prefix = reference.network.binary >> bit_shift_count
+            remaining_network_prefix = remaining_element.network.binary >> bit_shift_count
+
+            if first_network_prefix == remaining_network_prefix:
+                matches.append(remaining_element)
+
+    return matches
+
+
+def _calculate_aggregation(matches: List[UpdateMsg]) -> UpdateMsg:
+    """
+    :param matches: A list of Update Messages that can all be combined based on rules defined in
+    https://3700.network/docs/projects/router/#aggregation
+    :return: The aggregated update message given a list of matches
+    """
+    sorted_messages = sorted(matches)
+    smallest_message: UpdateMsg = sorted_messages[0]
+
+    # need to remove another bit from the netmask
+    bit_shift_count = (smallest_message.netmask.prefix_shift_amount + 1)
+
+    updated_netmask = SubnetMask('255.255.255.255').binary >> bit_shift_count
+    updated_netmask = updated_netmask << bit_shift_count
+
+    return smallest_message.replace(netmask=SubnetMask.from_binary(updated_netmask))
+
+
 class TestUpdateFiltering(unittest.TestCase):
 
     def setUp(self) -> None:
@@ -38,23 +111,95 @@ class TestUpdateFiltering(unittest.TestCase):
 
     def test_received_ports(self):
         from pprint import pprint
-        pprint(self.router.forwarding_table)
-
-        DumpPacketHandler._aggregate_forwarding_table(self.router)
+        pprint(list(self.router.routing_table.routes()))
 
-        pprint(self.router.forwarding_table)
+        pprint(DumpPacketHandler._dump_table(self.router))
 
     def test_complex_group_aggregration(self):
-        final_grouping, = DumpPacketHandler._aggregate_msg_group([self.u1, self.u2, self.u3, self.u4])
+        final_grouping, = _aggregate_msg_group([self.u1, self.u2, self.u3, self.u4])
 
         self.assertEqual(UpdateMsg(network=IPAddress('192.168.0.0'), netmask=SubnetMask('255.255.252.0'),
                                    ASPath=[1], localpref=100, selfOrigin=True, origin=AutonomousSystemOrigin.REMOTE),
                          final_grouping)
 
     def test_simple_aggregration(self):
-        final_grouping, = DumpPacketHandler._aggregate_msg_group([self.u4, self.u3])
+        final_grouping, = _aggregate_msg_group([self.u4, self.u3])
 
         self.assertEqual(UpdateMsg(network=IPAddress('192.168.2.0'), netmask=SubnetMask('255.255.254.0'),
                                    ASPath=[1], localpref=100, selfOrigin=True, origin=AutonomousSystemOrigin.REMOTE),
                          final_grouping)
 
+
+class TestIncrementalAggregration(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.ip_address = IPAddress('192.168.0.2')
+
+        self.updates = [UpdateMsg.deserialize(**{'network': f'192.168.{subnet}.0', 'netmask': '255.255.255.0',
+                                                 'ASPath': [1], 'localpref': 100, 'selfOrigin': True,
+                                                 'origin': 'EGP'})
+                        for subnet in range(4)]
+
+        self.router = Router(asn=9,
+                             connections=[(36528, self.ip_address, ConnectionType.CUSTOMER)])
+
+        for update_msg in self.updates:
+            self.router.add_route(update_msg, self.ip_address)
+
+    def test_aggregated_on_update(self):
+        self.assertCountEqual([(self.updates[0].replace(netmask=SubnetMask('255.255.252.0')), self.ip_address)],
+                              self.router.aggregated_table.routes())
+
+    def test_disaggregated_on_withdraw(self):
+        self.router.withdraw_route(NetworkDescription(network=IPAddress('192.168.3.0'),
+                                                      netmask=SubnetMask('255.255.255.0')), self.ip_address)
+
+        self.assertCountEqual([(self.updates[0].replace(netmask=SubnetMask('255.255.254.0')), self.ip_address),
+                               (self.updates[2], self.ip_address)],
+                              self.router.aggregated_table.routes())
+
+    def test_different_attributes_not_aggregated(self):
+        reannounced = self.updates[1].replace(localpref=150)
+        self.router.add_route(reannounced, self.ip_address)
+
+        self.assertCountEqual([(self.updates[0], self.ip_address), (reannounced, self.ip_address),
+                               (self.updates[2].replace(netmask=SubnetMask('255.255.254.0')), self.ip_address)],
+                              self.router.aggregated_table.routes())
+
+    def test_same_route_from_two_peers(self):
+        other_ip_address = IPAddress('172.168.0.2')
+        self.router.add_route(self.updates[0], other_ip_address)
+
+        dumped_peers = [entry.peer for entry in DumpPacketHandler._dump_table(self.router)
+                        if entry.network == self.updates[0].network]
+
+        self.assertCountEqual([self.ip_address, other_ip_address], dumped_peers)
+
+    def test_matches_whole_table_aggregation(self):
+        peers = [self.ip_address, IPAddress('172.168.0.2')]
+        announced = {(self.ip_address, subnet): update_msg for subnet, update_msg in enumerate(self.updates)}
+
+        randomizer = random.Random(3700)
+
+        for _ in range(500):
+            peer, subnet = randomizer.choice(peers), randomizer.randrange(16)
+
+            if (peer, subnet) in announced and randomizer.random() < 0.4:
+                self.router.withdraw_route(NetworkDescription(network=IPAddress(f'192.168.{subnet}.0'),
+                                                              netmask=SubnetMask('255.255.255.0')), peer)
+                del announced[(peer, subnet)]
+            else:
+                update_msg = self.updates[0].replace(network=IPAddress(f'192.168.{subnet}.0'),
+                                                     localpref=randomizer.choice([100, 100, 150]))
+                self.router.add_route(update_msg, peer)
+                announced[(peer, subnet)] = update_msg
+
+            expected = Counter()
+            for expected_peer in peers:
+                group = [update_msg for (announcing_peer, _subnet), update_msg in announced.items()
+                         if announcing_peer == expected_peer]
+
+                if group:
+                    expected.update((update_msg, expected_peer) for update_msg in _aggregate_msg_group(group))
+
+            self.assertEqual(expected, Counter(self.router.aggregated_table.routes()))
@@ -5,6 +5,7 @@ from networks.router import Router
 from networks.request_handler import UpdatePacketHandler, DataPacketHandler
 from networks.packet import Packet, UpdateMsg, AutonomousSystemOrigin
 from networks.ipaddress import IPAddress, SubnetMask
+from networks.rib import RoutingInformationBase
 from networks.utils import ConnectionType
 
 
@@ -61,6 +62,19 @@ class TestUpdateFiltering(unittest.TestCase):
         print(self.mocksock3.mock_calls)
         print(self.mocksock4.mock_calls)
 
+    def test_longest_prefix_forwarded(self):
+        for mock_socket in (self.mocksock1, self.mocksock2, self.mocksock3, self.mocksock4):
+            mock_socket.reset_mock()
+
+        # 192.168.12.0/24 is more specific than 192.168.0.0/16 and 192.0.0.0/8
+        data_packet = Packet.deserialize(**{"src": "172.77.0.1", "dst": "192.168.12.25",
+                                            "type": "data", "msg": {"ignore": "this"}})
+
+        DataPacketHandler(sender=self.ip1, packet=data_packet).process(self.router)
+
+        self.assertEqual(1, self.mocksock3.sendto.call_count)
+        self.assertEqual(0, self.mocksock2.sendto.call_count + self.mocksock4.sendto.call_count)
+
 
 class TestRouteDetermining(unittest.TestCase):
     def test_unexpected_reception(self):
@@ -72,10 +86,10 @@ class TestRouteDetermining(unittest.TestCase):
         update2 = UpdateMsg.deserialize(**{"network": "12.0.0.0", "netmask": "255.0.0.0", "ASPath": [3, 4],
                                            "localpref": 150, "selfOrigin": False, "origin": "IGP"})
 
-        larger = DataPacketHandler._determine_best_route(largest_update_message=update1,
-                                                largest_ip_address=peer1,
-                                                contending_update_msg=update2,
-                                                contending_ip_address=peer2)
+        larger = RoutingInformationBase._determine_best_route(largest_update_message=update1,
+                                                              largest_ip_address=peer1,
+                                                              contending_update_msg=update2,
+                                                              contending_ip_address=peer2)
 
         print(larger)
 
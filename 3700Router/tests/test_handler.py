@@ -1,20 +1,26 @@
 import unittest
 
-from networks.request_handler import Handler
+from networks.prefix_trie import PrefixTrie
 from networks.packet import NetworkDescription
 from networks.ipaddress import IPAddress, SubnetMask
 
 
 class TestForwardingMask(unittest.TestCase):
 
+    def _forwarding_table(self, forwarding_entry: NetworkDescription) -> PrefixTrie[NetworkDescription]:
+        forwarding_table: PrefixTrie[NetworkDescription] = PrefixTrie()
+        forwarding_table.insert(forwarding_entry.network.binary, forwarding_entry.netmask.length, forwarding_entry)
+
+        return forwarding_table
+
     def test_forwarding_mask_logic(self):
         forwarding_entry = NetworkDescription(network=IPAddress("192.168.0.1"), netmask=SubnetMask("255.255.255.0"))
         dest_ip = IPAddress("192.168.0.25")
 
-        self.assertEqual(24, Handler.matched_subnet(dest_ip, forwarding_entry))
+        self.assertEqual((24, forwarding_entry), self._forwarding_table(forwarding_entry).longest_match(dest_ip.binary))
 
     def test_forwarding_logic(self):
         forwarding_entry = NetworkDescription(network=IPAddress("192.168.12.2"), netmask=SubnetMask("255.255.255.0"))
         dest_ip = IPAddress("192.168.0.25")
 
-        self.assertIsNone(Handler.matched_subnet(dest_ip, forwarding_entry))
\ No newline at end of file
+        self.assertIsNone(self._forwarding_table(forwarding_entry).longest_match(dest_ip.binary))
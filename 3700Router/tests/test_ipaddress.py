@@ -2,7 +2,7 @@ import unittest
 
 import struct
 
-from networks.ipaddress import IPAddress, SubnetMask
+from networks.ipaddress import QuadrupleOctet, IPAddress, SubnetMask
 
 
 class TestIPAddress(unittest.TestCase):
@@ -27,6 +27,24 @@ class TestIPAddress(unittest.TestCase):
         address = IPAddress(string_address)
         self.assertEqual(string_address, str(address))
 
+    def test_interned(self):
+        address = IPAddress('127.0.0.1')
+
+        self.assertIs(address, IPAddress('127.0.0.1'))
+        self.assertIs(address, IPAddress.from_binary((127 << 24) + 1))
+        self.assertNotEqual(address, SubnetMask('127.0.0.1'))
+
+    def test_base_class(self):
+        octets = QuadrupleOctet('1.2.3.4')
+
+        self.assertEqual((1 << 24) | (2 << 16) | (3 << 8) | 4, octets.binary)
+        self.assertEqual('1.2.3.4', str(octets))
+        self.assertIs(octets, QuadrupleOctet.from_binary(octets.binary))
+        self.assertIsNot(octets, IPAddress('1.2.3.4'))
+
+    def test_network_gateway(self):
+        self.assertEqual(IPAddress('192.168.12.1'), IPAddress('192.168.12.25').network_gateway())
+
 
 class TestSubnetMask(unittest.TestCase):
 
@@ -45,6 +63,12 @@ class TestSubnetMask(unittest.TestCase):
 
         self.assertEqual(32, mask.length)
 
+    def test_non_contiguous_subnet_mask(self):
+        mask = SubnetMask('255.0.255.0')
+
+        self.assertEqual(8, mask.length)
+        self.assertEqual(24, mask.prefix_shift_amount)
+
 
 if __name__ == '__main__':
     unittest().main()
@@ -0,0 +1,55 @@
+import unittest
+
+from networks.prefix_trie import PrefixTrie
+from networks.ipaddress import IPAddress
+
+
+class TestPrefixTrie(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.trie: PrefixTrie[str] = PrefixTrie()
+
+        self.trie.insert(IPAddress('192.0.0.0').binary, 8, "192/8")
+        self.trie.insert(IPAddress('192.168.0.0').binary, 16, "192.168/16")
+        self.trie.insert(IPAddress('192.168.12.0').binary, 24, "192.168.12/24")
+
+    def test_longest_match(self):
+        self.assertEqual((24, "192.168.12/24"), self.trie.longest_match(IPAddress('192.168.12.25').binary))
+        self.assertEqual((16, "192.168/16"), self.trie.longest_match(IPAddress('192.168.13.25').binary))
+        self.assertEqual((8, "192/8"), self.trie.longest_match(IPAddress('192.0.0.25').binary))
+        self.assertIsNone(self.trie.longest_match(IPAddress('10.0.0.25').binary))
+
+    def test_default_route(self):
+        self.trie.insert(IPAddress('0.0.0.0').binary, 0, "default")
+
+        self.assertEqual((0, "default"), self.trie.longest_match(IPAddress('10.0.0.25').binary))
+        self.assertEqual((24, "192.168.12/24"), self.trie.longest_match(IPAddress('192.168.12.25').binary))
+
+    def test_host_bits_ignored(self):
+        self.assertEqual("192.168.12/24", self.trie.get(IPAddress('192.168.12.1').binary, 24))
+        self.assertIsNone(self.trie.get(IPAddress('192.168.12.0').binary, 23))
+
+    def test_remove(self):
+        self.assertEqual("192.168/16", self.trie.remove(IPAddress('192.168.0.0').binary, 16))
+        self.assertIsNone(self.trie.remove(IPAddress('192.168.0.0').binary, 16))
+
+        self.assertEqual(2, len(self.trie))
+        self.assertEqual((8, "192/8"), self.trie.longest_match(IPAddress('192.168.13.25').binary))
+        self.assertEqual((24, "192.168.12/24"), self.trie.longest_match(IPAddress('192.168.12.25').binary))
+
+        # the nodes of a removed leaf are pruned
+        self.trie.remove(IPAddress('192.168.12.0').binary, 24)
+        self.assertIsNone(self.trie._find(IPAddress('192.168.0.0').binary, 9))
+
+    def test_items(self):
+        self.assertEqual([(IPAddress('192.0.0.0').binary, 8, "192/8"),
+                          (IPAddress('192.168.0.0').binary, 16, "192.168/16"),
+                          (IPAddress('192.168.12.0').binary, 24, "192.168.12/24")],
+                         list(self.trie.items()))
+
+        self.assertEqual(["192.168/16", "192.168.12/24"],
+                         [value for _, _, value in self.trie.items(IPAddress('192.168.0.0').binary, 16)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+from networks.rib import RoutingInformationBase
+from networks.packet import UpdateMsg, NetworkDescription, AutonomousSystemOrigin
+from networks.ipaddress import IPAddress, SubnetMask
+
+
+class TestRoutingInformationBase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.peer1 = IPAddress('192.168.0.2')
+        self.peer2 = IPAddress('172.168.0.2')
+
+        self.rib = RoutingInformationBase()
+
+        self.short_path = UpdateMsg(network=IPAddress('12.0.0.0'), netmask=SubnetMask('255.0.0.0'),
+                                    ASPath=[1], localpref=100, selfOrigin=True,
+                                    origin=AutonomousSystemOrigin.LOCAL)
+        self.long_path = UpdateMsg(network=IPAddress('12.0.0.0'), netmask=SubnetMask('255.0.0.0'),
+                                   ASPath=[2, 1], localpref=100, selfOrigin=True,
+                                   origin=AutonomousSystemOrigin.LOCAL)
+
+    def test_best_route_selected(self):
+        self.assertEqual((self.long_path, self.peer2), self.rib.add(self.long_path, self.peer2))
+        self.assertEqual((self.short_path, self.peer1), self.rib.add(self.short_path, self.peer1))
+
+        self.assertEqual(2, len(self.rib))
+        self.assertCountEqual([(self.short_path, self.peer1), (self.long_path, self.peer2)], self.rib.routes())
+
+    def test_withdraw_falls_back(self):
+        self.rib.add(self.short_path, self.peer1)
+        self.rib.add(self.long_path, self.peer2)
+
+        withdrawal = NetworkDescription(network=IPAddress('12.0.0.0'), netmask=SubnetMask('255.0.0.0'))
+
+        self.assertEqual((self.short_path, (self.long_path, self.peer2)), self.rib.withdraw(withdrawal, self.peer1))
+        self.assertEqual((self.long_path, None), self.rib.withdraw(withdrawal, self.peer2))
+
+        self.assertEqual(0, len(self.rib))
+        self.assertEqual([], list(self.rib.routes()))
+
+    def test_withdraw_unknown_peer(self):
+        self.rib.add(self.short_path, self.peer1)
+
+        withdrawal = NetworkDescription(network=IPAddress('12.0.0.0'), netmask=SubnetMask('255.0.0.0'))
+
+        self.assertEqual((None, (self.short_path, self.peer1)), self.rib.withdraw(withdrawal, self.peer2))
+        self.assertEqual(1, len(self.rib))
+
+    def test_reannouncement_replaces_route(self):
+        self.rib.add(self.short_path, self.peer1)
+
+        # the same peer announces the prefix again with a longer path
+        self.assertEqual((self.long_path, self.peer1), self.rib.add(self.long_path, self.peer1))
+
+        self.assertEqual(1, len(self.rib))
+        self.assertEqual([(self.long_path, self.peer1)], list(self.rib.routes()))
+
+        withdrawal = NetworkDescription(network=IPAddress('12.0.0.0'), netmask=SubnetMask('255.0.0.0'))
+
+        self.assertEqual((self.long_path, None), self.rib.withdraw(withdrawal, self.peer1))
+        self.assertEqual(0, len(self.rib))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import json
+import unittest
+from unittest.mock import Mock
+
+from networks.router import Router
+from networks.request_handler import DumpPacketHandler
+from networks.table_encoding import TableEncoding
+from networks.packet import Packet, PacketType, UpdateMsg, DumpPing, AutonomousSystemOrigin
+from networks.ipaddress import IPAddress, SubnetMask
+from networks.utils import ConnectionType
+
+from networks.constants import MAX_PACKET_BYTE_SIZE
+
+
+def _dump_entry(index: int) -> DumpPing:
+    # every other /24 so that nothing can be aggregated
+    return DumpPing(network=IPAddress.from_binary((10 << 24) | (index << 9)), netmask=SubnetMask('255.255.255.0'),
+                    ASPath=[1, 2], localpref=100, selfOrigin=True, origin=AutonomousSystemOrigin.LOCAL,
+                    peer=IPAddress('192.168.0.2'))
+
+
+class TestTableEncoding(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.source = IPAddress('192.168.0.1')
+        self.destination = IPAddress('192.168.0.2')
+
+        self.table_encoding = TableEncoding()
+
+    def test_single_packet(self):
+        entries = [_dump_entry(index) for index in range(3)]
+        self.table_encoding.update(1, entries)
+
+        json_packet, = self.table_encoding.packets(source=self.source, destination=self.destination)
+
+        expected = Packet(src=self.source, dst=self.destination, type=PacketType.TABLE, msg=entries)
+        self.assertEqual(json.dumps(expected.serialize()), json_packet)
+
+    def test_empty_table(self):
+        self.table_encoding.update(1, [])
+
+        json_packet, = self.table_encoding.packets(source=self.source, destination=self.destination)
+
+        self.assertEqual([], json.loads(json_packet)["msg"])
+
+    def test_chunked_packets(self):
+        entries = [_dump_entry(index) for index in range(2000)]
+        self.table_encoding.update(1, entries)
+
+        json_packets = list(self.table_encoding.packets(source=self.source, destination=self.destination))
+        self.assertGreater(len(json_packets), 1)
+
+        received_entries = []
+        for sequence, json_packet in enumerate(json_packets):
+            # the IP and UDP headers take 28 bytes of the datagram
+            self.assertLessEqual(len(json_packet.encode('utf-8')), MAX_PACKET_BYTE_SIZE - 28)
+
+            packet = json.loads(json_packet)
+            self.assertEqual(PacketType.TABLE, packet["type"])
+            self.assertEqual(sequence, packet["sequence"])
+            self.assertEqual(sequence == len(json_packets) - 1, packet["final"])
+
+            received_entries.extend(packet["msg"])
+
+        self.assertEqual([entry.serialize() for entry in entries], received_entries)
+
+
+class TestCachedDump(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.ip_address = IPAddress('192.168.0.2')
+
+        self.router = Router(asn=9,
+                             connections=[(36528, self.ip_address, ConnectionType.CUSTOMER)])
+
+        self.mocksock = Mock()
+        self.router.ip_socket_map[self.ip_address] = self.mocksock
+
+        self.update = UpdateMsg.deserialize(**{'network': '192.168.0.0', 'netmask': '255.255.255.0',
+                                               'ASPath': [1], 'localpref': 100, 'selfOrigin': True,
+                                               'origin': 'EGP'})
+        self.router.add_route(self.update, self.ip_address)
+
+    def _dumped_table(self):
+        DumpPacketHandler(sender=self.ip_address).process(self.router)
+
+        json_packet, _address = self.mocksock.sendto.call_args[0]
+        return json.loads(json_packet)["msg"]
+
+    def test_cached_until_changed(self):
+        self.assertEqual(1, len(self._dumped_table()))
+
+        cached_version = self.router.table_encoding.version
+        self.assertEqual(1, len(self._dumped_table()))
+        self.assertEqual(cached_version, self.router.table_encoding.version)
+
+        self.router.add_route(self.update.replace(network=IPAddress('172.16.0.0')), self.ip_address)
+
+        self.assertEqual(2, len(self._dumped_table()))
+        self.assertNotEqual(cached_version, self.router.table_encoding.version)
+
+
+if __name__ == '__main__':
+    unittest.main()